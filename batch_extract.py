@@ -0,0 +1,209 @@
+"""
+Batch extraction across many geodatabase exports
+Finds exports under directories or glob patterns, runs the extraction pipeline
+for each one in its own worker process with an optional address-space budget,
+writes one output tree per export and an aggregated catalogue of every export's
+feature classes
+"""
+
+import csv
+import glob
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+from export_reader import strip_compression_suffix
+from extraction_pipeline import run_pipeline
+from instrumentation import peak_rss_mb
+from output_scheduler import atomic_output
+
+EXPORT_SUFFIXES = ('.xml', '.xml.gz', '.xml.bz2', '.xml.xz', '.xml.zst', '.zip')
+STANDARD_EXPORT_NAME = 'database_export'
+
+def discover_exports(sources, suffixes=EXPORT_SUFFIXES):
+    """Expand directories (searched recursively) and glob patterns into a sorted list of export files"""
+    found = set()
+    for source in sources:
+        path = Path(source)
+        if path.is_dir():
+            candidates = path.rglob('*')
+        elif path.is_file():
+            candidates = [path]
+        else:
+            candidates = (Path(match) for match in glob.glob(str(source), recursive=True))
+        for candidate in candidates:
+            if candidate.is_file() and candidate.name.lower().endswith(tuple(suffixes)):
+                found.add(candidate.resolve())
+    return sorted(found)
+
+def export_label(path, depth=1):
+    """Last depth path components without suffix; a standard DATABASE_EXPORT.XML is named after its directory"""
+    parts = [part for part in strip_compression_suffix(path).with_suffix('').parts if part.strip(os.sep)]
+    if len(parts) > 1 and parts[-1].lower() == STANDARD_EXPORT_NAME:
+        parts.pop()
+    return '__'.join(parts[-depth:])
+
+def export_labels(exports):
+    """Unique output directory name per export
+
+    region_north/DATABASE_EXPORT.XML -> region_north, exports/south.xml -> south.
+    Clashing names take more parent directories (exports__south) until they differ.
+    """
+    depths = {path: 1 for path in exports}
+    while True:
+        labels = OrderedDict((path, export_label(path, depths[path])) for path in exports)
+        counts = Counter(labels.values())
+        clashes = [path for path, label in labels.items()
+                   if counts[label] > 1 and depths[path] < len(Path(path).parts)]
+        if not clashes:
+            break
+        for path in clashes:
+            depths[path] += 1
+    # Paths that still clash at full depth (a/region.xml and a/region/DATABASE_EXPORT.XML)
+    seen = Counter()
+    for path, label in labels.items():
+        seen[label] += 1
+        if counts[label] > 1:
+            labels[path] = f"{label}_{seen[label]}"
+    return labels
+
+def limit_memory(memory_limit_mb):
+    """Pool initializer: cap the worker's address space so an oversized export fails with MemoryError"""
+    if memory_limit_mb and resource is not None and hasattr(resource, 'RLIMIT_AS'):
+        limit = int(memory_limit_mb * 1024 * 1024)
+        _, hard = resource.getrlimit(resource.RLIMIT_AS)
+        if hard != resource.RLIM_INFINITY:
+            limit = min(limit, hard)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+def export_summary(xml_file, output_dir):
+    return OrderedDict([
+        ('export', str(xml_file)),
+        ('output_dir', str(output_dir)),
+        ('status', 'ok'),
+        ('error', ''),
+        ('domains', 0),
+        ('classes', OrderedDict()),
+        ('missing', []),
+        ('files', 0),
+    ])
+
+def process_export(task):
+    """Extract one export into its own output directory; never raises, failures are reported"""
+    xml_file, output_dir, class_names, outputs = task
+    start = time.perf_counter()
+    summary = export_summary(xml_file, output_dir)
+    try:
+        schema, written = run_pipeline(xml_file, class_names, output_dir, outputs)
+        summary['domains'] = len(schema['domains'])
+        for class_name, class_model in schema['classes'].items():
+            summary['classes'][class_name] = {
+                'fields': len(class_model['all_fields']),
+                'domain_fields': len(class_model['fields_with_domains']),
+                'coded_values': sum(len(info['values']) for info in class_model['fields_with_domains'].values())
+            }
+        summary['missing'] = schema['missing']
+        summary['files'] = len(written)
+    except MemoryError:
+        summary['status'] = 'failed'
+        summary['error'] = 'MemoryError: export exceeds the worker memory budget'
+    except Exception as exc:
+        summary['status'] = 'failed'
+        summary['error'] = f"{type(exc).__name__}: {exc}"
+    summary['elapsed_s'] = round(time.perf_counter() - start, 3)
+    summary['peak_rss_mb'] = peak_rss_mb()
+    return summary
+
+def run_pool(func, tasks, jobs, memory_limit_mb):
+    """Yield (task, result) from one pool of spawned workers; return the tasks lost if a worker died"""
+    # One task per worker process, so memory is returned between tasks (Python 3.11+)
+    options = {'max_tasks_per_child': 1} if sys.version_info >= (3, 11) else {}
+    lost = []
+    with ProcessPoolExecutor(max_workers=max(1, min(jobs, len(tasks))), mp_context=multiprocessing.get_context('spawn'),
+                             initializer=limit_memory, initargs=(memory_limit_mb,), **options) as executor:
+        futures = {executor.submit(func, task): i for i, task in enumerate(tasks)}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except BrokenProcessPool:
+                lost.append(futures[future])
+                continue
+            yield tasks[futures[future]], result
+    return [tasks[i] for i in sorted(lost)]
+
+def run_workers(func, tasks, jobs=1, memory_limit_mb=None):
+    """Run func(task) for every task in spawned worker processes, yielding (task, result) as each finishes
+
+    A worker killed outright (by the address-space limit outside Python's allocator,
+    or by the OOM killer) breaks the whole pool, and the tasks it was running cannot
+    be told apart. Those are rerun one per pool; a task whose worker dies again is
+    yielded with result None.
+    """
+    lost = yield from run_pool(func, tasks, jobs, memory_limit_mb)
+    for task in lost:
+        if (yield from run_pool(func, [task], 1, memory_limit_mb)):
+            yield task, None
+
+def write_catalogue(results, output_dir):
+    """Aggregated catalogue: catalogue.json with every export's summary and catalogue.csv with one row per class"""
+    catalogue_json = Path(output_dir) / "catalogue.json"
+    catalogue_csv = Path(output_dir) / "catalogue.csv"
+    with atomic_output(catalogue_json) as tmp_path:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    with atomic_output(catalogue_csv) as tmp_path:
+        with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['export', 'output_dir', 'status', 'feature_class', 'fields', 'domain_fields',
+                             'coded_values', 'error'])
+            for result in results:
+                rows = [(class_name, info['fields'], info['domain_fields'], info['coded_values'])
+                        for class_name, info in result['classes'].items()]
+                rows += [(class_name, '', '', '') for class_name in result['missing']]
+                for class_name, fields, domain_fields, coded_values in rows or [('', '', '', '')]:
+                    writer.writerow([result['export'], result['output_dir'],
+                                     'missing' if class_name in result['missing'] else result['status'],
+                                     class_name, fields, domain_fields, coded_values, result['error']])
+    return [catalogue_json, catalogue_csv]
+
+def run_batch(sources, output_dir, class_names=("Building_A",), outputs=None, jobs=1, memory_limit_mb=None,
+              progress=None):
+    """Extract every export found under sources, jobs at a time, each in a fresh worker process
+
+    Largest exports are started first. Each worker handles a single export and is
+    then replaced, so memory is returned to the system between exports and the
+    memory_limit_mb budget applies per export. Returns (results, catalogue files).
+    """
+    exports = discover_exports(sources)
+    labels = export_labels(exports)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    tasks = [(str(path), str(output_dir / labels[path]), class_names, outputs)
+             for path in sorted(exports, key=lambda path: -path.stat().st_size)]
+    
+    results = []
+    if tasks:
+        for task, result in run_workers(process_export, tasks, jobs, memory_limit_mb):
+            if result is None:
+                result = export_summary(task[0], task[1])
+                result['status'] = 'failed'
+                result['error'] = 'BrokenProcessPool: the worker process died (memory limit or OOM killer)'
+                result['elapsed_s'] = result['peak_rss_mb'] = None
+            results.append(result)
+            if progress is not None:
+                progress(result)
+    
+    order = {str(path): i for i, path in enumerate(exports)}
+    results.sort(key=lambda result: order[result['export']])
+    return results, write_catalogue(results, output_dir)
\ No newline at end of file
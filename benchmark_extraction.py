@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+Benchmark harness for the extraction scripts using synthetic workspace exports
+Times and memory-profiles XML parsing, parse_all_domains, the Building_A field walk,
+each CSV/JSON exporter and the HTML generator across export sizes from MBs to GBs
+"""
+
+import argparse
+import bz2
+import gc
+import gzip
+import io
+import json
+import lzma
+import multiprocessing
+import shutil
+import tempfile
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import extract_all_metadata
+import extract_building_domains
+import extract_building_domains_columnar
+import extract_building_domains_complete
+import generate_complete_html_manual
+from extraction_pipeline import load_schema
+from export_reader import open_decompressed, parse_export, zstandard
+from instrumentation import peak_rss_mb
+from progress import ProgressReporter
+from export_json_schema import build_json_schema, coerce_record, benchmark_json_schema
+from generate_synthetic_export import generate_synthetic_export, generate_synthetic_records
+from validate_records import compile_field_rules
+
+NAMESPACES = {
+    'esri': 'http://www.esri.com/schemas/ArcGIS/10.8',
+    'xsi': 'http://www.w3.org/2001/XMLSchema-instance',
+    'xs': 'http://www.w3.org/2001/XMLSchema'
+}
+
+# Approximate export sizes: small ~4 MB, medium ~35 MB, large ~330 MB, xlarge ~2 GB
+SIZE_PRESETS = OrderedDict([
+    ('small', {'feature_classes': 10, 'fields_per_class': 85, 'domains': 740, 'values_per_domain': 20}),
+    ('medium', {'feature_classes': 100, 'fields_per_class': 85, 'domains': 740, 'values_per_domain': 40}),
+    ('large', {'feature_classes': 1000, 'fields_per_class': 85, 'domains': 740, 'values_per_domain': 40}),
+    ('xlarge', {'feature_classes': 6000, 'fields_per_class': 85, 'domains': 740, 'values_per_domain': 40}),
+])
+
+def measure_stage(results, stage, func, *args, trace_memory=True):
+    """Run one stage, append its timing and memory figures to results and return its result"""
+    gc.collect()
+    if trace_memory:
+        tracemalloc.start()
+    
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    result = func(*args)
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    
+    traced_peak = None
+    if trace_memory:
+        traced_peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        tracemalloc.stop()
+    
+    rss = peak_rss_mb()
+    results.append({
+        'stage': stage,
+        'wall_s': round(wall, 4),
+        'cpu_s': round(cpu, 4),
+        'tracemalloc_peak_mb': round(traced_peak, 2) if traced_peak is not None else None,
+        'peak_rss_mb': round(rss, 1) if rss is not None else None
+    })
+    return result
+
+def write_html(fields_data, output_file):
+    """Render and write the HTML manual (the generator's main() minus the XML parse)"""
+    html_content = generate_complete_html_manual.build_html_manual(fields_data)
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write(html_content)
+
+def run_benchmark(size_name, params, workdir, trace_memory=True, keep_export=False):
+    """Generate one synthetic export and benchmark every extraction stage against it"""
+    workdir = Path(workdir)
+    workdir.mkdir(parents=True, exist_ok=True)
+    xml_file = workdir / f"synthetic_{size_name}.xml"
+    
+    gen_start = time.perf_counter()
+    summary = generate_synthetic_export(xml_file, **params)
+    generate_s = time.perf_counter() - gen_start
+    
+    stages = []
+    
+    # Parsing and field extraction
+    root = measure_stage(stages, 'ET.parse', lambda: parse_export(xml_file).getroot(), trace_memory=trace_memory)
+    all_domains = measure_stage(stages, 'parse_all_domains',
+                                extract_building_domains_complete.parse_all_domains, root, NAMESPACES,
+                                trace_memory=trace_memory)
+    
+    def building_a_fields():
+        building_a = extract_building_domains_complete.find_feature_class(root, NAMESPACES, "Building_A")
+        return extract_building_domains_complete.extract_feature_class_fields(building_a, NAMESPACES, all_domains)
+    
+    all_fields, fields_with_domains = measure_stage(stages, 'building_a_fields', building_a_fields,
+                                                    trace_memory=trace_memory)
+    building_a = extract_building_domains_complete.find_feature_class(root, NAMESPACES, "Building_A")
+    domain_fields = measure_stage(stages, 'columnar_domain_fields',
+                                  extract_building_domains_columnar.extract_domain_fields, building_a, NAMESPACES,
+                                  trace_memory=trace_memory)
+    legacy_fields = extract_building_domains.extract_domain_fields(building_a, NAMESPACES)
+    metadata = measure_stage(stages, 'metadata_fields',
+                             extract_all_metadata.extract_feature_class_metadata, building_a, NAMESPACES, all_domains,
+                             trace_memory=trace_memory)
+    html_fields = measure_stage(stages, 'html_fields',
+                                generate_complete_html_manual.extract_html_fields, building_a, NAMESPACES, all_domains,
+                                trace_memory=trace_memory)
+    
+    # Exporters
+    outputs = OrderedDict([
+        ('export_complete_csv', (extract_building_domains_complete.export_complete_csv,
+                                 (all_fields, fields_with_domains), 'building_a_all_fields.csv')),
+        ('export_detailed_domains_csv', (extract_building_domains_complete.export_detailed_domains_csv,
+                                         (fields_with_domains,), 'building_a_domains_detailed.csv')),
+        ('export_to_columnar_csv', (extract_building_domains_columnar.export_to_columnar_csv,
+                                    (domain_fields,), 'building_a_domains_columnar.csv')),
+        ('export_codes_only_csv', (extract_building_domains_columnar.export_codes_only_csv,
+                                   (domain_fields,), 'building_a_domains_codes_only.csv')),
+        ('export_to_csv', (extract_building_domains.export_to_csv,
+                           (legacy_fields,), 'building_a_domains.csv')),
+        ('export_to_json', (extract_building_domains.export_to_json,
+                            (legacy_fields,), 'building_a_domains.json')),
+        ('export_metadata_csv', (extract_all_metadata.export_metadata_csv,
+                                 (metadata,), 'building_a_complete_metadata.csv')),
+        ('export_metadata_json', (extract_all_metadata.export_metadata_json,
+                                  (metadata,), 'building_a_complete_metadata.json')),
+        ('html_manual', (write_html, (html_fields,), 'building_a_complete_manual.html')),
+    ])
+    
+    output_sizes = OrderedDict()
+    for stage, (func, args, filename) in outputs.items():
+        output_file = workdir / filename
+        measure_stage(stages, stage, func, *args, output_file, trace_memory=trace_memory)
+        output_sizes[filename] = output_file.stat().st_size
+        output_file.unlink()
+    
+    if not keep_export:
+        xml_file.unlink()
+    
+    return {
+        'size': size_name,
+        'params': params,
+        'export_mb': round(summary['bytes'] / 1024 / 1024, 1),
+        'generate_s': round(generate_s, 2),
+        'fields': summary['fields'],
+        'domains': summary['domains'],
+        'coded_values': summary['coded_values'],
+        'stages': stages,
+        'output_bytes': output_sizes
+    }
+
+def run_isolated(size_name, params, workdir, trace_memory=True, keep_export=False):
+    """Run one benchmark in a fresh interpreter so peak RSS is not inherited from earlier sizes"""
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        return executor.submit(run_benchmark, size_name, params, workdir, trace_memory, keep_export).result()
+
+def run_json_schema_benchmark(workdir, records=20000, values_per_domain=300):
+    """Compare the naive and the compiled JSON Schema validator on synthetic Building_A records"""
+    workdir = Path(workdir)
+    workdir.mkdir(parents=True, exist_ok=True)
+    xml_file = workdir / "synthetic_json_schema.xml"
+    records_file = workdir / "building_a_records.ndjson"
+    generate_synthetic_export(xml_file, feature_classes=1, fields_per_class=85, domains=60,
+                              values_per_domain=values_per_domain, domain_fields_per_class=32)
+    class_model = load_schema(xml_file)['classes']['Building_A']
+    schema = build_json_schema('Building_A', class_model)
+    generate_synthetic_records(compile_field_rules(class_model), records_file, rows=records, error_rate=0.05)
+    with open(records_file, encoding='utf-8') as f:
+        typed = [coerce_record(json.loads(line), schema) for line in f]
+    xml_file.unlink()
+    records_file.unlink()
+    return benchmark_json_schema(schema, typed)
+
+def compress_export(xml_file, compression):
+    """Write a compressed copy of the export next to it and return its path"""
+    if compression == 'zip':
+        target = xml_file.with_suffix('.zip')
+        with zipfile.ZipFile(target, 'w', zipfile.ZIP_DEFLATED) as archive:
+            archive.write(xml_file, 'DATABASE_EXPORT.XML')
+        return target
+    suffix, opener = {
+        'gzip': ('.xml.gz', gzip.open),
+        'bzip2': ('.xml.bz2', bz2.open),
+        'xz': ('.xml.xz', lzma.open),
+        'zstd': ('.xml.zst', lambda path, mode: zstandard.ZstdCompressor().stream_writer(open(path, mode))),
+    }[compression]
+    target = xml_file.with_suffix(suffix)
+    with open(xml_file, 'rb') as src, opener(target, 'wb') as dst:
+        shutil.copyfileobj(src, dst, 1 << 20)
+    return target
+
+def run_compression_benchmark(size_name, params, workdir):
+    """Parse the same export plain, streamed from each compressed format, and decompressed to disk first"""
+    workdir = Path(workdir)
+    workdir.mkdir(parents=True, exist_ok=True)
+    xml_file = workdir / f"synthetic_{size_name}.xml"
+    generate_synthetic_export(xml_file, **params)
+    formats = ['gzip', 'bzip2', 'xz', 'zip'] + (['zstd'] if zstandard is not None else [])
+    
+    results = []
+    stats = OrderedDict()
+    parse_export(xml_file, stats=stats)
+    results.append(OrderedDict([('format', 'plain'), ('mode', 'parse')] + list(stats.items())))
+    for compression in formats:
+        compressed = compress_export(xml_file, compression)
+        stats = OrderedDict()
+        parse_export(compressed, stats=stats)
+        results.append(OrderedDict([('format', compression), ('mode', 'stream')] + list(stats.items())))
+        
+        # Baseline: decompress to a temporary file, then parse it
+        start = time.perf_counter()
+        extracted = workdir / "extracted.xml"
+        with open(compressed, 'rb') as raw, open(extracted, 'wb') as dst:
+            source = open_decompressed(raw, compression)
+            shutil.copyfileobj(source, dst, 1 << 20)
+            source.close()
+        ET.parse(extracted)
+        results.append(OrderedDict([('format', compression), ('mode', 'to disk'),
+                                    ('wall_s', round(time.perf_counter() - start, 4))]))
+        extracted.unlink()
+        compressed.unlink()
+    xml_file.unlink()
+    return results
+
+def run_progress_benchmark(size_name, params, workdir, repeat=5):
+    """Time parsing the same export without progress, with the default sampled reporter and reporting every chunk
+
+    The last row times advance() alone over the export's reads; its overhead_pct is
+    that time as a share of the plain parse.
+    """
+    workdir = Path(workdir)
+    workdir.mkdir(parents=True, exist_ok=True)
+    xml_file = workdir / f"synthetic_{size_name}.xml"
+    generate_synthetic_export(xml_file, **params)
+    size = xml_file.stat().st_size
+    variants = OrderedDict([
+        ('none', lambda: None),
+        ('sampled', lambda: ProgressReporter(size, io.StringIO())),
+        ('every chunk', lambda: ProgressReporter(size, io.StringIO(), json_events=True, interval=0)),
+    ])
+    
+    best = {}
+    events = {}
+    # Variants alternate within each round so machine noise affects them alike
+    for _ in range(repeat):
+        for label, make_progress in variants.items():
+            progress = make_progress()
+            start = time.perf_counter()
+            parse_export(xml_file, progress=progress)
+            elapsed = time.perf_counter() - start
+            best[label] = min(best.get(label, elapsed), elapsed)
+            events[label] = progress.events if progress is not None else 0
+    results = [OrderedDict([('progress', label), ('wall_s', round(best[label], 4)), ('events', events[label])])
+               for label in variants]
+    
+    # The reporter's own cost, without parse-time noise: replay the export's 64 KB reads through advance()
+    data = xml_file.read_bytes()
+    progress = variants['sampled']()
+    start = time.perf_counter()
+    for offset in range(0, size, 1 << 16):
+        progress.advance(offset + (1 << 16), data[offset:offset + (1 << 16)])
+    results.append(OrderedDict([('progress', 'sampled, advance() only'),
+                                ('wall_s', round(time.perf_counter() - start, 4)), ('events', progress.events)]))
+    baseline = results[0]['wall_s']
+    for result in results[:-1]:
+        result['overhead_pct'] = round(100.0 * (result['wall_s'] - baseline) / baseline, 1)
+    results[-1]['overhead_pct'] = round(100.0 * results[-1]['wall_s'] / baseline, 1)
+    xml_file.unlink()
+    return results
+
+def print_report(result):
+    """Print a readable table for one benchmark result"""
+    print(f"\n=== {result['size']}: {result['export_mb']} MB export, "
+          f"{result['fields']} fields, {result['domains']} domains, {result['coded_values']} coded values ===")
+    print(f"{'Stage':<30} {'Wall (s)':>10} {'CPU (s)':>10} {'Traced peak (MB)':>17} {'Peak RSS (MB)':>14}")
+    print("-" * 85)
+    for stage in result['stages']:
+        traced = f"{stage['tracemalloc_peak_mb']:.2f}" if stage['tracemalloc_peak_mb'] is not None else '-'
+        rss = f"{stage['peak_rss_mb']:.1f}" if stage['peak_rss_mb'] is not None else '-'
+        print(f"{stage['stage']:<30} {stage['wall_s']:>10.4f} {stage['cpu_s']:>10.4f} {traced:>17} {rss:>14}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the extraction scripts on synthetic exports")
+    parser.add_argument('--sizes', default='small,medium',
+                        help=f"Comma-separated size presets ({', '.join(SIZE_PRESETS)})")
+    parser.add_argument('--workdir', help="Directory for generated exports (default: a temporary directory)")
+    parser.add_argument('--json', help="Write raw results to this JSON file")
+    parser.add_argument('--no-tracemalloc', action='store_true',
+                        help="Skip tracemalloc (it slows down large runs considerably)")
+    parser.add_argument('--keep-exports', action='store_true', help="Keep the generated XML files")
+    parser.add_argument('--in-process', action='store_true',
+                        help="Run all sizes in this process instead of one fresh interpreter per size")
+    parser.add_argument('--json-schema-records', type=int, default=0,
+                        help="Also compare the naive and compiled JSON Schema validators on this many records")
+    parser.add_argument('--compression', metavar='SIZE',
+                        help="Also time streamed parsing of compressed copies of this size preset's export")
+    parser.add_argument('--progress-overhead', metavar='SIZE',
+                        help="Also measure the cost of progress reporting while parsing this size preset's export")
+    args = parser.parse_args()
+    
+    sizes = [s.strip() for s in args.sizes.split(',') if s.strip()]
+    unknown = [s for s in sizes if s not in SIZE_PRESETS]
+    unknown += [size for size in (args.compression, args.progress_overhead) if size and size not in SIZE_PRESETS]
+    if unknown:
+        parser.error(f"Unknown size preset(s): {', '.join(unknown)}")
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        workdir = Path(args.workdir) if args.workdir else Path(tmpdir)
+        results = []
+        for size_name in sizes:
+            print(f"Benchmarking {size_name}...")
+            runner = run_benchmark if args.in_process else run_isolated
+            result = runner(size_name, SIZE_PRESETS[size_name], workdir,
+                            not args.no_tracemalloc, args.keep_exports)
+            print_report(result)
+            results.append(result)
+        
+        if args.json_schema_records:
+            print(f"\nBenchmarking JSON Schema validation on {args.json_schema_records} records...")
+            comparison = run_json_schema_benchmark(workdir, args.json_schema_records)
+            print(f"naive:    {comparison['naive_s']:.3f}s ({comparison['naive_records_per_s']} records/s)")
+            print(f"compiled: {comparison['compiled_s']:.3f}s ({comparison['compiled_records_per_s']} records/s)")
+            print(f"speedup:  {comparison['speedup']}x")
+        
+        if args.compression:
+            print(f"\nBenchmarking compressed input ({args.compression})...")
+            print(f"{'Format':<8} {'Mode':<8} {'Wall (s)':>9} {'MB/s in':>8} {'MB/s out':>9} "
+                  f"{'Decomp (s)':>11} {'Wait (s)':>9} {'Overlap (s)':>12}")
+            for row in run_compression_benchmark(args.compression, SIZE_PRESETS[args.compression], workdir):
+                print(f"{row['format']:<8} {row['mode']:<8} {row['wall_s']:>9.3f} {row.get('input_mb_per_s') or '-':>8} "
+                      f"{row.get('output_mb_per_s') or '-':>9} {row.get('decompress_s', '-'):>11} "
+                      f"{row.get('parser_wait_s', '-'):>9} {row.get('overlap_s', '-'):>12}")
+    
+        if args.progress_overhead:
+            print(f"\nBenchmarking progress reporting overhead ({args.progress_overhead})...")
+            for row in run_progress_benchmark(args.progress_overhead, SIZE_PRESETS[args.progress_overhead], workdir):
+                print(f"{row['progress']:<26} {row['wall_s']:>8.3f}s {row['overhead_pct']:>+6.1f}%  "
+                      f"{row['events']} events")
+    
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as jsonfile:
+            json.dump(results, jsonfile, indent=2)
+        print(f"\nWrote benchmark results to: {args.json}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
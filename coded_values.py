@@ -0,0 +1,152 @@
+"""
+Typed storage for coded value domains
+Decodes every Code by its xsi:type (xs:short, xs:int, xs:double, ...) and keeps
+a domain's numeric codes in one compact array from the array module, with the
+display names and string codes interned. CodedValues still reads as the list of
+{'name', 'code'} dicts the writers iterate over; lookups go through a code ->
+name dict built on first use, so a record value is converted to the code type
+once and compared as a number rather than as text.
+"""
+
+import sys
+from array import array
+from collections.abc import Sequence
+
+XSI_TYPE = '{http://www.w3.org/2001/XMLSchema-instance}type'
+
+# Code xsi:type -> (array typecode, conversion from the element text)
+CODE_TYPES = {
+    'xs:byte': ('b', int),
+    'xs:short': ('h', int),
+    'xs:int': ('i', int),
+    'xs:long': ('q', int),
+    'xs:float': ('d', float),
+    'xs:double': ('d', float),
+}
+
+def intern_text(text):
+    return sys.intern(text) if text is not None else None
+
+def code_text(code):
+    """Canonical text form of a typed code, e.g. for keys matched against CSV cells: 7 -> '7', 2.0 -> '2'
+
+    This is the code's value written out, not the element's original text: numeric
+    codes are normalised when decoded, so '01' comes back as '1', '1e3' on a double
+    domain as '1000' and '2.50' as '2.5'. String codes are returned unchanged.
+    """
+    if code is None:
+        return ''
+    if isinstance(code, float) and code.is_integer():
+        return str(int(code))
+    return str(code)
+
+def json_code(code):
+    """Typed code for JSON output, with whole-number doubles written as the XML does: 1.0 -> 1"""
+    if isinstance(code, float) and code.is_integer():
+        return int(code)
+    return code
+
+def typed_codes(texts, code_type):
+    """The codes as an array of the declared type, or None if the type is textual or a code does not convert"""
+    if code_type not in CODE_TYPES:
+        return None
+    typecode, convert = CODE_TYPES[code_type]
+    try:
+        return array(typecode, [convert(text) for text in texts])
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+class CodedValues(Sequence):
+    """Codes and display names of one coded value domain
+
+    codes is an array for numeric code types and a tuple of interned strings
+    otherwise (also when a numeric code does not parse). Indexing and iteration
+    yield {'name': ..., 'code': ...} dicts, with an int or float code for numeric
+    domains.
+    """
+    
+    __slots__ = ('codes', 'names', 'code_type', '_names_by_code')
+    
+    def __init__(self, codes=(), names=(), code_type=None):
+        codes = list(codes)
+        self.code_type = code_type
+        self.codes = typed_codes(codes, code_type)
+        if self.codes is None:
+            self.codes = tuple(intern_text(code) if isinstance(code, str) else code for code in codes)
+        self.names = tuple(intern_text(name) for name in names)
+        self._names_by_code = None
+    
+    def __len__(self):
+        return len(self.codes)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [{'name': name, 'code': code} for name, code in zip(self.names[index], self.codes[index])]
+        return {'name': self.names[index], 'code': self.codes[index]}
+    
+    def __iter__(self):
+        for name, code in zip(self.names, self.codes):
+            yield {'name': name, 'code': code}
+    
+    def __eq__(self, other):
+        if isinstance(other, CodedValues):
+            return (self.code_type, self.names, list(self.codes)) == (other.code_type, other.names, list(other.codes))
+        if isinstance(other, Sequence):
+            return list(self) == list(other)
+        return NotImplemented
+    
+    __hash__ = None
+    
+    def __repr__(self):
+        return f"CodedValues({list(self.codes)!r}, {list(self.names)!r}, {self.code_type!r})"
+    
+    @property
+    def numeric(self):
+        return isinstance(self.codes, array)
+    
+    def coerce(self, value):
+        """A record value (text or number) as a code of this domain's type; None if it cannot be one"""
+        if value is None:
+            return None
+        if not self.numeric:
+            return value if isinstance(value, str) else code_text(value)
+        if self.codes.typecode == 'd':
+            try:
+                return float(value)
+            except (TypeError, ValueError):
+                return None
+        if isinstance(value, float):
+            return int(value) if value.is_integer() else None
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+    
+    def name_of(self, code, default=None):
+        """Display name of a typed code (the first one if a code repeats)"""
+        if self._names_by_code is None:
+            names_by_code = {}
+            for code_value, name in zip(self.codes, self.names):
+                names_by_code.setdefault(code_value, name)
+            self._names_by_code = names_by_code
+        return self._names_by_code.get(code, default)
+
+def as_coded_values(values):
+    """CodedValues for a list of {'name', 'code'} dicts; CodedValues are returned as they are"""
+    if isinstance(values, CodedValues):
+        return values
+    return CodedValues([value['code'] for value in values], [value['name'] for value in values])
+
+def decode_coded_values(values_array, namespaces):
+    """CodedValues from a CodedValues element, typed by the xsi:type of its first Code"""
+    codes = []
+    names = []
+    code_type = None
+    if values_array is not None:
+        for coded_value in values_array.findall("CodedValue[@xsi:type='esri:CodedValue']", namespaces):
+            code = coded_value.find("Code", namespaces)
+            if code_type is None:
+                code_type = code.get(XSI_TYPE)
+            names.append(coded_value.find("Name", namespaces).text)
+            codes.append(code.text)
+    return CodedValues(codes, names, code_type)
\ No newline at end of file
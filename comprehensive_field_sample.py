@@ -6,11 +6,13 @@ to show the full metadata structure available.
 
 import xml.etree.ElementTree as ET
 
+from export_reader import parse_export
+
 def extract_complete_sample():
     """Extract a complete field sample with domain from Building_A."""
     
     # Parse the XML
-    tree = ET.parse("/home/art/Projects/gis schema extraction/DATABASE_EXPORT.XML")
+    tree = parse_export("/home/art/Projects/gis schema extraction/DATABASE_EXPORT.XML")
     root = tree.getroot()
     
     # Find Building_A feature class
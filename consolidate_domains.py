@@ -0,0 +1,207 @@
+"""
+Cross-geodatabase domain consolidation
+Canonicalises and hashes every workspace domain of many exports, groups domains
+with identical content, picks the most common variant of each domain name for a
+deduplicated master library, reports which exports deviate from it and finds
+differently named domains with near-identical code lists
+"""
+
+import csv
+import hashlib
+import json
+from collections import Counter, OrderedDict, defaultdict
+from pathlib import Path
+
+from batch_extract import discover_exports
+from coded_values import code_text
+from extract_building_domains import json_values
+from extraction_pipeline import load_schema
+from output_scheduler import atomic_output
+
+def canonical_values(values):
+    """Coded values as a sorted tuple of (code, name) with whitespace and case differences removed"""
+    return tuple(sorted((code_text(value['code']).strip(), ' '.join((value['name'] or '').split()).casefold())
+                        for value in values))
+
+def domain_kind(domain):
+    return 'CodedValue' if 'CodedValue' in (domain['type'] or '') else 'Range'
+
+def domain_fingerprint(domain):
+    """Content hash of a domain: its kind plus canonical coded values or range bounds, not its name"""
+    if domain_kind(domain) == 'CodedValue':
+        content = ['CodedValue', canonical_values(domain['values'])]
+    else:
+        content = ['Range', (domain.get('min_value') or '').strip(), (domain.get('max_value') or '').strip()]
+    return hashlib.sha1(json.dumps(content, ensure_ascii=False).encode('utf-8')).hexdigest()[:16]
+
+def collect_domains(exports):
+    """Load the workspace domains of every export (domains only, no feature classes)
+
+    Returns one record per export and domain name with its content hash, and
+    (export, error) for exports that could not be read or whose domains could not be decoded.
+    """
+    records = []
+    failed = []
+    for xml_file in exports:
+        # Domains decode lazily, so a malformed domain fails inside the loop; none of the export's records are kept
+        try:
+            domains = load_schema(xml_file, [])['domains']
+            export_records = []
+            for name in domains:
+                domain = domains[name]
+                export_records.append({
+                    'export': str(xml_file),
+                    'name': name,
+                    'kind': domain_kind(domain),
+                    'description': domain['description'] or '',
+                    'values': domain['values'],
+                    'min_value': domain.get('min_value'),
+                    'max_value': domain.get('max_value'),
+                    'hash': domain_fingerprint(domain)
+                })
+        except Exception as exc:
+            failed.append((str(xml_file), f"{type(exc).__name__}: {exc}"))
+            continue
+        records.extend(export_records)
+    return records, failed
+
+def compare_values(master_values, values):
+    """Codes added, removed and renamed relative to the master variant"""
+    master = dict(canonical_values(master_values))
+    other = dict(canonical_values(values))
+    added = sorted(set(other) - set(master))
+    removed = sorted(set(master) - set(other))
+    renamed = sorted(code for code in set(master) & set(other) if master[code] != other[code])
+    return added, removed, renamed
+
+def consolidate(records, exports=None):
+    """Build the master library and the drift report from collected domain records
+
+    The master variant of a domain name is the content hash used by most exports
+    (ties go to the export listed first). Domains with other names but the same
+    hash are listed as aliases. Drift rows cover every export: canonical, variant
+    (with added, removed and renamed codes) or missing.
+    """
+    exports = [str(export) for export in (exports or OrderedDict.fromkeys(r['export'] for r in records))]
+    by_name = OrderedDict()
+    for record in records:
+        by_name.setdefault(record['name'], []).append(record)
+    names_by_hash = defaultdict(set)
+    for record in records:
+        names_by_hash[record['hash']].add(record['name'])
+    
+    library = OrderedDict()
+    drift = []
+    for name in sorted(by_name):
+        variants = by_name[name]
+        counts = Counter(record['hash'] for record in variants)
+        first = OrderedDict()
+        for record in variants:
+            first.setdefault(record['hash'], record)
+        # max() keeps the first of equal counts, i.e. the earliest export
+        master_hash = max(first, key=lambda content_hash: counts[content_hash])
+        master = first[master_hash]
+        library[name] = OrderedDict([
+            ('name', name),
+            ('kind', master['kind']),
+            ('description', master['description']),
+            ('hash', master_hash),
+            ('exports', len(variants)),
+            ('variants', len(counts)),
+            ('aliases', sorted(names_by_hash[master_hash] - {name})),
+            ('values', master['values']),
+            ('min_value', master['min_value']),
+            ('max_value', master['max_value']),
+        ])
+        
+        present = {record['export']: record for record in variants}
+        for export in exports:
+            record = present.get(export)
+            row = OrderedDict([('domain', name), ('export', export), ('status', 'missing'), ('hash', ''),
+                               ('added', ''), ('removed', ''), ('renamed', '')])
+            if record is not None:
+                row['hash'] = record['hash']
+                row['status'] = 'canonical' if record['hash'] == master_hash else 'variant'
+                if row['status'] == 'variant' and record['kind'] == master['kind'] == 'CodedValue':
+                    added, removed, renamed = compare_values(master['values'], record['values'])
+                    row['added'], row['removed'], row['renamed'] = (';'.join(codes) for codes in (added, removed, renamed))
+            drift.append(row)
+    return library, drift
+
+def similar_domains(library, threshold=0.8):
+    """Pairs of differently named coded value domains whose code sets overlap by at least threshold (Jaccard)
+
+    Candidates come from an inverted index of code -> domains, so only domains
+    sharing a code are compared. Identical content is reported via aliases instead.
+    """
+    code_sets = {name: frozenset(code for code, _ in canonical_values(entry['values']))
+                 for name, entry in library.items() if entry['kind'] == 'CodedValue' and entry['values']}
+    postings = defaultdict(list)
+    for name, codes in code_sets.items():
+        for code in codes:
+            postings[code].append(name)
+    
+    pairs = []
+    for name, codes in code_sets.items():
+        shared = Counter()
+        for code in codes:
+            for other in postings[code]:
+                if other > name:
+                    shared[other] += 1
+        for other, common in shared.items():
+            score = common / (len(codes) + len(code_sets[other]) - common)
+            if score >= threshold and library[name]['hash'] != library[other]['hash']:
+                pairs.append((name, other, round(score, 3)))
+    return sorted(pairs, key=lambda pair: (-pair[2], pair[0], pair[1]))
+
+def write_consolidation(library, drift, similar, output_dir):
+    """Write master_domains.json/.csv, domain_drift.csv and similar_domains.csv"""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    files = {name: output_dir / name for name in
+             ('master_domains.json', 'master_domains.csv', 'domain_drift.csv', 'similar_domains.csv')}
+    
+    with atomic_output(files['master_domains.json']) as tmp_path:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            # Coded values as {'name', 'code'} dicts, whole-number double codes as the XML writes them (1, not 1.0)
+            json.dump(library, f, indent=2, ensure_ascii=False, default=json_values)
+    with atomic_output(files['master_domains.csv']) as tmp_path:
+        with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['domain', 'kind', 'code', 'name', 'min_value', 'max_value', 'exports', 'variants'])
+            for name, entry in library.items():
+                rows = [(code_text(value['code']), value['name'], '', '') for value in entry['values']] or \
+                    [('', '', entry['min_value'] or '', entry['max_value'] or '')]
+                for code, value_name, min_value, max_value in rows:
+                    writer.writerow([name, entry['kind'], code, value_name, min_value, max_value,
+                                     entry['exports'], entry['variants']])
+    with atomic_output(files['domain_drift.csv']) as tmp_path:
+        with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=['domain', 'export', 'status', 'hash', 'added', 'removed', 'renamed'])
+            writer.writeheader()
+            writer.writerows(drift)
+    with atomic_output(files['similar_domains.csv']) as tmp_path:
+        with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['domain', 'similar_domain', 'jaccard'])
+            writer.writerows(similar)
+    return list(files.values())
+
+def consolidate_exports(sources, output_dir, threshold=0.8):
+    """Collect, consolidate and write the library and reports for every export under sources"""
+    exports = discover_exports(sources)
+    records, failed = collect_domains(exports)
+    failed_exports = {export for export, _ in failed}
+    library, drift = consolidate(records, [export for export in exports if str(export) not in failed_exports])
+    similar = similar_domains(library, threshold)
+    written = write_consolidation(library, drift, similar, output_dir)
+    summary = {
+        'exports': len(exports),
+        'domain_records': len(records),
+        'distinct_contents': len({record['hash'] for record in records}),
+        'domains': len(library),
+        'drifting_domains': sum(1 for entry in library.values() if entry['variants'] > 1),
+        'similar_pairs': len(similar),
+        'failed': failed
+    }
+    return summary, written
\ No newline at end of file
@@ -0,0 +1,213 @@
+"""
+Bulk code <-> name translation for coded value domains
+Compiles each coded value domain once into parallel code and name arrays with
+lookup indexes, then translates whole columns at a time: pandas Categorical or
+NumPy take when available, a plain dict lookup otherwise. CSV files are streamed
+in chunks of rows, so files larger than memory can be decoded.
+"""
+
+import csv
+import time
+from collections import OrderedDict
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+from extraction_pipeline import load_schema
+from validate_records import resolve_columns
+from coded_values import code_text
+
+DIRECTIONS = ('to-name', 'to-code')
+
+def available_backends():
+    """Backends usable in this environment, fastest first"""
+    backends = []
+    if pd is not None:
+        backends.append('pandas')
+    if np is not None:
+        backends.append('numpy')
+    backends.append('python')
+    return backends
+
+def compile_codec(domain_info):
+    """Compile one coded value domain into code/name arrays and lookup indexes
+
+    If several codes share a display name, encoding that name yields the first code.
+    Codes are indexed by their text form, as they appear in CSV columns.
+    """
+    codes = [code_text(value['code']) for value in domain_info['values']]
+    names = [value['name'] for value in domain_info['values']]
+    code_index = {}
+    name_index = {}
+    for i, (code, name) in enumerate(zip(codes, names)):
+        code_index.setdefault(code, i)
+        name_index.setdefault(name, i)
+    codec = {
+        'domain_name': domain_info.get('domain_name') or domain_info.get('name'),
+        'codes': codes,
+        'names': names,
+        'to-name': (code_index, names),
+        'to-code': (name_index, codes),
+    }
+    if np is not None:
+        # Targets with a trailing slot so index -1 (unknown) stays in bounds
+        codec['arrays'] = {
+            'to-name': (np.array(list(code_index.values()), dtype=np.intp), np.array(names + [''], dtype=object)),
+            'to-code': (np.array(list(name_index.values()), dtype=np.intp), np.array(codes + [''], dtype=object)),
+        }
+        integer_codes = [int(code) for code in code_index if code.lstrip('-').isdigit() and str(int(code)) == code]
+        if integer_codes and len(integer_codes) == len(code_index) and max(integer_codes) - min(integer_codes) < 1000000:
+            # Dense code -> position table so integer code columns decode with a single take
+            low = min(integer_codes)
+            table = np.full(max(integer_codes) - low + 1, -1, dtype=np.intp)
+            for code, position in code_index.items():
+                table[int(code) - low] = position
+            codec['integer_table'] = (low, table)
+    return codec
+
+def load_field_codecs(xml_file, class_name="Building_A", fields=None):
+    """Compile codecs for the coded value domain fields of a feature class
+
+    Returns field name -> codec, optionally limited to the given field names.
+    """
+    schema = load_schema(xml_file, [class_name])
+    if class_name not in schema['classes']:
+        raise KeyError(f"Feature class {class_name} not found in {xml_file}")
+    codecs = OrderedDict()
+    for field_name, domain_info in schema['classes'][class_name]['fields_with_domains'].items():
+        if domain_info['domain_type'] != 'CodedValue':
+            continue
+        if fields is None or field_name in fields:
+            codecs[field_name] = compile_codec(domain_info)
+    return codecs
+
+def is_integer_array(values):
+    return np is not None and isinstance(values, np.ndarray) and values.dtype.kind in 'iu'
+
+def choose_backend(values, codec, direction):
+    """pandas when installed; NumPy for integer code arrays; the dict lookup otherwise
+
+    For plain lists of strings (such as CSV columns) a dict lookup beats building
+    NumPy string arrays, so NumPy is only picked where it can use a single take.
+    """
+    if pd is not None:
+        return 'pandas'
+    if direction == 'to-name' and 'integer_table' in codec and is_integer_array(values):
+        return 'numpy'
+    return 'python'
+
+def lookup_indexes(values, codec, direction, backend):
+    """Return an integer array mapping each value to its target position (-1 if unknown)"""
+    index, _ = codec[direction]
+    positions, _ = codec['arrays'][direction]
+    if direction == 'to-name' and 'integer_table' in codec and is_integer_array(values):
+        low, table = codec['integer_table']
+        offsets = values.astype(np.int64) - low
+        inside = (offsets >= 0) & (offsets < len(table))
+        return np.where(inside, table[np.where(inside, offsets, 0)], -1)
+    if backend == 'pandas':
+        category_codes = pd.Categorical(values, categories=list(index)).codes
+        return np.where(category_codes >= 0, positions[category_codes], -1)
+    # Map only the distinct values, then broadcast back with one take
+    uniques, inverse = np.unique(np.asarray(values, dtype=str), return_inverse=True)
+    unique_positions = np.array([index.get(value, -1) for value in uniques.tolist()], dtype=np.intp)
+    return unique_positions[inverse.reshape(-1)]
+
+def translate_column(values, codec, direction='to-name', backend=None, unknown='keep'):
+    """Translate a whole column of codes to names (or names to codes)
+
+    values may be any sequence of strings, or a NumPy integer array for domains
+    with integer codes. Values that are not in the domain are kept as they are (unknown='keep') or
+    replaced by '' (unknown='blank'); empty values stay empty. Returns the
+    translated list and the number of non-empty unknown values.
+    """
+    if direction not in DIRECTIONS:
+        raise ValueError(f"Unknown direction {direction}; choose from {', '.join(DIRECTIONS)}")
+    backend = backend or choose_backend(values, codec, direction)
+    if backend not in available_backends():
+        raise ValueError(f"Backend {backend} is not available; choose from {', '.join(available_backends())}")
+    if len(values) == 0:
+        return [], 0
+    
+    if backend == 'python':
+        index, targets = codec[direction]
+        if is_integer_array(values):
+            values = [str(value) for value in values.tolist()]
+        translated = []
+        unknown_count = 0
+        for value in values:
+            position = index.get(value)
+            if position is not None:
+                translated.append(targets[position])
+            else:
+                if value not in ('', None):
+                    unknown_count += 1
+                translated.append(value if unknown == 'keep' or value in ('', None) else '')
+        return translated, unknown_count
+    
+    positions = lookup_indexes(values, codec, direction, backend)
+    _, targets = codec['arrays'][direction]
+    translated = targets[positions]
+    missing = np.flatnonzero(positions < 0)
+    unknown_count = 0
+    for i in missing.tolist():
+        # Only unknown values are touched individually
+        value = values[i].item() if is_integer_array(values) else values[i]
+        if value not in ('', None):
+            unknown_count += 1
+            translated[i] = str(value) if unknown == 'keep' else ''
+        else:
+            translated[i] = value
+    return translated.tolist(), unknown_count
+
+def decode_records(records_file, codecs, output_file, direction='to-name', backend=None, unknown='keep',
+                   chunk_size=100000):
+    """Stream a CSV file and translate every column that has a codec, chunk by chunk
+
+    Columns are matched to fields like validation headers (exact, then
+    case-insensitive). Returns a summary with per-field unknown counts.
+    """
+    start = time.perf_counter()
+    summary = {'records': str(records_file), 'direction': direction, 'backend': backend or 'auto', 'rows': 0,
+               'columns': OrderedDict()}
+    
+    with open(records_file, newline='', encoding='utf-8-sig') as source, \
+            open(output_file, 'w', newline='', encoding='utf-8') as target:
+        reader = csv.reader(source)
+        writer = csv.writer(target)
+        header = next(reader, [])
+        writer.writerow(header)
+        resolved = resolve_columns(header, codecs)
+        columns = [(index, field) for index, field in enumerate(resolved) if field is not None]
+        for _, field in columns:
+            summary['columns'][field] = 0
+        
+        def flush(rows):
+            for index, field in columns:
+                column = [row[index] if index < len(row) else '' for row in rows]
+                translated, unknown_count = translate_column(column, codecs[field], direction, backend, unknown)
+                summary['columns'][field] += unknown_count
+                for row, value in zip(rows, translated):
+                    if index < len(row):
+                        row[index] = value
+            writer.writerows(rows)
+            summary['rows'] += len(rows)
+        
+        rows = []
+        for row in reader:
+            rows.append(row)
+            if len(rows) >= chunk_size:
+                flush(rows)
+                rows = []
+        if rows:
+            flush(rows)
+    
+    summary['elapsed_s'] = round(time.perf_counter() - start, 3)
+    return summary
\ No newline at end of file
@@ -0,0 +1,311 @@
+"""
+JSON Schema export with a precompiled validator
+Describes a feature class as a JSON Schema (draft 2020-12) for web data-entry
+forms: enum for coded values, minimum/maximum for range domains, maxLength from
+Length and required for non-nullable fields. compile_json_schema turns such a
+schema into a validator with enums as hashed sets and per-property checks built
+once, instead of walking the schema for every record.
+"""
+
+import json
+import re
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from validate_records import INTEGER_LIMITS, REAL_TYPES, GUID_TYPES, GUID_PATTERN, compile_field_rules
+
+SCHEMA_DIALECT = "https://json-schema.org/draft/2020-12/schema"
+# Checked in this order by both validators so their error lists agree
+KEYWORDS = ('type', 'enum', 'minimum', 'maximum', 'maxLength', 'pattern', 'format')
+
+def json_type(field_type):
+    if field_type in INTEGER_LIMITS:
+        return 'integer'
+    if field_type in REAL_TYPES:
+        return 'number'
+    return 'string'
+
+def typed_code(code, field_type):
+    """A coded value as the JSON value a form would submit for the field
+
+    Codes that do not convert without loss (2.5 on an integer field, text, None)
+    are kept as they are.
+    """
+    try:
+        if field_type in INTEGER_LIMITS:
+            if isinstance(code, float):
+                return int(code) if code.is_integer() else code
+            return int(code)
+        if field_type in REAL_TYPES:
+            return float(code)
+    except (TypeError, ValueError):
+        pass
+    return code
+
+def build_json_schema(class_name, class_model):
+    """Return the JSON Schema of one feature class as an OrderedDict"""
+    properties = OrderedDict()
+    required = []
+    aliases = {metadata['name']: metadata['alias_name'] for metadata in class_model['metadata']}
+    names = {name: domain for name, domain in class_model['fields_with_domains'].items()
+             if domain['domain_type'] == 'CodedValue'}
+    for name, rule in compile_field_rules(class_model).items():
+        base_type = json_type(rule['type'])
+        prop = OrderedDict()
+        prop['title'] = aliases.get(name) or name
+        prop['type'] = [base_type, 'null'] if rule['nullable'] else base_type
+        if rule['codes'] is not None:
+            prop['enum'] = [typed_code(code, rule['type']) for code in rule['codes']]
+            prop['x-enumNames'] = [value['name'] for value in names[name]['values']]
+            if rule['nullable']:
+                # enum applies to null too, so a nullable field lists it explicitly, with an empty name
+                prop['enum'].append(None)
+                prop['x-enumNames'].append('')
+        if rule['min'] is not None:
+            prop['minimum'] = rule['min']
+        if rule['max'] is not None:
+            prop['maximum'] = rule['max']
+        if rule['length']:
+            prop['maxLength'] = rule['length']
+        if rule['type'] == 'esriFieldTypeDate':
+            prop['format'] = 'date-time'
+        elif rule['type'] in GUID_TYPES:
+            prop['pattern'] = GUID_PATTERN.pattern
+        properties[name] = prop
+        if not rule['nullable']:
+            required.append(name)
+    
+    return OrderedDict([
+        ('$schema', SCHEMA_DIALECT),
+        ('title', class_name),
+        ('type', 'object'),
+        ('properties', properties),
+        ('required', required),
+    ])
+
+def export_json_schema(schema, output_file):
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(schema, f, indent=2, ensure_ascii=False)
+
+def is_type(value, name):
+    """JSON type test: booleans are not numbers and 1.0 is an integer"""
+    cls = value.__class__
+    if name == 'string':
+        return cls is str
+    if name == 'null':
+        return value is None
+    if name == 'integer':
+        return cls is int or (cls is float and value.is_integer())
+    if name == 'number':
+        return cls is int or cls is float
+    if name == 'boolean':
+        return cls is bool
+    if name == 'object':
+        return isinstance(value, dict)
+    if name == 'array':
+        return isinstance(value, list)
+    return False
+
+# RFC 3339 date-time: a time and a UTC offset are required, unlike datetime.fromisoformat
+DATE_TIME_PATTERN = re.compile(r'\d{4}-\d{2}-\d{2}[Tt ]\d{2}:\d{2}:\d{2}(\.\d+)?([Zz]|[+-]\d{2}:\d{2})', re.ASCII)
+
+def is_date_time(value):
+    if not DATE_TIME_PATTERN.fullmatch(value):
+        return False
+    try:
+        # The pattern checks the shape; this checks the ranges (month 13, Feb 30, 25:00)
+        datetime.fromisoformat(value[:-1] + '+00:00' if value[-1] in 'Zz' else value)
+    except ValueError:
+        return False
+    return True
+
+FORMAT_CHECKERS = {'date-time': is_date_time}
+
+def json_equal(a, b):
+    return a == b and (a.__class__ is bool) == (b.__class__ is bool)
+
+def check_keyword(keyword, expected, value):
+    """Apply one keyword; keywords that do not apply to the value's type pass"""
+    if keyword == 'type':
+        return any(is_type(value, name) for name in (expected if isinstance(expected, list) else [expected]))
+    if keyword == 'enum':
+        return any(json_equal(value, item) for item in expected)
+    numeric = value.__class__ in (int, float)
+    if keyword == 'minimum':
+        return not numeric or value >= expected
+    if keyword == 'maximum':
+        return not numeric or value <= expected
+    if keyword == 'maxLength':
+        return value.__class__ is not str or len(value) <= expected
+    if keyword == 'pattern':
+        return value.__class__ is not str or re.search(expected, value) is not None
+    if keyword == 'format':
+        checker = FORMAT_CHECKERS.get(expected)
+        return value.__class__ is not str or checker is None or checker(value)
+    return True
+
+def validate_naive(record, schema):
+    """Reference validator that walks the schema for every record
+
+    Returns a list of (property, keyword) violations; a missing required property
+    is reported as (property, 'required').
+    """
+    errors = []
+    for name, prop in schema['properties'].items():
+        if name not in record:
+            continue
+        value = record[name]
+        for keyword in KEYWORDS:
+            if keyword in prop and not check_keyword(keyword, prop[keyword], value):
+                errors.append((name, keyword))
+    for name in schema.get('required', ()):
+        if name not in record:
+            errors.append((name, 'required'))
+    return errors
+
+def compile_type_check(expected):
+    names = set(expected if isinstance(expected, list) else [expected])
+    classes = set()
+    if 'string' in names:
+        classes.add(str)
+    if 'null' in names:
+        classes.add(type(None))
+    if 'number' in names or 'integer' in names:
+        classes.add(int)
+    if 'boolean' in names:
+        classes.add(bool)
+    if 'number' in names:
+        classes.add(float)
+    classes = frozenset(classes)
+    if 'integer' in names and 'number' not in names:
+        return lambda value: value.__class__ in classes or (value.__class__ is float and value.is_integer())
+    if names & {'object', 'array'}:
+        return lambda value: any(is_type(value, name) for name in names)
+    return lambda value: value.__class__ in classes
+
+def compile_enum_check(expected):
+    if any(item.__class__ is bool or isinstance(item, (dict, list)) for item in expected):
+        return lambda value: check_keyword('enum', expected, value)
+    members = frozenset(expected)
+    
+    def check(value):
+        try:
+            return value.__class__ is not bool and value in members
+        except TypeError:  # objects and arrays are never members
+            return False
+    
+    return check
+
+def compile_keyword(keyword, expected):
+    """Precompiled predicate for one keyword, equivalent to check_keyword"""
+    if keyword == 'type':
+        return compile_type_check(expected)
+    if keyword == 'enum':
+        return compile_enum_check(expected)
+    if keyword == 'minimum':
+        return lambda value: value.__class__ not in (int, float) or value >= expected
+    if keyword == 'maximum':
+        return lambda value: value.__class__ not in (int, float) or value <= expected
+    if keyword == 'maxLength':
+        return lambda value: value.__class__ is not str or len(value) <= expected
+    if keyword == 'pattern':
+        search = re.compile(expected).search
+        return lambda value: value.__class__ is not str or search(value) is not None
+    if keyword == 'format' and expected in FORMAT_CHECKERS:
+        checker = FORMAT_CHECKERS[expected]
+        return lambda value: value.__class__ is not str or checker(value)
+    return None
+
+def compile_json_schema(schema):
+    """Build a validator function equivalent to validate_naive for one schema
+
+    Every property's keywords are compiled once into predicates (enums become
+    frozensets), so validating a record is a flat loop over the properties it has.
+    """
+    plan = []
+    for name, prop in schema['properties'].items():
+        checks = tuple((keyword, predicate) for keyword in KEYWORDS if keyword in prop
+                       for predicate in [compile_keyword(keyword, prop[keyword])] if predicate is not None)
+        if checks:
+            plan.append((name, checks))
+    plan = tuple(plan)
+    required = tuple(schema.get('required', ()))
+    missing = object()
+    
+    def validate(record):
+        errors = []
+        get = record.get
+        for name, checks in plan:
+            value = get(name, missing)
+            if value is missing:
+                continue
+            for keyword, predicate in checks:
+                if not predicate(value):
+                    errors.append((name, keyword))
+        for name in required:
+            if name not in record:
+                errors.append((name, 'required'))
+        return errors
+    
+    return validate
+
+def load_json_schema_validator(schema_file):
+    """Read an exported schema file and compile its validator"""
+    with open(schema_file, encoding='utf-8') as f:
+        return compile_json_schema(json.load(f))
+
+def coerce_record(record, schema):
+    """Convert a record of text values (CSV row or text NDJSON) to the JSON types of the schema
+
+    Empty strings become null; values that do not parse are left as text so
+    validation reports them.
+    """
+    typed = {}
+    for name, value in record.items():
+        prop = schema['properties'].get(name)
+        if prop is None or value.__class__ is not str:
+            typed[name] = value
+            continue
+        if value == '':
+            typed[name] = None
+            continue
+        base_type = prop['type'][0] if isinstance(prop['type'], list) else prop['type']
+        try:
+            if base_type == 'integer':
+                value = int(value)
+            elif base_type == 'number':
+                value = float(value)
+        except ValueError:
+            pass
+        typed[name] = value
+    return typed
+
+def benchmark_json_schema(schema, records, repeat=3):
+    """Time the naive and the compiled validator over the same records (best of repeat)
+
+    Both must return identical errors; returns timings, throughput and speedup.
+    """
+    validate = compile_json_schema(schema)
+    timings = {}
+    results = {}
+    for label, func in (('naive', lambda record: validate_naive(record, schema)), ('compiled', validate)):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            errors = [func(record) for record in records]
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        timings[label] = best
+        results[label] = errors
+    if results['naive'] != results['compiled']:
+        raise AssertionError("compiled validator disagrees with the naive validator")
+    return {
+        'records': len(records),
+        'invalid_records': sum(1 for errors in results['compiled'] if errors),
+        'naive_s': round(timings['naive'], 4),
+        'compiled_s': round(timings['compiled'], 4),
+        'naive_records_per_s': round(len(records) / timings['naive']) if timings['naive'] else None,
+        'compiled_records_per_s': round(len(records) / timings['compiled']) if timings['compiled'] else None,
+        'speedup': round(timings['naive'] / timings['compiled'], 1) if timings['compiled'] else None
+    }
\ No newline at end of file
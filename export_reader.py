@@ -0,0 +1,355 @@
+"""
+Compressed, archived and piped export input
+Detects gzip, bzip2, xz, zip and (with the zstandard package) zstd exports by
+their magic bytes and streams the decompressed XML into the parser without
+writing it to disk. A reader thread decompresses ahead of the parser into a
+bounded queue; zlib, bz2 and lzma release the GIL while inflating, so
+decompression overlaps with parsing. Exports piped to stdin or passed as file
+objects are parsed incrementally with XMLPullParser as the bytes arrive.
+"""
+
+import bz2
+import gzip
+import lzma
+import os
+import queue
+import sys
+import threading
+import time
+import xml.etree.ElementTree as ET
+import zipfile
+from collections import OrderedDict
+from pathlib import Path
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+MAGIC_BYTES = (
+    (b'\x1f\x8b', 'gzip'),
+    (b'BZh', 'bzip2'),
+    (b'\xfd7zXZ\x00', 'xz'),
+    (b'PK\x03\x04', 'zip'),
+    (b'\x28\xb5\x2f\xfd', 'zstd'),
+)
+COMPRESSED_SUFFIXES = ('.gz', '.bz2', '.xz', '.zip', '.zst')
+STANDARD_EXPORT_NAME = 'database_export.xml'
+STDIN = '-'
+XSI_TYPE = '{http://www.w3.org/2001/XMLSchema-instance}type'
+CHUNK_SIZE = 1 << 20
+# Decompressed chunks the reader thread may queue ahead of the parser
+READ_AHEAD = 8
+
+def compression_of(head):
+    """'gzip', 'bzip2', 'xz', 'zip', 'zstd' or None for a plain export, from its first bytes"""
+    for magic, name in MAGIC_BYTES:
+        if head.startswith(magic):
+            return name
+    return None
+
+def detect_compression(path):
+    with open(path, 'rb') as f:
+        return compression_of(f.read(8))
+
+def zip_member(archive, member=None):
+    """The export inside a zip bundle: member if given, else DATABASE_EXPORT.XML or the largest .xml file"""
+    if member is not None:
+        return archive.getinfo(member)
+    candidates = [info for info in archive.infolist()
+                  if not info.is_dir() and info.filename.lower().endswith('.xml')]
+    if not candidates:
+        raise KeyError(f"no .xml export in {archive.filename}")
+    standard = [info for info in candidates if Path(info.filename).name.lower() == STANDARD_EXPORT_NAME]
+    return max(standard or candidates, key=lambda info: info.file_size)
+
+def open_decompressed(raw, compression, member=None):
+    """Wrap the raw binary file in a reader yielding the decompressed export"""
+    if compression == 'gzip':
+        return gzip.GzipFile(fileobj=raw)
+    if compression == 'bzip2':
+        return bz2.BZ2File(raw)
+    if compression == 'xz':
+        return lzma.LZMAFile(raw)
+    if compression == 'zip':
+        archive = zipfile.ZipFile(raw)
+        return archive.open(zip_member(archive, member))
+    if compression == 'zstd':
+        if zstandard is None:
+            raise ImportError("zstd exports require the zstandard package (pip install zstandard)")
+        return zstandard.ZstdDecompressor().stream_reader(raw)
+    return raw
+
+class ExportStream:
+    """Read-only binary file object over the decompressed export
+
+    Chunks are decompressed on a reader thread and handed over through a queue of
+    at most read_ahead chunks, so memory stays bounded however large the export.
+    Decompression errors (corrupt or truncated archives) are raised from read()
+    as OSError.
+    """
+    
+    def __init__(self, path, member=None, read_ahead=READ_AHEAD, chunk_size=CHUNK_SIZE, progress=None):
+        self.path = Path(path)
+        self.progress = progress
+        self.compression = detect_compression(path)
+        self.input_bytes = self.path.stat().st_size
+        self.output_bytes = 0
+        self.decompress_s = 0.0
+        self.wait_s = 0.0
+        self.started = time.perf_counter()
+        self.finished = None
+        self.chunks = queue.Queue(maxsize=read_ahead)
+        self.buffer = b''
+        self.offset = 0
+        self.error = None
+        self._stop = threading.Event()
+        self._raw = open(path, 'rb')
+        try:
+            self._source = open_decompressed(self._raw, self.compression, member)
+        except (zipfile.BadZipFile, KeyError) as exc:
+            self._raw.close()
+            raise OSError(f"Cannot open {path} as a {self.compression} export: {exc}") from exc
+        except BaseException:
+            self._raw.close()
+            raise
+        self._thread = threading.Thread(target=self._produce, args=(chunk_size,), daemon=True)
+        self._thread.start()
+    
+    def _put(self, item):
+        while not self._stop.is_set():
+            try:
+                self.chunks.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+    
+    def _produce(self, chunk_size):
+        try:
+            while not self._stop.is_set():
+                start = time.thread_time()
+                chunk = self._source.read(chunk_size)
+                self.decompress_s += time.thread_time() - start
+                if not chunk:
+                    break
+                self.output_bytes += len(chunk)
+                self._put(chunk)
+        except Exception as exc:
+            self.error = exc
+        finally:
+            self._put(None)
+    
+    def _next_chunk(self):
+        if self.finished is not None:
+            return b''
+        start = time.perf_counter()
+        chunk = self.chunks.get()
+        self.wait_s += time.perf_counter() - start
+        if chunk is None:
+            self.finished = time.perf_counter()
+            if self.error is not None:
+                if isinstance(self.error, OSError):
+                    raise self.error
+                raise OSError(f"Cannot decompress {self.path}: {self.error}") from self.error
+            return b''
+        if self.progress is not None:
+            # Position in the compressed file, as far as the reader thread has got
+            self.progress.advance(self._raw.tell(), chunk)
+        return chunk
+
+    def read(self, size=-1):
+        """Up to size decompressed bytes (fewer at chunk boundaries); b'' at the end of the export"""
+        if size is None or size < 0:
+            parts = []
+            while True:
+                part = self.read(CHUNK_SIZE)
+                if not part:
+                    return b''.join(parts)
+                parts.append(part)
+        if self.offset >= len(self.buffer):
+            self.buffer = self._next_chunk()
+            self.offset = 0
+        data = self.buffer[self.offset:self.offset + size]
+        self.offset += len(data)
+        return data
+    
+    def readable(self):
+        return True
+    
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+        self._source.close()
+        self._raw.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def stats(self):
+        """Throughput of the read so far
+
+        decompress_s is the reader thread's CPU time; overlap_s is the part of it
+        hidden behind parsing, i.e. minus the time the parser sat waiting for data.
+        """
+        wall = (self.finished or time.perf_counter()) - self.started
+        return read_stats(self.compression, self.input_bytes, self.output_bytes, wall,
+                          self.decompress_s, self.wait_s)
+
+def read_stats(compression, input_bytes, output_bytes, wall_s, decompress_s=0.0, wait_s=0.0):
+    mb = 1024 * 1024
+    return OrderedDict([
+        ('compression', compression),
+        ('input_mb', round(input_bytes / mb, 2)),
+        ('output_mb', round(output_bytes / mb, 2)),
+        ('ratio', round(output_bytes / input_bytes, 2) if input_bytes else None),
+        ('wall_s', round(wall_s, 4)),
+        ('decompress_s', round(decompress_s, 4)),
+        ('parser_wait_s', round(wait_s, 4)),
+        ('overlap_s', round(max(decompress_s - wait_s, 0.0), 4)),
+        ('input_mb_per_s', round(input_bytes / mb / wall_s, 1) if wall_s else None),
+        ('output_mb_per_s', round(output_bytes / mb / wall_s, 1) if wall_s else None),
+    ])
+
+def is_stream(xml_file):
+    """True for '-' (stdin) and file objects, which cannot be reopened, mapped or seeked"""
+    return xml_file == STDIN or hasattr(xml_file, 'read')
+
+class StreamReader:
+    """Binary reader over stdin, a pipe or a file object that counts bytes and can peek at the first ones"""
+    
+    def __init__(self, source):
+        if source == STDIN:
+            source = sys.stdin
+        # Text streams (sys.stdin, open(..., 'r')) carry their bytes in .buffer
+        self.source = getattr(source, 'buffer', source)
+        self.head = b''
+        self.bytes_read = 0
+    
+    def peek(self, size=8):
+        while len(self.head) < size:
+            data = self.source.read(size - len(self.head))
+            if not data:
+                break
+            self.bytes_read += len(data)
+            self.head += data
+        return self.head
+    
+    def read(self, size=-1):
+        if self.head:
+            data, self.head = self.head, b''
+            if size is not None and 0 <= size < len(data):
+                data, self.head = data[:size], data[size:]
+            return data
+        data = self.source.read(size)
+        self.bytes_read += len(data)
+        return data
+    
+    def readable(self):
+        return True
+
+def is_feature_class(elem):
+    return elem.tag == 'DataElement' and elem.get(XSI_TYPE) == 'esri:DEFeatureClass'
+
+def parse_incremental(source, class_names=None, chunk_size=CHUNK_SIZE, stats=None, progress=None):
+    """Parse an export from stdin ('-') or a binary file object chunk by chunk; returns the root
+
+    Chunks are parsed as they arrive, so extraction overlaps with the process still
+    writing the stream. Compressed streams are detected as for files (zip bundles
+    need a seekable file). With class_names, an XMLPullParser's events drop every
+    feature class that was not requested as soon as it is complete, so memory holds
+    the domains and the requested classes rather than the whole export.
+    """
+    start = time.perf_counter()
+    reader = StreamReader(source)
+    compression = compression_of(reader.peek())
+    if compression == 'zip':
+        raise OSError("zip bundles cannot be read from a stream; pass the archive path instead")
+    data_source = open_decompressed(reader, compression)
+    wanted = set(class_names) if class_names is not None else None
+    # Without classes to prune no events are needed, and the plain feed parser avoids their cost
+    parser = ET.XMLPullParser(events=('start', 'end')) if wanted is not None else ET.XMLParser()
+    root = None
+    stack = []
+    output_bytes = 0
+    try:
+        while True:
+            chunk = data_source.read(chunk_size)
+            if not chunk:
+                break
+            output_bytes += len(chunk)
+            parser.feed(chunk)
+            if progress is not None:
+                progress.advance(reader.bytes_read, chunk)
+            if wanted is None:
+                continue
+            for event, elem in parser.read_events():
+                if event == 'start':
+                    if root is None:
+                        root = elem
+                    stack.append(elem)
+                    continue
+                stack.pop()
+                if stack and is_feature_class(elem):
+                    name = elem.find('Name')
+                    if name is None or name.text not in wanted:
+                        stack[-1].remove(elem)
+        if wanted is None:
+            root = parser.close()
+        else:
+            parser.close()
+    except EOFError as exc:  # truncated compressed stream
+        raise OSError(f"Cannot decompress stream: {exc}") from exc
+    if stats is not None:
+        stats.update(read_stats(compression, reader.bytes_read, output_bytes, time.perf_counter() - start))
+    return root
+
+class ProgressFile:
+    """Binary file wrapper advancing a progress reporter on every read
+
+    ET.parse reads a file object in 64 KB blocks through its C fast path, which is
+    faster than feeding chunks to XMLParser from Python, so progress hooks in here.
+    """
+    
+    def __init__(self, f, progress):
+        self.f = f
+        self.progress = progress
+    
+    def read(self, size=-1):
+        data = self.f.read(size)
+        self.progress.advance(self.f.tell(), data)
+        return data
+
+def parse_export(xml_file, member=None, stats=None, progress=None):
+    """ET.parse for plain, compressed and zipped exports; returns the ElementTree
+
+    member selects the export inside a zip bundle. '-' and file objects are parsed
+    incrementally (see parse_incremental). If stats is a dict it is filled with
+    the read's throughput (see ExportStream.stats); progress is a
+    progress.ProgressReporter advanced once per chunk.
+    """
+    if is_stream(xml_file):
+        return ET.ElementTree(parse_incremental(xml_file, stats=stats, progress=progress))
+    start = time.perf_counter()
+    if detect_compression(xml_file) is None:
+        if progress is None:
+            tree = ET.parse(xml_file)
+        else:
+            with open(xml_file, 'rb') as f:
+                tree = ET.parse(ProgressFile(f, progress))
+        if stats is not None:
+            size = os.path.getsize(xml_file)
+            stats.update(read_stats(None, size, size, time.perf_counter() - start))
+        return tree
+    with ExportStream(xml_file, member, progress=progress) as stream:
+        tree = ET.parse(stream)
+        if stats is not None:
+            stats.update(stream.stats())
+    return tree
+
+def strip_compression_suffix(path):
+    """DATABASE_EXPORT.XML.gz -> DATABASE_EXPORT.XML; other paths unchanged"""
+    path = Path(path)
+    return path.with_suffix('') if path.suffix.lower() in COMPRESSED_SUFFIXES else path
\ No newline at end of file
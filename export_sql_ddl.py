@@ -0,0 +1,162 @@
+"""
+SQL DDL generation for PostgreSQL and SQLite
+Turns a feature class model into CREATE TABLE statements so the database enforces
+the schema itself: esriFieldType mapped to SQL types with Length, Precision, Scale
+and nullability, coded value domains as lookup tables referenced by foreign keys,
+range domains as CHECK constraints, plus a bulk-load script for the lookup tables.
+"""
+
+import hashlib
+import math
+import re
+from collections import OrderedDict
+
+from coded_values import code_text
+
+DIALECTS = ('postgresql', 'sqlite')
+
+# PostgreSQL truncates longer identifiers silently
+MAX_IDENTIFIER_LENGTH = 63
+INSERT_BATCH_SIZE = 500
+SQL_NUMBER = re.compile(r'[+-]?(\d+(\.\d*)?|\.\d+)([eE][+-]?\d+)?')
+
+SQL_TYPES = {
+    'esriFieldTypeOID': ('INTEGER', 'INTEGER'),
+    'esriFieldTypeSmallInteger': ('SMALLINT', 'SMALLINT'),
+    'esriFieldTypeInteger': ('INTEGER', 'INTEGER'),
+    'esriFieldTypeBigInteger': ('BIGINT', 'BIGINT'),
+    'esriFieldTypeSingle': ('REAL', 'REAL'),
+    'esriFieldTypeDouble': ('DOUBLE PRECISION', 'REAL'),
+    'esriFieldTypeString': ('TEXT', 'TEXT'),
+    'esriFieldTypeDate': ('TIMESTAMP', 'TIMESTAMP'),
+    'esriFieldTypeGUID': ('UUID', 'TEXT'),
+    'esriFieldTypeGlobalID': ('UUID', 'TEXT'),
+    'esriFieldTypeGeometry': ('BYTEA', 'BLOB'),
+    'esriFieldTypeBlob': ('BYTEA', 'BLOB'),
+    'esriFieldTypeRaster': ('BYTEA', 'BLOB'),
+    'esriFieldTypeXML': ('XML', 'TEXT'),
+}
+NUMERIC_CODE_TYPES = ('esriFieldTypeSmallInteger', 'esriFieldTypeInteger', 'esriFieldTypeBigInteger',
+                      'esriFieldTypeSingle', 'esriFieldTypeDouble')
+
+def quote_identifier(name):
+    """Double-quoted identifier, shortened with a hash suffix if PostgreSQL would truncate it"""
+    if len(name.encode('utf-8')) > MAX_IDENTIFIER_LENGTH:
+        digest = hashlib.sha1(name.encode('utf-8')).hexdigest()[:8]
+        name = f"{name.encode('utf-8')[:MAX_IDENTIFIER_LENGTH - 9].decode('utf-8', 'ignore')}_{digest}"
+    return '"' + name.replace('"', '""') + '"'
+
+def quote_literal(value):
+    return "'" + str(value).replace("'", "''") + "'"
+
+def is_sql_number(value):
+    """True if the value can be written as a bare SQL number
+
+    float() also accepts inf, nan, 1e400 and 1_000, which SQL would read as
+    identifiers or reject, so only finite plain decimal notation qualifies.
+    """
+    text = str(value).strip()
+    return bool(SQL_NUMBER.fullmatch(text)) and math.isfinite(float(text))
+
+def number_literal(value):
+    """The value as an SQL number if it is a finite number, otherwise a quoted string"""
+    if not is_sql_number(value):
+        return quote_literal(value)
+    return str(value).strip()
+
+def lookup_table_name(domain_name):
+    return f"lut_{domain_name}"
+
+def column_type(field_type, length, precision, scale, dialect):
+    """SQL type for an esriFieldType with its Length, Precision and Scale"""
+    pg_type, sqlite_type = SQL_TYPES.get(field_type, ('TEXT', 'TEXT'))
+    sql_type = pg_type if dialect == 'postgresql' else sqlite_type
+    if field_type == 'esriFieldTypeString' and length > 0:
+        return f"VARCHAR({length})"
+    if field_type in ('esriFieldTypeSingle', 'esriFieldTypeDouble') and precision > 0:
+        return f"NUMERIC({precision}, {scale})"
+    return sql_type
+
+def to_int(value):
+    return int(value) if str(value or '').strip().lstrip('-').isdigit() else 0
+
+def collect_lookup_domains(class_model):
+    """Coded value domains bound to the class's fields: domain name -> code type and values"""
+    lookups = OrderedDict()
+    for metadata in class_model['metadata']:
+        domain = class_model['fields_with_domains'].get(metadata['name'])
+        if domain is None or domain['domain_type'] != 'CodedValue' or domain['domain_name'] in lookups:
+            continue
+        lookups[domain['domain_name']] = {
+            'code_type': metadata.get('domain_field_type') or metadata['type'],
+            'values': domain['values']
+        }
+    return lookups
+
+def range_check(column, domain):
+    """CHECK expression for a range domain; NULL passes as in the geodatabase"""
+    bounds = []
+    # A bound that is not a finite number (inf, nan) constrains nothing and is left out
+    if domain['min_value'] not in (None, '') and is_sql_number(domain['min_value']):
+        bounds.append(f"{column} >= {number_literal(domain['min_value'])}")
+    if domain['max_value'] not in (None, '') and is_sql_number(domain['max_value']):
+        bounds.append(f"{column} <= {number_literal(domain['max_value'])}")
+    return ' AND '.join(bounds)
+
+def generate_table_ddl(class_name, class_model, dialect='postgresql'):
+    """CREATE TABLE statements for the class's lookup tables and the feature class table"""
+    if dialect not in DIALECTS:
+        raise ValueError(f"Unknown dialect {dialect}; choose from {', '.join(DIALECTS)}")
+    statements = [f"-- {class_name}: generated from the geodatabase schema ({dialect})"]
+    if dialect == 'sqlite':
+        statements.append("PRAGMA foreign_keys = ON;")
+    
+    for domain_name, lookup in collect_lookup_domains(class_model).items():
+        code_type = column_type(lookup['code_type'], 0, 0, 0, dialect)
+        statements.append(
+            f"CREATE TABLE IF NOT EXISTS {quote_identifier(lookup_table_name(domain_name))} (\n"
+            f"    \"code\" {code_type} PRIMARY KEY,\n"
+            f"    \"name\" TEXT NOT NULL\n"
+            f");"
+        )
+    
+    columns = []
+    for metadata in class_model['metadata']:
+        field_type = metadata['type']
+        column = quote_identifier(metadata['name'])
+        length = to_int(metadata['length'])
+        parts = [column, column_type(field_type, length, to_int(metadata['precision']), to_int(metadata['scale']), dialect)]
+        if field_type == 'esriFieldTypeOID':
+            parts.append("PRIMARY KEY")
+        if metadata['is_nullable'] == 'false' or field_type == 'esriFieldTypeOID':
+            parts.append("NOT NULL")
+        if dialect == 'sqlite' and field_type == 'esriFieldTypeString' and length > 0:
+            # SQLite accepts VARCHAR(n) but does not enforce the length
+            parts.append(f"CHECK (length({column}) <= {length})")
+        domain = class_model['fields_with_domains'].get(metadata['name'])
+        if domain is not None and domain['domain_type'] == 'CodedValue':
+            parts.append(f"REFERENCES {quote_identifier(lookup_table_name(domain['domain_name']))} (\"code\")")
+        elif domain is not None and range_check(column, domain):
+            parts.append(f"CHECK ({range_check(column, domain)})")
+        columns.append('    ' + ' '.join(parts))
+    statements.append(f"CREATE TABLE IF NOT EXISTS {quote_identifier(class_name)} (\n" + ',\n'.join(columns) + "\n);")
+    return '\n\n'.join(statements) + '\n'
+
+def generate_lookup_inserts(class_model, batch_size=INSERT_BATCH_SIZE):
+    """Bulk-load script filling the lookup tables; runs unchanged on PostgreSQL and SQLite
+
+    Multi-row INSERTs inside one transaction, with ON CONFLICT DO NOTHING so the
+    script can be re-run and codes repeated in a domain are loaded once.
+    """
+    lines = ["BEGIN;"]
+    for domain_name, lookup in collect_lookup_domains(class_model).items():
+        literal = number_literal if lookup['code_type'] in NUMERIC_CODE_TYPES else quote_literal
+        table = quote_identifier(lookup_table_name(domain_name))
+        values = lookup['values']
+        for start in range(0, len(values), batch_size):
+            rows = [f"    ({literal(code_text(value['code']))}, {quote_literal(value['name'] or '')})"
+                    for value in values[start:start + batch_size]]
+            lines.append(f"INSERT INTO {table} (\"code\", \"name\") VALUES\n" + ',\n'.join(rows) +
+                         "\nON CONFLICT DO NOTHING;")
+    lines.append("COMMIT;")
+    return '\n'.join(lines) + '\n'
\ No newline at end of file
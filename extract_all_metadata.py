@@ -4,12 +4,13 @@ Complete metadata extraction for all fields in Building_A feature class
 Captures every available metadata property for each field
 """
 
-import xml.etree.ElementTree as ET
 import csv
 import json
 from pathlib import Path
 from collections import OrderedDict
 
+from export_reader import parse_export
+
 def extract_complete_field_metadata(field, namespaces, all_domains):
     """Extract all possible metadata from a field definition"""
     
@@ -123,6 +124,42 @@ def parse_all_domains(root, namespaces):
     
     return domains
 
+def extract_feature_class_metadata(feature_class, namespaces, all_domains):
+    """Extract complete metadata for every field of a feature class"""
+    all_fields_metadata = []
+    
+    fields_array = feature_class.find(".//FieldArray[@xsi:type='esri:ArrayOfField']", namespaces)
+    if fields_array is None:
+        return None
+    
+    for field in fields_array.findall("Field[@xsi:type='esri:Field']", namespaces):
+        metadata = extract_complete_field_metadata(field, namespaces, all_domains)
+        all_fields_metadata.append(metadata)
+    
+    return all_fields_metadata
+
+def export_metadata_csv(all_fields_metadata, output_file):
+    """Export field metadata to CSV with one sorted column per property"""
+    with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
+        # Get all possible column names from all fields
+        all_columns = set()
+        for field_meta in all_fields_metadata:
+            all_columns.update(field_meta.keys())
+        
+        # Sort columns for consistent output
+        columns = sorted(list(all_columns))
+        
+        writer = csv.DictWriter(csvfile, fieldnames=columns)
+        writer.writeheader()
+        
+        for field_meta in all_fields_metadata:
+            writer.writerow(field_meta)
+
+def export_metadata_json(all_fields_metadata, output_file):
+    """Export field metadata to JSON for easier programmatic access"""
+    with open(output_file, 'w', encoding='utf-8') as jsonfile:
+        json.dump(all_fields_metadata, jsonfile, indent=2, ensure_ascii=False)
+
 def main():
     xml_file = Path("DATABASE_EXPORT.XML")
     metadata_csv = Path("building_a_complete_metadata.csv")
@@ -131,7 +168,7 @@ def main():
     print(f"Processing {xml_file}...")
     
     # Parse the XML file
-    tree = ET.parse(xml_file)
+    tree = parse_export(xml_file)
     root = tree.getroot()
     
     # Define namespaces
@@ -157,41 +194,21 @@ def main():
         return
     
     # Extract all fields with complete metadata
-    all_fields_metadata = []
-    
-    fields_array = building_a.find(".//FieldArray[@xsi:type='esri:ArrayOfField']", namespaces)
-    if fields_array is None:
+    all_fields_metadata = extract_feature_class_metadata(building_a, namespaces, all_domains)
+    if all_fields_metadata is None:
         print("No fields found in Building_A")
         return
     
-    for field in fields_array.findall("Field[@xsi:type='esri:Field']", namespaces):
-        metadata = extract_complete_field_metadata(field, namespaces, all_domains)
-        all_fields_metadata.append(metadata)
-    
     print(f"Extracted complete metadata for {len(all_fields_metadata)} fields")
     
     # Export to CSV
     if all_fields_metadata:
-        with open(metadata_csv, 'w', newline='', encoding='utf-8') as csvfile:
-            # Get all possible column names from all fields
-            all_columns = set()
-            for field_meta in all_fields_metadata:
-                all_columns.update(field_meta.keys())
-            
-            # Sort columns for consistent output
-            columns = sorted(list(all_columns))
-            
-            writer = csv.DictWriter(csvfile, fieldnames=columns)
-            writer.writeheader()
-            
-            for field_meta in all_fields_metadata:
-                writer.writerow(field_meta)
+        export_metadata_csv(all_fields_metadata, metadata_csv)
         
         print(f"Exported complete metadata to CSV: {metadata_csv}")
         
         # Export to JSON for easier programmatic access
-        with open(metadata_json, 'w', encoding='utf-8') as jsonfile:
-            json.dump(all_fields_metadata, jsonfile, indent=2, ensure_ascii=False)
+        export_metadata_json(all_fields_metadata, metadata_json)
         
         print(f"Exported complete metadata to JSON: {metadata_json}")
         
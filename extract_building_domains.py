@@ -4,43 +4,21 @@ Extract domain values from geodatabase XML for Building_A feature class
 and save them to CSV format for Palantir Foundry integration
 """
 
-import xml.etree.ElementTree as ET
 import csv
 import json
 from pathlib import Path
 
-def parse_geodatabase_xml(xml_file):
-    """Parse geodatabase XML and extract Building_A field domains"""
-    
-    # Parse the XML file
-    tree = ET.parse(xml_file)
-    root = tree.getroot()
-    
-    # Define namespaces
-    namespaces = {
-        'esri': 'http://www.esri.com/schemas/ArcGIS/10.8',
-        'xsi': 'http://www.w3.org/2001/XMLSchema-instance',
-        'xs': 'http://www.w3.org/2001/XMLSchema'
-    }
-    
-    # Find Building_A feature class
-    building_a = None
-    for feature_class in root.findall(".//DataElement[@xsi:type='esri:DEFeatureClass']", namespaces):
-        name_elem = feature_class.find("Name", namespaces)
-        if name_elem is not None and name_elem.text == "Building_A":
-            building_a = feature_class
-            break
-    
-    if not building_a:
-        print("Building_A feature class not found!")
-        return None
+from export_reader import parse_export
+from coded_values import code_text, decode_coded_values, json_code
+
+def extract_domain_fields(feature_class, namespaces):
+    """Collect the inline coded value and range domains declared on a feature class's fields"""
     
     # Extract fields with domains
     domain_fields = {}
     
-    fields_array = building_a.find(".//FieldArray[@xsi:type='esri:ArrayOfField']", namespaces)
+    fields_array = feature_class.find(".//FieldArray[@xsi:type='esri:ArrayOfField']", namespaces)
     if fields_array is None:
-        print("No fields found in Building_A")
         return None
     
     for field in fields_array.findall("Field[@xsi:type='esri:Field']", namespaces):
@@ -55,17 +33,8 @@ def parse_geodatabase_xml(xml_file):
         domain = field.find("Domain[@xsi:type='esri:CodedValueDomain']", namespaces)
         if domain:
             domain_name = domain.find("DomainName", namespaces).text
-            coded_values = []
-            
             values_array = domain.find("CodedValues[@xsi:type='esri:ArrayOfCodedValue']", namespaces)
-            if values_array:
-                for coded_value in values_array.findall("CodedValue[@xsi:type='esri:CodedValue']", namespaces):
-                    name = coded_value.find("Name", namespaces).text
-                    code = coded_value.find("Code", namespaces).text
-                    coded_values.append({
-                        'name': name,
-                        'code': code
-                    })
+            coded_values = decode_coded_values(values_array, namespaces)
             
             domain_fields[field_name] = {
                 'alias': field_alias,
@@ -91,6 +60,39 @@ def parse_geodatabase_xml(xml_file):
     
     return domain_fields
 
+def parse_geodatabase_xml(xml_file):
+    """Parse geodatabase XML and extract Building_A field domains"""
+    
+    # Parse the XML file
+    tree = parse_export(xml_file)
+    root = tree.getroot()
+    
+    # Define namespaces
+    namespaces = {
+        'esri': 'http://www.esri.com/schemas/ArcGIS/10.8',
+        'xsi': 'http://www.w3.org/2001/XMLSchema-instance',
+        'xs': 'http://www.w3.org/2001/XMLSchema'
+    }
+    
+    # Find Building_A feature class
+    building_a = None
+    for feature_class in root.findall(".//DataElement[@xsi:type='esri:DEFeatureClass']", namespaces):
+        name_elem = feature_class.find("Name", namespaces)
+        if name_elem is not None and name_elem.text == "Building_A":
+            building_a = feature_class
+            break
+    
+    if not building_a:
+        print("Building_A feature class not found!")
+        return None
+    
+    domain_fields = extract_domain_fields(building_a, namespaces)
+    if domain_fields is None:
+        print("No fields found in Building_A")
+        return None
+    
+    return domain_fields
+
 def export_to_csv(domain_fields, output_file):
     """Export domain values to CSV format"""
     
@@ -111,7 +113,7 @@ def export_to_csv(domain_fields, output_file):
                         field_info['domain_type'],
                         field_info['domain_name'],
                         value['name'],
-                        value['code'],
+                        code_text(value['code']),
                         '',  # Min value (empty for coded domains)
                         ''   # Max value (empty for coded domains)
                     ])
@@ -128,11 +130,15 @@ def export_to_csv(domain_fields, output_file):
                     field_info['max_value']
                 ])
 
+def json_values(values):
+    return [{'name': value['name'], 'code': json_code(value['code'])} for value in values]
+
 def export_to_json(domain_fields, output_file):
     """Export domain values to JSON format for easier processing"""
     
     with open(output_file, 'w', encoding='utf-8') as jsonfile:
-        json.dump(domain_fields, jsonfile, indent=2, ensure_ascii=False)
+        # CodedValues serialise as their list of {'name', 'code'} dicts, numeric codes as JSON numbers
+        json.dump(domain_fields, jsonfile, indent=2, ensure_ascii=False, default=json_values)
 
 def main():
     # Input and output files
@@ -167,7 +173,7 @@ def main():
             print(f"\n{field_info['alias']} ({field_name}):")
             if field_info['domain_type'] == 'CodedValue':
                 for value in field_info['values'][:5]:  # Show first 5 values
-                    print(f"  - {value['name']} = {value['code']}")
+                    print(f"  - {value['name']} = {code_text(value['code'])}")
                 if len(field_info['values']) > 5:
                     print(f"  ... and {len(field_info['values']) - 5} more options")
             else:
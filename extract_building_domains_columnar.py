@@ -4,42 +4,19 @@ Extract domain values from geodatabase XML for Building_A feature class
 and save them in columnar CSV format (attributes as columns, options as rows)
 """
 
-import xml.etree.ElementTree as ET
 import csv
 from pathlib import Path
 
-def parse_geodatabase_xml(xml_file):
-    """Parse geodatabase XML and extract Building_A field domains"""
-    
-    # Parse the XML file
-    tree = ET.parse(xml_file)
-    root = tree.getroot()
-    
-    # Define namespaces
-    namespaces = {
-        'esri': 'http://www.esri.com/schemas/ArcGIS/10.8',
-        'xsi': 'http://www.w3.org/2001/XMLSchema-instance',
-        'xs': 'http://www.w3.org/2001/XMLSchema'
-    }
-    
-    # Find Building_A feature class
-    building_a = None
-    for feature_class in root.findall(".//DataElement[@xsi:type='esri:DEFeatureClass']", namespaces):
-        name_elem = feature_class.find("Name", namespaces)
-        if name_elem is not None and name_elem.text == "Building_A":
-            building_a = feature_class
-            break
-    
-    if not building_a:
-        print("Building_A feature class not found!")
-        return None
+from export_reader import parse_export
+
+def extract_domain_fields(feature_class, namespaces):
+    """Collect the inline coded value and range domains declared on a feature class's fields"""
     
     # Extract fields with domains
     domain_fields = {}
     
-    fields_array = building_a.find(".//FieldArray[@xsi:type='esri:ArrayOfField']", namespaces)
+    fields_array = feature_class.find(".//FieldArray[@xsi:type='esri:ArrayOfField']", namespaces)
     if fields_array is None:
-        print("No fields found in Building_A")
         return None
     
     for field in fields_array.findall("Field[@xsi:type='esri:Field']", namespaces):
@@ -92,6 +69,39 @@ def parse_geodatabase_xml(xml_file):
     
     return domain_fields
 
+def parse_geodatabase_xml(xml_file):
+    """Parse geodatabase XML and extract Building_A field domains"""
+    
+    # Parse the XML file
+    tree = parse_export(xml_file)
+    root = tree.getroot()
+    
+    # Define namespaces
+    namespaces = {
+        'esri': 'http://www.esri.com/schemas/ArcGIS/10.8',
+        'xsi': 'http://www.w3.org/2001/XMLSchema-instance',
+        'xs': 'http://www.w3.org/2001/XMLSchema'
+    }
+    
+    # Find Building_A feature class
+    building_a = None
+    for feature_class in root.findall(".//DataElement[@xsi:type='esri:DEFeatureClass']", namespaces):
+        name_elem = feature_class.find("Name", namespaces)
+        if name_elem is not None and name_elem.text == "Building_A":
+            building_a = feature_class
+            break
+    
+    if not building_a:
+        print("Building_A feature class not found!")
+        return None
+    
+    domain_fields = extract_domain_fields(building_a, namespaces)
+    if domain_fields is None:
+        print("No fields found in Building_A")
+        return None
+    
+    return domain_fields
+
 def export_to_columnar_csv(domain_fields, output_file):
     """Export domain values to columnar CSV format"""
     
@@ -153,6 +163,24 @@ def export_codes_only_csv(domain_fields, output_file):
                     row.append('')  # Empty cell if this field has fewer values
             writer.writerow(row)
 
+def export_long_csv(domain_fields, output_file):
+    """Export domain values in long format: one row per value, no padding
+
+    Rows are grouped by field in the same column order as the columnar files, with
+    the value's 1-based position in its column, so the padded layout can be rebuilt
+    (pivot on field and position). Size and write time follow the number of values,
+    not the longest domain times the number of fields.
+    """
+    
+    with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(['field', 'alias', 'domain_type', 'position', 'code', 'name', 'display'])
+        for field_name, field_info in sorted(domain_fields.items()):
+            writer.writerows(
+                [field_name, field_info['alias'], field_info['domain_type'], position,
+                 value['code'], value['name'], value['display']]
+                for position, value in enumerate(field_info['values'], 1))
+
 def main():
     # Input and output files
     xml_file = Path("DATABASE_EXPORT.XML")
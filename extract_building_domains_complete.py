@@ -4,12 +4,38 @@ Complete extraction of domain values from geodatabase XML for Building_A feature
 Includes domain descriptions and ensures all fields are captured
 """
 
-import xml.etree.ElementTree as ET
 import csv
 import json
 from pathlib import Path
 from collections import OrderedDict
 
+from export_reader import parse_export
+from coded_values import CodedValues, code_text, decode_coded_values
+
+def decode_domain(domain, namespaces):
+    """Decode one workspace Domain element into its name, type, description and values or range"""
+    domain_name = domain.find("DomainName", namespaces).text
+    domain_type = domain.get('{http://www.w3.org/2001/XMLSchema-instance}type')
+    description = domain.find("Description", namespaces)
+    
+    domain_info = {
+        'name': domain_name,
+        'type': domain_type,
+        'description': description.text if description is not None else '',
+        'values': CodedValues()
+    }
+    
+    if 'CodedValueDomain' in domain_type:
+        values_array = domain.find("CodedValues[@xsi:type='esri:ArrayOfCodedValue']", namespaces)
+        domain_info['values'] = decode_coded_values(values_array, namespaces)
+    elif 'RangeDomain' in domain_type:
+        min_val = domain.find("MinValue", namespaces).text
+        max_val = domain.find("MaxValue", namespaces).text
+        domain_info['min_value'] = min_val
+        domain_info['max_value'] = max_val
+    
+    return domain_info
+
 def parse_all_domains(root, namespaces):
     """Extract all domain definitions from the workspace level"""
     domains = {}
@@ -18,79 +44,31 @@ def parse_all_domains(root, namespaces):
     domains_array = root.find(".//Domains[@xsi:type='esri:ArrayOfDomain']", namespaces)
     if domains_array is not None:
         for domain in domains_array.findall("Domain", namespaces):
-            domain_name = domain.find("DomainName", namespaces).text
-            domain_type = domain.get('{http://www.w3.org/2001/XMLSchema-instance}type')
-            description = domain.find("Description", namespaces)
-            
-            domain_info = {
-                'name': domain_name,
-                'type': domain_type,
-                'description': description.text if description is not None else '',
-                'values': []
-            }
-            
-            if 'CodedValueDomain' in domain_type:
-                values_array = domain.find("CodedValues[@xsi:type='esri:ArrayOfCodedValue']", namespaces)
-                if values_array:
-                    for coded_value in values_array.findall("CodedValue[@xsi:type='esri:CodedValue']", namespaces):
-                        name = coded_value.find("Name", namespaces).text
-                        code = coded_value.find("Code", namespaces).text
-                        domain_info['values'].append({
-                            'name': name,
-                            'code': code
-                        })
-            elif 'RangeDomain' in domain_type:
-                min_val = domain.find("MinValue", namespaces).text
-                max_val = domain.find("MaxValue", namespaces).text
-                domain_info['min_value'] = min_val
-                domain_info['max_value'] = max_val
-            
-            domains[domain_name] = domain_info
+            domain_info = decode_domain(domain, namespaces)
+            domains[domain_info['name']] = domain_info
     
     return domains
 
-def parse_building_a_complete(xml_file):
-    """Parse geodatabase XML and extract all Building_A fields with their domains"""
-    
-    # Parse the XML file
-    tree = ET.parse(xml_file)
-    root = tree.getroot()
-    
-    # Define namespaces
-    namespaces = {
-        'esri': 'http://www.esri.com/schemas/ArcGIS/10.8',
-        'xsi': 'http://www.w3.org/2001/XMLSchema-instance',
-        'xs': 'http://www.w3.org/2001/XMLSchema'
-    }
-    
-    # First, extract all domains from workspace level
-    all_domains = parse_all_domains(root, namespaces)
-    print(f"Found {len(all_domains)} domain definitions at workspace level")
-    
-    # Find Building_A feature class
-    building_a = None
+def find_feature_class(root, namespaces, class_name="Building_A"):
+    """Locate a feature class DataElement by name"""
     for feature_class in root.findall(".//DataElement[@xsi:type='esri:DEFeatureClass']", namespaces):
         name_elem = feature_class.find("Name", namespaces)
-        if name_elem is not None and name_elem.text == "Building_A":
-            building_a = feature_class
-            break
-    
-    if not building_a:
-        print("Building_A feature class not found!")
-        return None, None
+        if name_elem is not None and name_elem.text == class_name:
+            return feature_class
+    return None
+
+def extract_feature_class_fields(feature_class, namespaces, all_domains):
+    """Walk a feature class FieldArray and resolve each field against the workspace domains"""
     
     # Extract all fields
     all_fields = OrderedDict()
     fields_with_domains = OrderedDict()
     
-    fields_array = building_a.find(".//FieldArray[@xsi:type='esri:ArrayOfField']", namespaces)
+    fields_array = feature_class.find(".//FieldArray[@xsi:type='esri:ArrayOfField']", namespaces)
     if fields_array is None:
-        print("No fields found in Building_A")
         return None, None
     
-    field_count = 0
     for field in fields_array.findall("Field[@xsi:type='esri:Field']", namespaces):
-        field_count += 1
         field_name = field.find("Name", namespaces).text
         field_type = field.find("Type", namespaces).text
         field_alias = field.find("AliasName", namespaces)
@@ -133,7 +111,39 @@ def parse_building_a_complete(xml_file):
         
         all_fields[field_name] = field_info
     
-    print(f"Total fields in Building_A: {field_count}")
+    return all_fields, fields_with_domains
+
+def parse_building_a_complete(xml_file):
+    """Parse geodatabase XML and extract all Building_A fields with their domains"""
+    
+    # Parse the XML file
+    tree = parse_export(xml_file)
+    root = tree.getroot()
+    
+    # Define namespaces
+    namespaces = {
+        'esri': 'http://www.esri.com/schemas/ArcGIS/10.8',
+        'xsi': 'http://www.w3.org/2001/XMLSchema-instance',
+        'xs': 'http://www.w3.org/2001/XMLSchema'
+    }
+    
+    # First, extract all domains from workspace level
+    all_domains = parse_all_domains(root, namespaces)
+    print(f"Found {len(all_domains)} domain definitions at workspace level")
+    
+    # Find Building_A feature class
+    building_a = find_feature_class(root, namespaces, "Building_A")
+    
+    if not building_a:
+        print("Building_A feature class not found!")
+        return None, None
+    
+    all_fields, fields_with_domains = extract_feature_class_fields(building_a, namespaces, all_domains)
+    if all_fields is None:
+        print("No fields found in Building_A")
+        return None, None
+    
+    print(f"Total fields in Building_A: {len(all_fields)}")
     print(f"Fields with domains: {len(fields_with_domains)}")
     
     return all_fields, fields_with_domains
@@ -163,7 +173,7 @@ def export_complete_csv(all_fields, fields_with_domains, output_file):
                     # Show first 3 values as samples
                     samples = []
                     for i, val in enumerate(domain_data['values'][:3]):
-                        samples.append(f"{val['name']} ({val['code']})")
+                        samples.append(f"{val['name']} ({code_text(val['code'])})")
                     if len(domain_data['values']) > 3:
                         samples.append(f"... +{len(domain_data['values'])-3} more")
                     sample_values = '; '.join(samples)
@@ -203,7 +213,7 @@ def export_detailed_domains_csv(fields_with_domains, output_file):
                         field_info['domain_description'],
                         field_info['domain_type'],
                         value['name'],
-                        value['code'],
+                        code_text(value['code']),
                         '',  # Min value (empty for coded domains)
                         ''   # Max value (empty for coded domains)
                     ])
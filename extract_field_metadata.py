@@ -4,15 +4,16 @@ Script to extract and analyze all field metadata properties from DATABASE_EXPORT
 for the Building_A feature class and other feature classes.
 """
 
-import xml.etree.ElementTree as ET
 import re
 from collections import defaultdict
 
+from export_reader import parse_export
+
 def extract_field_metadata(xml_file):
     """Extract all field metadata from the XML file."""
     
     # Parse the XML
-    tree = ET.parse(xml_file)
+    tree = parse_export(xml_file)
     root = tree.getroot()
     
     print(f"Debug: Root element: {root.tag}")
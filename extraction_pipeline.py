@@ -0,0 +1,336 @@
+"""
+Single-parse extraction pipeline for one or more feature classes
+Parses the geodatabase XML once, resolves workspace domains, walks each requested
+feature class and fans the resulting model out to the CSV, JSON and HTML writers
+"""
+
+import os
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from pathlib import Path
+
+from extract_building_domains_complete import (
+    decode_domain, find_feature_class, extract_feature_class_fields,
+    export_complete_csv, export_detailed_domains_csv
+)
+from extract_building_domains_columnar import (
+    extract_domain_fields as extract_columnar_domain_fields,
+    export_to_columnar_csv, export_codes_only_csv, export_long_csv
+)
+from extract_building_domains import extract_domain_fields as extract_inline_domain_fields, export_to_json
+from extract_all_metadata import extract_feature_class_metadata, export_metadata_csv, export_metadata_json
+from generate_complete_html_manual import extract_html_fields, build_html_manual
+from export_sql_ddl import DIALECTS, generate_table_ddl, generate_lookup_inserts
+from export_reader import compression_of, is_stream, parse_export, parse_incremental, read_stats
+from instrumentation import NullInstrumentation
+from output_scheduler import atomic_output, run_writers
+from selective_reader import iter_feature_classes, parse_ranges, read_selected, selected_ranges
+
+NAMESPACES = {
+    'esri': 'http://www.esri.com/schemas/ArcGIS/10.8',
+    'xsi': 'http://www.w3.org/2001/XMLSchema-instance',
+    'xs': 'http://www.w3.org/2001/XMLSchema'
+}
+
+class LazyDomainTable(Mapping):
+    """Workspace domains keyed by name, decoded only when first looked up
+
+    The constructor only reads each Domain's DomainName and keeps a reference to
+    its element; names, codes and ranges are decoded on first access and cached.
+    Membership tests, iteration and len() never decode, so the cost of domain
+    resolution follows the domains that requested fields are bound to, not the
+    size of the workspace library. Values are the same dicts parse_all_domains builds.
+    """
+    
+    def __init__(self, root, namespaces=NAMESPACES):
+        self.namespaces = namespaces
+        self.elements = {}
+        self.decoded = {}
+        domains_array = root.find(".//Domains[@xsi:type='esri:ArrayOfDomain']", namespaces)
+        if domains_array is not None:
+            for domain in domains_array.findall("Domain", namespaces):
+                self.elements[domain.find("DomainName", namespaces).text] = domain
+    
+    def __getitem__(self, domain_name):
+        domain_info = self.decoded.get(domain_name)
+        if domain_info is None:
+            domain_info = self.decoded[domain_name] = decode_domain(self.elements[domain_name], self.namespaces)
+        return domain_info
+    
+    def __contains__(self, domain_name):
+        return domain_name in self.elements
+    
+    def __iter__(self):
+        return iter(self.elements)
+    
+    def __len__(self):
+        return len(self.elements)
+    
+    def decoded_count(self):
+        return len(self.decoded)
+
+def list_feature_classes(root, namespaces=NAMESPACES):
+    """Return the names of all feature classes in document order"""
+    names = []
+    for feature_class in root.findall(".//DataElement[@xsi:type='esri:DEFeatureClass']", namespaces):
+        name_elem = feature_class.find("Name", namespaces)
+        if name_elem is not None:
+            names.append(name_elem.text)
+    return names
+
+def build_class_model(feature_class, all_domains, namespaces=NAMESPACES):
+    """Walk one feature class and build every view the writers need"""
+    all_fields, fields_with_domains = extract_feature_class_fields(feature_class, namespaces, all_domains)
+    if all_fields is None:
+        return None
+    
+    return {
+        'all_fields': all_fields,
+        'fields_with_domains': fields_with_domains,
+        'domain_fields': extract_columnar_domain_fields(feature_class, namespaces),
+        'inline_domain_fields': extract_inline_domain_fields(feature_class, namespaces),
+        'metadata': extract_feature_class_metadata(feature_class, namespaces, all_domains),
+        'html_fields': extract_html_fields(feature_class, namespaces, all_domains)
+    }
+
+def load_schema(xml_file, class_names=("Building_A",), instrumentation=None, progress=None):
+    """Parse the export once and build the model for the requested feature classes
+
+    Pass class_names=None to load every feature class in the export. For named
+    classes only the domains and those DataElements are parsed (see selective_reader),
+    falling back to a full parse whenever the byte scan cannot locate them.
+    Compressed and zipped exports are streamed through export_reader, and xml_file
+    may also be '-' for stdin or a binary file object; the read's throughput is
+    returned under 'input'. progress (a progress.ProgressReporter) is advanced as
+    the input is read and finished once the parse is done.
+    """
+    instrumentation = instrumentation or NullInstrumentation()
+    
+    input_stats = OrderedDict()
+    with instrumentation.stage('parse'):
+        start = time.perf_counter()
+        if is_stream(xml_file):
+            root = parse_incremental(xml_file, class_names, stats=input_stats, progress=progress)
+        elif class_names is not None:
+            root = read_selected(xml_file, class_names, progress)
+            if root is not None and progress is not None:
+                # The bytes between and after the selected ranges were skipped, not pending
+                progress.advance(os.path.getsize(xml_file), b'')
+        else:
+            root = None
+        if root is None:
+            if progress is not None and progress.position:
+                progress.reset()
+            root = parse_export(xml_file, stats=input_stats, progress=progress).getroot()
+        elif not input_stats:
+            size = os.path.getsize(xml_file)
+            input_stats.update(read_stats(None, size, size, time.perf_counter() - start))
+        if progress is not None:
+            progress.finish()
+    
+    with instrumentation.stage('domain resolution'):
+        all_domains = LazyDomainTable(root)
+    
+    if class_names is None:
+        class_names = list_feature_classes(root)
+    
+    classes = OrderedDict()
+    missing = []
+    for class_name in class_names:
+        with instrumentation.stage('field walk', feature_class=class_name):
+            feature_class = find_feature_class(root, NAMESPACES, class_name)
+            class_model = build_class_model(feature_class, all_domains) if feature_class is not None else None
+        if class_model is None:
+            missing.append(class_name)
+        else:
+            classes[class_name] = class_model
+    
+    return {'domains': all_domains, 'classes': classes, 'missing': missing, 'input': input_stats}
+
+def scan_class_models(data):
+    """Split a plain export held in memory (e.g. an mmap) into its feature classes with the byte scan
+
+    Returns None for compressed data and for layouts the scan cannot split, so the
+    caller can fall back to load_schema. Otherwise returns (domains, classes): the
+    workspace domains as a LazyDomainTable, and an iterator of (name, start, end,
+    load) for the first DataElement of each feature class name, where load() parses
+    only that element and returns its model (None if it holds no fields). Raises
+    ValueError when the closing root tag is missing, since the scan would otherwise
+    return the classes written so far as if the export were complete.
+    """
+    if compression_of(data[:8]) is not None:
+        return None
+    located = selected_ranges(data, [])
+    if located is None:
+        return None
+    head, root_close = located
+    if not data[-len(root_close) - 1024:].rstrip().endswith(root_close):
+        raise ValueError(f"no closing {root_close.decode()} tag; the export is incomplete")
+    all_domains = LazyDomainTable(parse_ranges(data, head, root_close))
+    
+    def load(name, start, end):
+        root = parse_ranges(data, [head[0], (start, end)], root_close)
+        return build_class_model(find_feature_class(root, NAMESPACES, name), all_domains)
+    
+    def classes():
+        seen = set()
+        for name, start, end in iter_feature_classes(data):
+            if name not in seen:
+                seen.add(name)
+                yield name, start, end, lambda name=name, start=start, end=end: load(name, start, end)
+    
+    return all_domains, classes()
+
+def output_prefix(class_name):
+    """File name prefix for a feature class, e.g. Building_A -> building_a"""
+    return class_name.lower()
+
+def write_detailed(class_name, class_model, output_dir, fsync=False):
+    """All-fields summary and detailed domain CSVs"""
+    prefix = output_prefix(class_name)
+    all_fields_csv = Path(output_dir) / f"{prefix}_all_fields.csv"
+    detailed_csv = Path(output_dir) / f"{prefix}_domains_detailed.csv"
+    with atomic_output(all_fields_csv, fsync) as tmp_path:
+        export_complete_csv(class_model['all_fields'], class_model['fields_with_domains'], tmp_path)
+    with atomic_output(detailed_csv, fsync) as tmp_path:
+        export_detailed_domains_csv(class_model['fields_with_domains'], tmp_path)
+    return [all_fields_csv, detailed_csv]
+
+def write_columnar(class_name, class_model, output_dir, fsync=False):
+    """Columnar pick list CSVs (display values and codes only)"""
+    if not class_model['domain_fields']:
+        return []
+    prefix = output_prefix(class_name)
+    columnar_csv = Path(output_dir) / f"{prefix}_domains_columnar.csv"
+    codes_csv = Path(output_dir) / f"{prefix}_domains_codes_only.csv"
+    with atomic_output(columnar_csv, fsync) as tmp_path:
+        export_to_columnar_csv(class_model['domain_fields'], tmp_path)
+    with atomic_output(codes_csv, fsync) as tmp_path:
+        export_codes_only_csv(class_model['domain_fields'], tmp_path)
+    return [columnar_csv, codes_csv]
+
+def write_long(class_name, class_model, output_dir, fsync=False):
+    """Unpadded long-format pick list CSV (one row per value)"""
+    if not class_model['domain_fields']:
+        return []
+    long_csv = Path(output_dir) / f"{output_prefix(class_name)}_domains_long.csv"
+    with atomic_output(long_csv, fsync) as tmp_path:
+        export_long_csv(class_model['domain_fields'], tmp_path)
+    return [long_csv]
+
+def write_metadata(class_name, class_model, output_dir, fsync=False):
+    """Complete field metadata CSV"""
+    metadata_csv = Path(output_dir) / f"{output_prefix(class_name)}_complete_metadata.csv"
+    with atomic_output(metadata_csv, fsync) as tmp_path:
+        export_metadata_csv(class_model['metadata'], tmp_path)
+    return [metadata_csv]
+
+def write_json(class_name, class_model, output_dir, fsync=False):
+    """Metadata and domain JSON files for programmatic access"""
+    prefix = output_prefix(class_name)
+    metadata_json = Path(output_dir) / f"{prefix}_complete_metadata.json"
+    domains_json = Path(output_dir) / f"{prefix}_domains.json"
+    with atomic_output(metadata_json, fsync) as tmp_path:
+        export_metadata_json(class_model['metadata'], tmp_path)
+    with atomic_output(domains_json, fsync) as tmp_path:
+        export_to_json(class_model['inline_domain_fields'], tmp_path)
+    return [metadata_json, domains_json]
+
+def write_html(class_name, class_model, output_dir, fsync=False):
+    """Complete HTML reference manual"""
+    html_file = Path(output_dir) / f"{output_prefix(class_name)}_complete_manual.html"
+    html_content = build_html_manual(class_model['html_fields'], class_name)
+    with atomic_output(html_file, fsync) as tmp_path:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(html_content)
+    return [html_file]
+
+def write_sql(class_name, class_model, output_dir, fsync=False):
+    """PostgreSQL and SQLite DDL plus the lookup table bulk-load script"""
+    prefix = output_prefix(class_name)
+    written = []
+    scripts = [(f"{prefix}_{dialect}.sql", generate_table_ddl(class_name, class_model, dialect)) for dialect in DIALECTS]
+    scripts.append((f"{prefix}_lookups.sql", generate_lookup_inserts(class_model)))
+    for file_name, script in scripts:
+        sql_file = Path(output_dir) / file_name
+        with atomic_output(sql_file, fsync) as tmp_path:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(script)
+        written.append(sql_file)
+    return written
+
+def write_json_schema(class_name, class_model, output_dir, fsync=False):
+    """JSON Schema for web data-entry forms"""
+    # Imported here: export_json_schema builds on validate_records, which imports this module
+    from export_json_schema import build_json_schema, export_json_schema
+    schema_json = Path(output_dir) / f"{output_prefix(class_name)}_schema.json"
+    with atomic_output(schema_json, fsync) as tmp_path:
+        export_json_schema(build_json_schema(class_name, class_model), tmp_path)
+    return [schema_json]
+
+def write_xlsx(class_name, class_model, output_dir, fsync=False):
+    """Excel data-entry template with coded value dropdowns"""
+    # Imported here: xlsx_template builds on this module
+    from xlsx_template import write_template
+    xlsx_file = Path(output_dir) / f"{output_prefix(class_name)}_template.xlsx"
+    with atomic_output(xlsx_file, fsync) as tmp_path:
+        write_template([(class_name, class_model)], tmp_path)
+    return [xlsx_file]
+
+# Output name -> (instrumentation stage, writer)
+OUTPUT_WRITERS = OrderedDict([
+    ('detailed', ('csv write', write_detailed)),
+    ('columnar', ('csv write', write_columnar)),
+    ('long', ('csv write', write_long)),
+    ('metadata', ('csv write', write_metadata)),
+    ('json', ('json write', write_json)),
+    ('html', ('html render', write_html)),
+    ('sql', ('sql write', write_sql)),
+    ('jsonschema', ('json write', write_json_schema)),
+    ('xlsx', ('xlsx write', write_xlsx)),
+])
+
+def estimate_write_cost(class_model):
+    """Rough relative cost of writing a class's outputs (fields plus coded values)"""
+    values = sum(len(info['values']) for info in class_model['fields_with_domains'].values())
+    return len(class_model['all_fields']) + values
+
+def write_outputs(schema, output_dir, outputs=None, instrumentation=None, jobs=1, max_pending=None, fsync=False):
+    """Run the selected writers for every loaded feature class and return the files written
+
+    With jobs > 1 the writers run concurrently on a bounded thread pool; they only
+    read the shared model, so no locking is needed. Every file is written to a
+    temporary name and renamed into place, so readers never see partial output.
+    """
+    instrumentation = instrumentation or NullInstrumentation()
+    outputs = list(outputs or OUTPUT_WRITERS)
+    unknown = [output for output in outputs if output not in OUTPUT_WRITERS]
+    if unknown:
+        raise ValueError(f"Unknown output(s): {', '.join(unknown)}")
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    
+    def run_writer(class_name, class_model, output):
+        stage, writer = OUTPUT_WRITERS[output]
+        with instrumentation.stage(stage, feature_class=class_name, output=output):
+            return writer(class_name, class_model, output_dir, fsync)
+    
+    # Largest classes first so the pool finishes close to the slowest single writer
+    classes = list(schema['classes'].items())
+    if jobs > 1:
+        classes.sort(key=lambda item: -estimate_write_cost(item[1]))
+    tasks = [(run_writer, (class_name, class_model, output))
+             for class_name, class_model in classes
+             for output in outputs]
+    
+    written = []
+    for paths in run_writers(tasks, jobs, max_pending):
+        written.extend(paths)
+    return written
+
+def run_pipeline(xml_file, class_names=("Building_A",), output_dir=".", outputs=None, instrumentation=None,
+                 jobs=1, max_pending=None, fsync=False, progress=None):
+    """Parse once, then write every selected output for every requested feature class"""
+    schema = load_schema(xml_file, class_names, instrumentation, progress)
+    written = write_outputs(schema, output_dir, outputs, instrumentation, jobs, max_pending, fsync)
+    return schema, written
\ No newline at end of file
@@ -4,14 +4,15 @@ Final comprehensive analysis of field metadata from DATABASE_EXPORT.XML
 for the Building_A feature class and other feature classes.
 """
 
-import xml.etree.ElementTree as ET
 from collections import defaultdict, Counter
 
+from export_reader import parse_export
+
 def extract_field_metadata(xml_file):
     """Extract all field metadata from the XML file."""
     
     # Parse the XML
-    tree = ET.parse(xml_file)
+    tree = parse_export(xml_file)
     root = tree.getroot()
     
     # Find all DataElement elements that are feature classes
@@ -0,0 +1,166 @@
+"""
+Fuzzy matching of dirty free-text values onto coded value domains
+Builds a character n-gram inverted index over each domain's names and codes (plus
+optional extra aliases) once, scores only the candidates that share n-grams with
+the input, and caches results for repeated inputs
+"""
+
+import csv
+import time
+import unicodedata
+from collections import defaultdict
+from functools import lru_cache
+
+from extraction_pipeline import load_schema
+from validate_records import resolve_columns
+from coded_values import code_text
+
+def normalize_text(text):
+    """Casefold, strip accents and punctuation, and collapse whitespace"""
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    cleaned = ''.join(char if char.isalnum() else ' ' for char in stripped.casefold())
+    return ' '.join(cleaned.split())
+
+def char_ngrams(text, n=3):
+    """Set of character n-grams of normalised text, padded so short words still produce grams"""
+    padded = f" {text} "
+    if len(padded) <= n:
+        return {padded}
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+class DomainMatcher:
+    """Character n-gram index over one coded value domain
+
+    Every code, display name and alias is a key; a key's n-grams point back to it
+    in an inverted index. A lookup counts shared n-grams only for keys that share
+    at least one with the input and scores them with the Dice coefficient, so the
+    cost depends on the overlap, not on the size of the domain.
+    """
+    
+    def __init__(self, values, aliases=None, n=3, cache_size=100000):
+        self.n = n
+        self.entries = [(value['code'], value['name']) for value in values]
+        # Alias files give codes as text
+        entry_by_code = {code_text(code): i for i, (code, _) in enumerate(self.entries)}
+        
+        self.key_entry = []
+        self.key_sizes = []
+        self.exact = {}
+        self.postings = defaultdict(list)
+        
+        def add_key(text, entry):
+            key = normalize_text(text)
+            if not key or self.exact.get(key) == entry:
+                return
+            self.exact.setdefault(key, entry)
+            key_id = len(self.key_entry)
+            grams = char_ngrams(key, n)
+            self.key_entry.append(entry)
+            self.key_sizes.append(len(grams))
+            for gram in grams:
+                self.postings[gram].append(key_id)
+        
+        for i, (code, name) in enumerate(self.entries):
+            add_key(name, i)
+            add_key(code_text(code), i)
+        for alias, code in (aliases or {}).items():
+            if code in entry_by_code:
+                add_key(alias, entry_by_code[code])
+        
+        self.postings = dict(self.postings)
+        self.match = lru_cache(maxsize=cache_size)(self._match)
+    
+    def _match(self, text, limit=3, threshold=0.5):
+        """Return up to limit (code, name, score) candidates scoring at least threshold, best first"""
+        query = normalize_text(text)
+        if not query:
+            return ()
+        if query in self.exact:
+            code, name = self.entries[self.exact[query]]
+            return ((code, name, 1.0),)
+        
+        grams = char_ngrams(query, self.n)
+        shared = defaultdict(int)
+        for gram in grams:
+            for key_id in self.postings.get(gram, ()):
+                shared[key_id] += 1
+        
+        best = {}
+        query_size = len(grams)
+        for key_id, common in shared.items():
+            score = 2.0 * common / (query_size + self.key_sizes[key_id])
+            entry = self.key_entry[key_id]
+            if score >= threshold and score > best.get(entry, 0.0):
+                best[entry] = score
+        
+        ranked = sorted(best.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        return tuple((self.entries[entry][0], self.entries[entry][1], round(score, 4)) for entry, score in ranked)
+    
+    def cache_info(self):
+        return self.match.cache_info()
+
+def load_aliases(aliases_file):
+    """Read extra spellings from a CSV with alias and code columns (e.g. Deutschland -> DEU)"""
+    with open(aliases_file, newline='', encoding='utf-8-sig') as f:
+        return {row['alias']: row['code'] for row in csv.DictReader(f) if row.get('alias') and row.get('code')}
+
+def load_domain_matcher(xml_file, domain_name=None, class_name="Building_A", field_name=None, aliases=None):
+    """Build a matcher for a domain given by name, or by the field it is bound to"""
+    schema = load_schema(xml_file, [class_name] if field_name else [])
+    if field_name:
+        model = schema['classes'].get(class_name)
+        domain_info = model['fields_with_domains'].get(field_name) if model else None
+        if domain_info is None or domain_info['domain_type'] != 'CodedValue':
+            raise KeyError(f"{class_name}.{field_name} has no coded value domain")
+        values = domain_info['values']
+    else:
+        domain = schema['domains'].get(domain_name)
+        if domain is None or not domain['values']:
+            raise KeyError(f"Coded value domain {domain_name} not found in {xml_file}")
+        values = domain['values']
+    return DomainMatcher(values, aliases)
+
+def match_records(records_file, column, matcher, output_file, threshold=0.5, chunk_size=100000):
+    """Stream a CSV file and append the best code, name and score for one column
+
+    Values below the threshold get empty code and name columns. Returns a summary.
+    """
+    start = time.perf_counter()
+    summary = {'rows': 0, 'matched': 0, 'exact': 0, 'unmatched': 0}
+    
+    with open(records_file, newline='', encoding='utf-8-sig') as source, \
+            open(output_file, 'w', newline='', encoding='utf-8') as target:
+        reader = csv.reader(source)
+        writer = csv.writer(target)
+        header = next(reader, [])
+        position = next((i for i, name in enumerate(resolve_columns(header, {column: None})) if name), None)
+        if position is None:
+            raise KeyError(f"Column {column} not found in {records_file}")
+        column = header[position].strip()
+        writer.writerow(header + [f"{column}_code", f"{column}_name", f"{column}_score"])
+        
+        rows = []
+        for row in reader:
+            value = row[position] if position < len(row) else ''
+            candidates = matcher.match(value, 1, threshold)
+            if candidates:
+                code, name, score = candidates[0]
+                summary['matched'] += 1
+                summary['exact'] += score == 1.0
+                rows.append(row + [code_text(code), name, score])
+            else:
+                summary['unmatched'] += bool(value.strip())
+                rows.append(row + ['', '', ''])
+            if len(rows) >= chunk_size:
+                writer.writerows(rows)
+                summary['rows'] += len(rows)
+                rows = []
+        writer.writerows(rows)
+        summary['rows'] += len(rows)
+    
+    cache = matcher.cache_info()
+    summary['cache_hits'] = cache.hits
+    summary['cache_misses'] = cache.misses
+    summary['elapsed_s'] = round(time.perf_counter() - start, 3)
+    return summary
\ No newline at end of file
@@ -4,11 +4,13 @@ Generate complete HTML manual for Building_A attributes with all domain data
 Reads from the extracted domain data and builds a comprehensive HTML reference
 """
 
-import xml.etree.ElementTree as ET
 import json
 from pathlib import Path
 from collections import OrderedDict
 
+from export_reader import parse_export
+from coded_values import code_text
+
 def parse_all_domains(root, namespaces):
     """Extract all domain definitions from the workspace level"""
     domains = {}
@@ -47,38 +49,15 @@ def parse_all_domains(root, namespaces):
     
     return domains
 
-def parse_building_a_fields(xml_file):
-    """Parse Building_A fields and their domain information"""
-    
-    tree = ET.parse(xml_file)
-    root = tree.getroot()
-    
-    namespaces = {
-        'esri': 'http://www.esri.com/schemas/ArcGIS/10.8',
-        'xsi': 'http://www.w3.org/2001/XMLSchema-instance',
-        'xs': 'http://www.w3.org/2001/XMLSchema'
-    }
-    
-    # Extract all domains
-    all_domains = parse_all_domains(root, namespaces)
-    
-    # Find Building_A feature class
-    building_a = None
-    for feature_class in root.findall(".//DataElement[@xsi:type='esri:DEFeatureClass']", namespaces):
-        name_elem = feature_class.find("Name", namespaces)
-        if name_elem is not None and name_elem.text == "Building_A":
-            building_a = feature_class
-            break
-    
-    if not building_a:
-        return None, None
+def extract_html_fields(feature_class, namespaces, all_domains):
+    """Collect field display information and resolved domain data for a feature class"""
     
     # Extract fields with domains
     fields_data = OrderedDict()
     
-    fields_array = building_a.find(".//FieldArray[@xsi:type='esri:ArrayOfField']", namespaces)
+    fields_array = feature_class.find(".//FieldArray[@xsi:type='esri:ArrayOfField']", namespaces)
     if fields_array is None:
-        return None, None
+        return None
     
     for field in fields_array.findall("Field[@xsi:type='esri:Field']", namespaces):
         field_name = field.find("Name", namespaces).text
@@ -116,16 +95,48 @@ def parse_building_a_fields(xml_file):
         
         fields_data[field_name] = field_info
     
+    return fields_data
+
+def parse_building_a_fields(xml_file):
+    """Parse Building_A fields and their domain information"""
+    
+    tree = parse_export(xml_file)
+    root = tree.getroot()
+    
+    namespaces = {
+        'esri': 'http://www.esri.com/schemas/ArcGIS/10.8',
+        'xsi': 'http://www.w3.org/2001/XMLSchema-instance',
+        'xs': 'http://www.w3.org/2001/XMLSchema'
+    }
+    
+    # Extract all domains
+    all_domains = parse_all_domains(root, namespaces)
+    
+    # Find Building_A feature class
+    building_a = None
+    for feature_class in root.findall(".//DataElement[@xsi:type='esri:DEFeatureClass']", namespaces):
+        name_elem = feature_class.find("Name", namespaces)
+        if name_elem is not None and name_elem.text == "Building_A":
+            building_a = feature_class
+            break
+    
+    if not building_a:
+        return None, None
+    
+    fields_data = extract_html_fields(building_a, namespaces, all_domains)
+    if fields_data is None:
+        return None, None
+    
     return fields_data, all_domains
 
-def generate_html_header():
+def generate_html_header(class_name="Building_A"):
     """Generate HTML header with CSS styling"""
     return '''<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Building_A Feature Class - Complete Attribute Reference Manual</title>
+    <title>''' + class_name + ''' Feature Class - Complete Attribute Reference Manual</title>
     <style>
         body {
             font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
@@ -304,10 +315,10 @@ def generate_html_header():
 <body>
     <div class="container">'''
 
-def generate_toc(fields_with_domains, fields_without_domains):
+def generate_toc(fields_with_domains, fields_without_domains, class_name="Building_A"):
     """Generate table of contents"""
     html = '''
-        <h1>Building_A Feature Class - Complete Attribute Reference Manual</h1>
+        <h1>{} Feature Class - Complete Attribute Reference Manual</h1>
         
         <div class="summary-stats">
             <div class="stat-card">
@@ -330,6 +341,7 @@ def generate_toc(fields_with_domains, fields_without_domains):
             <div class="toc-section">
                 <h4>Fields with Domain Constraints ({} fields)</h4>
                 <ul class="toc-list">'''.format(
+        class_name,
         len(fields_with_domains) + len(fields_without_domains),
         len(fields_with_domains),
         len(fields_without_domains),
@@ -404,7 +416,7 @@ def generate_field_html(field_name, field_info):
                 
                 # Show first 20 values
                 for value in values[:20]:
-                    html += f'<tr><td>{value["name"]}</td><td class="code">{value["code"]}</td></tr>\n'
+                    html += f'<tr><td>{value["name"]}</td><td class="code">{code_text(value["code"])}</td></tr>\n'
                 
                 html += f'''
                     <tr><td colspan="2"><em>... and {len(values) - 20} more values</em></td></tr>
@@ -421,7 +433,7 @@ def generate_field_html(field_name, field_info):
                 <tbody>'''
                 
                 for value in values:
-                    html += f'<tr><td>{value["name"]}</td><td class="code">{value["code"]}</td></tr>\n'
+                    html += f'<tr><td>{value["name"]}</td><td class="code">{code_text(value["code"])}</td></tr>\n'
                 
                 html += '''
                 </tbody>
@@ -437,20 +449,8 @@ def generate_field_html(field_name, field_info):
     html += '</div>\n'
     return html
 
-def main():
-    xml_file = Path("DATABASE_EXPORT.XML")
-    output_file = Path("building_a_complete_manual.html")
-    
-    print(f"Processing {xml_file}...")
-    
-    # Parse fields and domains
-    fields_data, all_domains = parse_building_a_fields(xml_file)
-    
-    if not fields_data:
-        print("Error: Could not parse Building_A fields")
-        return
-    
-    # Separate fields with and without domains
+def split_fields_by_domain(fields_data):
+    """Separate fields with and without domains, preserving XML order"""
     fields_with_domains = OrderedDict()
     fields_without_domains = OrderedDict()
     
@@ -460,12 +460,16 @@ def main():
         else:
             fields_without_domains[field_name] = field_info
     
-    print(f"Found {len(fields_with_domains)} fields with domains")
-    print(f"Found {len(fields_without_domains)} fields without domains")
+    return fields_with_domains, fields_without_domains
+
+def build_html_manual(fields_data, class_name="Building_A"):
+    """Render the complete HTML manual for the given field data"""
+    fields_with_domains, fields_without_domains = split_fields_by_domain(fields_data)
+    prefix = class_name.lower()
     
     # Generate HTML
-    html_content = generate_html_header()
-    html_content += generate_toc(fields_with_domains, fields_without_domains)
+    html_content = generate_html_header(class_name)
+    html_content += generate_toc(fields_with_domains, fields_without_domains, class_name)
     
     # Fields with domains section
     html_content += '''
@@ -488,24 +492,50 @@ def main():
     html_content += '''
         <h2>File References</h2>
         <ul>
-            <li><strong>Complete Metadata:</strong> <code>building_a_complete_metadata.csv</code> - All 32 metadata properties for each field</li>
-            <li><strong>Detailed Domains:</strong> <code>building_a_domains_detailed.csv</code> - All domain values with descriptions</li>
-            <li><strong>Columnar Format:</strong> <code>building_a_domains_columnar.csv</code> - Pick lists in column format</li>
-            <li><strong>All Fields Summary:</strong> <code>building_a_all_fields.csv</code> - Overview of all fields</li>
+            <li><strong>Complete Metadata:</strong> <code>{prefix}_complete_metadata.csv</code> - All 32 metadata properties for each field</li>
+            <li><strong>Detailed Domains:</strong> <code>{prefix}_domains_detailed.csv</code> - All domain values with descriptions</li>
+            <li><strong>Columnar Format:</strong> <code>{prefix}_domains_columnar.csv</code> - Pick lists in column format</li>
+            <li><strong>All Fields Summary:</strong> <code>{prefix}_all_fields.csv</code> - Overview of all fields</li>
         </ul>
 
         <footer style="margin-top: 50px; padding-top: 20px; border-top: 1px solid #ddd; color: #7f8c8d; text-align: center;">
-            <p>Generated from geodatabase XML schema • Building_A Feature Class Complete Reference</p>
-            <p>Total: {} fields ({} with domains, {} without domains)</p>
+            <p>Generated from geodatabase XML schema • {class_name} Feature Class Complete Reference</p>
+            <p>Total: {total} fields ({with_domains} with domains, {without_domains} without domains)</p>
         </footer>
     </div>
 </body>
 </html>'''.format(
-        len(fields_data),
-        len(fields_with_domains),
-        len(fields_without_domains)
+        prefix=prefix,
+        class_name=class_name,
+        total=len(fields_data),
+        with_domains=len(fields_with_domains),
+        without_domains=len(fields_without_domains)
     )
     
+    return html_content
+
+def main():
+    xml_file = Path("DATABASE_EXPORT.XML")
+    output_file = Path("building_a_complete_manual.html")
+    
+    print(f"Processing {xml_file}...")
+    
+    # Parse fields and domains
+    fields_data, all_domains = parse_building_a_fields(xml_file)
+    
+    if not fields_data:
+        print("Error: Could not parse Building_A fields")
+        return
+    
+    # Separate fields with and without domains
+    fields_with_domains, fields_without_domains = split_fields_by_domain(fields_data)
+    
+    print(f"Found {len(fields_with_domains)} fields with domains")
+    print(f"Found {len(fields_without_domains)} fields without domains")
+    
+    # Generate HTML
+    html_content = build_html_manual(fields_data)
+    
     # Write HTML file
     with open(output_file, 'w', encoding='utf-8') as f:
         f.write(html_content)
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+Generate synthetic ESRI 10.8 workspace XML exports for testing and benchmarking
+Produces the same structure as DATABASE_EXPORT.XML (workspace domains, feature classes,
+fields with inline domains, indexes) with configurable counts so the extraction scripts
+can be measured without the confidential source export
+"""
+
+import argparse
+import csv
+import json
+import random
+import uuid
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from validate_records import load_field_rules
+
+SYLLABLES = ['ka', 'lo', 'me', 'nat', 'ri', 'sun', 'tor', 'vel', 'bra', 'dex',
+             'fin', 'gor', 'hal', 'is', 'jun', 'mar', 'nor', 'pel', 'qua', 'sto']
+
+SIMPLE_FIELD_TYPES = [
+    ('esriFieldTypeString', '255', '0', '0'),
+    ('esriFieldTypeString', '80', '0', '0'),
+    ('esriFieldTypeInteger', '4', '0', '0'),
+    ('esriFieldTypeDouble', '8', '0', '0'),
+    ('esriFieldTypeDate', '8', '0', '0'),
+]
+
+def make_word(rng, syllables=3):
+    """Build a pronounceable pseudo-word from random syllables"""
+    return ''.join(rng.choice(SYLLABLES) for _ in range(syllables))
+
+def make_domains(rng, domain_count, values_per_domain):
+    """Build the in-memory definitions for all synthetic workspace domains"""
+    domains = []
+    
+    for i in range(domain_count):
+        domain_name = f"Syn{make_word(rng, 2).title()}Domain{i:04d}"
+        description = f"Synthetic domain {i} describing {make_word(rng)} {make_word(rng)} values."
+        
+        if i % 10 == 9:
+            # Every tenth domain is a range domain
+            if i % 20 == 19:
+                domains.append({
+                    'name': domain_name,
+                    'type': 'esri:RangeDomain',
+                    'field_type': 'esriFieldTypeDouble',
+                    'value_type': 'xs:double',
+                    'description': description,
+                    'min_value': '0',
+                    'max_value': str(rng.randint(1, 1000) * 10.5)
+                })
+            else:
+                domains.append({
+                    'name': domain_name,
+                    'type': 'esri:RangeDomain',
+                    'field_type': 'esriFieldTypeSmallInteger',
+                    'value_type': 'xs:short',
+                    'description': description,
+                    'min_value': '-1',
+                    'max_value': str(rng.randint(10, 1000))
+                })
+            continue
+        
+        numeric = i % 5 == 4
+        values = []
+        for k in range(values_per_domain):
+            name = f"{make_word(rng).title()} {make_word(rng, 2).title()}"
+            if numeric:
+                code = str(k + 1)
+            else:
+                words = name.split()
+                code = f"{words[0].lower()}{words[1]}{k}"
+            values.append((name, code))
+        
+        domains.append({
+            'name': domain_name,
+            'type': 'esri:CodedValueDomain',
+            'field_type': 'esriFieldTypeSmallInteger' if numeric else 'esriFieldTypeString',
+            'value_type': 'xs:short' if numeric else 'xs:string',
+            'description': description,
+            'values': values
+        })
+    
+    return domains
+
+def domain_xml(domain, indent):
+    """Render a Domain element (used both at workspace level and inline on fields)"""
+    pad = ' ' * indent
+    lines = [
+        f'{pad}<Domain xsi:type="{domain["type"]}">',
+        f'{pad}  <DomainName>{escape(domain["name"])}</DomainName>',
+        f'{pad}  <FieldType>{domain["field_type"]}</FieldType>',
+        f'{pad}  <MergePolicy>esriMPTDefaultValue</MergePolicy>',
+        f'{pad}  <SplitPolicy>esriSPTDefaultValue</SplitPolicy>',
+        f'{pad}  <Description>{escape(domain["description"])}</Description>',
+        f'{pad}  <Owner></Owner>',
+    ]
+    
+    if domain['type'] == 'esri:CodedValueDomain':
+        lines.append(f'{pad}  <CodedValues xsi:type="esri:ArrayOfCodedValue">')
+        for name, code in domain['values']:
+            lines.append(f'{pad}    <CodedValue xsi:type="esri:CodedValue">')
+            lines.append(f'{pad}      <Name>{escape(name)}</Name>')
+            lines.append(f'{pad}      <Code xsi:type="{domain["value_type"]}">{escape(code)}</Code>')
+            lines.append(f'{pad}    </CodedValue>')
+        lines.append(f'{pad}  </CodedValues>')
+    else:
+        lines.append(f'{pad}  <MaxValue xsi:type="{domain["value_type"]}">{domain["max_value"]}</MaxValue>')
+        lines.append(f'{pad}  <MinValue xsi:type="{domain["value_type"]}">{domain["min_value"]}</MinValue>')
+    
+    lines.append(f'{pad}</Domain>')
+    return '\n'.join(lines) + '\n'
+
+def field_xml(field, indent, inline_domains=True):
+    """Render a Field element, optionally with its full domain definition inline"""
+    pad = ' ' * indent
+    lines = [
+        f'{pad}<Field xsi:type="esri:Field">',
+        f'{pad}  <Name>{escape(field["name"])}</Name>',
+        f'{pad}  <Type>{field["type"]}</Type>',
+        f'{pad}  <IsNullable>{field["is_nullable"]}</IsNullable>',
+        f'{pad}  <Length>{field["length"]}</Length>',
+        f'{pad}  <Precision>{field["precision"]}</Precision>',
+        f'{pad}  <Scale>{field["scale"]}</Scale>',
+    ]
+    
+    if field.get('required'):
+        lines.append(f'{pad}  <Required>true</Required>')
+    if field.get('editable') is not None:
+        lines.append(f'{pad}  <Editable>{field["editable"]}</Editable>')
+    
+    if field['type'] == 'esriFieldTypeGeometry':
+        lines.extend([
+            f'{pad}  <GeometryDef xsi:type="esri:GeometryDef">',
+            f'{pad}    <AvgNumPoints>0</AvgNumPoints>',
+            f'{pad}    <GeometryType>esriGeometryPolygon</GeometryType>',
+            f'{pad}    <HasM>false</HasM>',
+            f'{pad}    <HasZ>true</HasZ>',
+            f'{pad}    <GridSize0>79</GridSize0>',
+            f'{pad}  </GeometryDef>',
+        ])
+    
+    lines.append(f'{pad}  <AliasName>{escape(field["alias"])}</AliasName>')
+    lines.append(f'{pad}  <ModelName>{escape(field["name"])}</ModelName>')
+    
+    xml = '\n'.join(lines) + '\n'
+    
+    domain = field.get('domain')
+    if domain is not None:
+        if inline_domains:
+            xml += domain_xml(domain, indent + 2)
+        else:
+            xml += (f'{pad}  <Domain xsi:type="{domain["type"]}">\n'
+                    f'{pad}    <DomainName>{escape(domain["name"])}</DomainName>\n'
+                    f'{pad}  </Domain>\n')
+    
+    return xml + f'{pad}</Field>\n'
+
+def make_fields(rng, field_count, domain_field_count, domains):
+    """Build the field list for one feature class"""
+    fields = [
+        {'name': 'OBJECTID', 'alias': 'OBJECTID', 'type': 'esriFieldTypeOID', 'is_nullable': 'false',
+         'length': '4', 'precision': '0', 'scale': '0', 'required': True, 'editable': 'false'},
+        {'name': 'Shape', 'alias': 'Shape', 'type': 'esriFieldTypeGeometry', 'is_nullable': 'true',
+         'length': '0', 'precision': '0', 'scale': '0', 'required': True},
+        {'name': 'GlobalID', 'alias': 'GlobalID', 'type': 'esriFieldTypeGlobalID', 'is_nullable': 'false',
+         'length': '38', 'precision': '0', 'scale': '0', 'required': True, 'editable': 'false'},
+    ]
+    
+    for j in range(max(field_count - len(fields), 0)):
+        word = make_word(rng)
+        field_name = f"{word}Attr{j:03d}"
+        alias = f"{word.title()} Attribute {j:03d}"
+        
+        if j < domain_field_count and domains:
+            domain = rng.choice(domains)
+            field_type = domain['field_type']
+            length = '2' if field_type == 'esriFieldTypeSmallInteger' else ('8' if field_type == 'esriFieldTypeDouble' else '80')
+            fields.append({'name': field_name, 'alias': alias, 'type': field_type, 'is_nullable': 'true',
+                           'length': length, 'precision': '0', 'scale': '0', 'domain': domain})
+        else:
+            field_type, length, precision, scale = SIMPLE_FIELD_TYPES[j % len(SIMPLE_FIELD_TYPES)]
+            fields.append({'name': field_name, 'alias': alias, 'type': field_type, 'is_nullable': 'true',
+                           'length': length, 'precision': precision, 'scale': scale})
+    
+    return fields
+
+def feature_class_xml(class_name, fields, inline_domains=True):
+    """Render a complete DEFeatureClass DataElement including its index definitions"""
+    parts = [
+        '      <DataElement xsi:type="esri:DEFeatureClass">\n',
+        f'        <CatalogPath>/FC={escape(class_name)}</CatalogPath>\n',
+        f'        <Name>{escape(class_name)}</Name>\n',
+        '        <ChildrenExpanded>false</ChildrenExpanded>\n',
+        '        <DatasetType>esriDTFeatureClass</DatasetType>\n',
+        '        <Versioned>false</Versioned>\n',
+        '        <CanVersion>false</CanVersion>\n',
+        '        <HasOID>true</HasOID>\n',
+        '        <OIDFieldName>OBJECTID</OIDFieldName>\n',
+        '        <Fields xsi:type="esri:Fields">\n',
+        '          <FieldArray xsi:type="esri:ArrayOfField">\n',
+    ]
+    
+    for field in fields:
+        parts.append(field_xml(field, 12, inline_domains))
+    
+    parts.append('          </FieldArray>\n')
+    parts.append('        </Fields>\n')
+    
+    # Index definitions repeat the full field definition, as in real exports
+    parts.append('        <Indexes xsi:type="esri:Indexes">\n')
+    parts.append('          <IndexArray xsi:type="esri:ArrayOfIndex">\n')
+    for index_name, field in (('FDO_OBJECTID', fields[0]), ('UUID_' + class_name, fields[2])):
+        parts.append('            <Index xsi:type="esri:Index">\n')
+        parts.append(f'              <Name>{escape(index_name)}</Name>\n')
+        parts.append('              <IsUnique>true</IsUnique>\n')
+        parts.append('              <IsAscending>true</IsAscending>\n')
+        parts.append('              <Fields xsi:type="esri:Fields">\n')
+        parts.append('                <FieldArray xsi:type="esri:ArrayOfField">\n')
+        parts.append(field_xml(field, 18, inline_domains))
+        parts.append('                </FieldArray>\n')
+        parts.append('              </Fields>\n')
+        parts.append('            </Index>\n')
+    parts.append('          </IndexArray>\n')
+    parts.append('        </Indexes>\n')
+    
+    parts.extend([
+        '        <FeatureType>esriFTSimple</FeatureType>\n',
+        '        <ShapeType>esriGeometryPolygon</ShapeType>\n',
+        '        <ShapeFieldName>Shape</ShapeFieldName>\n',
+        '        <HasM>false</HasM>\n',
+        '        <HasZ>true</HasZ>\n',
+        '        <HasSpatialIndex>true</HasSpatialIndex>\n',
+        '        <SpatialReference xsi:type="esri:ProjectedCoordinateSystem">\n',
+        '          <WKT>PROJCS[&quot;WGS_1984_Web_Mercator_Auxiliary_Sphere&quot;]</WKT>\n',
+        '          <WKID>102100</WKID>\n',
+        '          <LatestWKID>3857</LatestWKID>\n',
+        '        </SpatialReference>\n',
+        '      </DataElement>\n',
+    ])
+    
+    return ''.join(parts)
+
+def generate_synthetic_export(output_file, feature_classes=10, fields_per_class=85, domains=740,
+                              values_per_domain=20, domain_fields_per_class=32, inline_domains=True, seed=0):
+    """Write a synthetic workspace export and return a summary of what was generated
+
+    The first feature class is always named Building_A so the existing extraction
+    scripts can run against the output unchanged.
+    """
+    rng = random.Random(seed)
+    domain_defs = make_domains(rng, domains, values_per_domain)
+    total_fields = 0
+    
+    with open(output_file, 'w', encoding='utf-8', newline='\n') as out:
+        out.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        out.write('<esri:Workspace xmlns:esri="http://www.esri.com/schemas/ArcGIS/10.8" '
+                  'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+                  'xmlns:xs="http://www.w3.org/2001/XMLSchema">\n')
+        out.write('  <WorkspaceDefinition xsi:type="esri:WorkspaceDefinition">\n')
+        out.write('    <WorkspaceType>esriLocalDatabaseWorkspace</WorkspaceType>\n')
+        out.write('    <Version></Version>\n')
+        
+        # Workspace-level domain library
+        out.write('    <Domains xsi:type="esri:ArrayOfDomain">\n')
+        for domain in domain_defs:
+            out.write(domain_xml(domain, 6))
+        out.write('    </Domains>\n')
+        
+        # Feature classes are generated and written one at a time to keep memory flat
+        out.write('    <DatasetDefinitions xsi:type="esri:ArrayOfDataElement">\n')
+        for i in range(feature_classes):
+            class_name = 'Building_A' if i == 0 else f"{make_word(rng).title()}_{i:04d}"
+            fields = make_fields(rng, fields_per_class, domain_fields_per_class, domain_defs)
+            total_fields += len(fields)
+            out.write(feature_class_xml(class_name, fields, inline_domains))
+        out.write('    </DatasetDefinitions>\n')
+        
+        out.write('    <Metadata xsi:type="esri:XmlPropertySet"></Metadata>\n')
+        out.write('  </WorkspaceDefinition>\n')
+        out.write('  <WorkspaceData xsi:type="esri:WorkspaceData"></WorkspaceData>\n')
+        out.write('</esri:Workspace>\n')
+    
+    return {
+        'output_file': str(output_file),
+        'bytes': Path(output_file).stat().st_size,
+        'feature_classes': feature_classes,
+        'fields': total_fields,
+        'domains': len(domain_defs),
+        'coded_values': sum(len(d.get('values', [])) for d in domain_defs)
+    }
+
+def synthetic_value(rng, rule, row_number):
+    """Return a valid text value for one field rule"""
+    if rule['codes']:
+        return rng.choice(rule['codes'])
+    field_type = rule['type']
+    integer = field_type in ('esriFieldTypeSmallInteger', 'esriFieldTypeInteger', 'esriFieldTypeOID')
+    if rule['min'] is not None and rule['max'] is not None:
+        if integer:
+            return str(rng.randint(int(rule['min']), int(rule['max'])))
+        return str(round(rng.uniform(rule['min'], rule['max']), 2))
+    if field_type == 'esriFieldTypeOID':
+        return str(row_number)
+    if integer:
+        return str(rng.randint(0, 30000))
+    if field_type in ('esriFieldTypeDouble', 'esriFieldTypeSingle'):
+        return str(round(rng.uniform(0, 10000), 3))
+    if field_type == 'esriFieldTypeDate':
+        # RFC 3339, which both the record validator and the JSON Schema date-time format accept
+        return (f"20{rng.randint(10, 25)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+                f"T{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}Z")
+    if field_type in ('esriFieldTypeGUID', 'esriFieldTypeGlobalID'):
+        return '{' + str(uuid.UUID(int=rng.getrandbits(128))).upper() + '}'
+    text = f"{make_word(rng).title()} {make_word(rng, 2)}"
+    return text[:rule['length']] if rule['length'] else text
+
+def invalid_value(rng, rule):
+    """Return a value that breaks one of the field's rules"""
+    if not rule['nullable']:
+        return ''
+    if rule['codes']:
+        return 'notACode'
+    if rule['max'] is not None:
+        return str(int(rule['max']) + 1)
+    if rule['type'] in ('esriFieldTypeString',) and rule['length']:
+        return 'x' * (rule['length'] + 1)
+    return 'not-a-value'
+
+def generate_synthetic_records(rules, output_file, rows=10000, error_rate=0.01, records_format=None, seed=0):
+    """Write synthetic records for the given validation rules as CSV or NDJSON
+
+    About error_rate of the rows get one deliberately invalid value, and a tenth of
+    nullable values are left empty. Returns the number of rows made invalid.
+    """
+    rng = random.Random(seed)
+    fields = list(rules.values())
+    records_format = records_format or ('ndjson' if str(output_file).endswith(('.ndjson', '.jsonl')) else 'csv')
+    invalid_rows = 0
+    
+    with open(output_file, 'w', newline='', encoding='utf-8') as out:
+        writer = csv.writer(out) if records_format == 'csv' else None
+        if writer:
+            writer.writerow([rule['name'] for rule in fields])
+        for row_number in range(1, rows + 1):
+            values = [('' if rule['nullable'] and rng.random() < 0.1 else synthetic_value(rng, rule, row_number))
+                      for rule in fields]
+            if rng.random() < error_rate:
+                bad = rng.randrange(len(fields))
+                values[bad] = invalid_value(rng, fields[bad])
+                invalid_rows += 1
+            if writer:
+                writer.writerow(values)
+            else:
+                record = {rule['name']: value for rule, value in zip(fields, values) if value != ''}
+                out.write(json.dumps(record) + '\n')
+    
+    return invalid_rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic ESRI 10.8 workspace XML export")
+    parser.add_argument('--output', default='SYNTHETIC_EXPORT.XML', help="Output XML file")
+    parser.add_argument('--feature-classes', type=int, default=10, help="Number of feature classes (first is Building_A)")
+    parser.add_argument('--fields', type=int, default=85, help="Fields per feature class")
+    parser.add_argument('--domain-fields', type=int, default=32, help="Fields per class bound to a domain")
+    parser.add_argument('--domains', type=int, default=740, help="Number of workspace domains")
+    parser.add_argument('--values', type=int, default=20, help="Coded values per coded value domain")
+    parser.add_argument('--no-inline-domains', action='store_true',
+                        help="Reference domains by name on fields instead of repeating the full definition")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed for reproducible output")
+    parser.add_argument('--records', type=int, default=0,
+                        help="Also write this many synthetic Building_A records for validation benchmarks")
+    parser.add_argument('--records-output', default='building_a_records.csv',
+                        help="Records file (.csv, or .ndjson/.jsonl for NDJSON)")
+    parser.add_argument('--error-rate', type=float, default=0.01, help="Fraction of records with one invalid value")
+    args = parser.parse_args()
+    
+    print(f"Generating {args.output}...")
+    summary = generate_synthetic_export(
+        args.output,
+        feature_classes=args.feature_classes,
+        fields_per_class=args.fields,
+        domains=args.domains,
+        values_per_domain=args.values,
+        domain_fields_per_class=args.domain_fields,
+        inline_domains=not args.no_inline_domains,
+        seed=args.seed
+    )
+    
+    print(f"Wrote {summary['bytes'] / 1024 / 1024:.1f} MB")
+    print(f"Feature classes: {summary['feature_classes']}")
+    print(f"Fields: {summary['fields']}")
+    print(f"Domains: {summary['domains']} ({summary['coded_values']} coded values)")
+    
+    if args.records:
+        invalid = generate_synthetic_records(load_field_rules(args.output), args.records_output,
+                                             args.records, args.error_rate, seed=args.seed)
+        print(f"Wrote {args.records} records ({invalid} with an invalid value) to {args.records_output}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,216 @@
+"""
+Code generation of specialised per-class validator modules
+Turns the compiled field rules of a feature class into a standalone Python module
+with one flat validation function: frozenset membership tests, inlined range,
+length and type checks, and no rule lookups at runtime. A schema fingerprint
+stored in the module decides when it has to be regenerated.
+"""
+
+import hashlib
+import json
+import re
+from pathlib import Path
+
+from output_scheduler import atomic_output
+from validate_records import (
+    INTEGER_LIMITS, REAL_TYPES, GUID_TYPES, GUID_PATTERN, comparable_codes, load_field_rules, load_validator_module
+)
+
+GENERATOR_VERSION = 2
+FINGERPRINT_PATTERN = re.compile(r"^SCHEMA_FINGERPRINT = '([0-9a-f]+)'$", re.MULTILINE)
+
+def schema_fingerprint(rules):
+    """Stable hash of everything the generated code depends on"""
+    payload = json.dumps({'generator': GENERATOR_VERSION, 'rules': rules}, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+def validator_module_path(class_name, output_dir):
+    return Path(output_dir) / f"{class_name.lower()}_validator.py"
+
+def error_line(indent, rule, code):
+    return f"{' ' * indent}errors.append(({rule['name']!r}, {code!r}))"
+
+def range_condition(rule, variable):
+    parts = []
+    if rule['min'] is not None:
+        parts.append(f"{variable} < {rule['min']!r}")
+    if rule['max'] is not None:
+        parts.append(f"{variable} > {rule['max']!r}")
+    return ' or '.join(parts)
+
+def domain_lines(rule, codes_name, indent, keyword, value_expr='value'):
+    """elif-chained domain checks for a value that already passed its type checks"""
+    pad = ' ' * indent
+    lines = []
+    if codes_name:
+        lines += [f"{pad}{keyword} {value_expr} not in {codes_name}:", error_line(indent + 4, rule, 'domain')]
+    elif rule['min'] is not None or rule['max'] is not None:
+        lines += [f"{pad}{keyword} {range_condition(rule, 'number')}:", error_line(indent + 4, rule, 'range')]
+    return lines
+
+def field_body_lines(rule, codes_name):
+    """Checks for a non-empty value, indented for the body of the per-field if"""
+    field_type = rule['type']
+    limits = INTEGER_LIMITS.get(field_type)
+    lines = []
+    if limits is not None:
+        lines += [
+            "        if value.__class__ is not str:",
+            "            value = _text(value, True)",
+            "        try:",
+            "            number = int(value)",
+            "        except ValueError:",
+            error_line(12, rule, 'type'),
+            "        else:",
+            f"            if number < {limits[0]} or number > {limits[1]}:",
+            error_line(16, rule, 'type'),
+        ]
+        return lines + domain_lines(rule, codes_name, 12, 'elif', 'number')
+    
+    lines += ["        if value.__class__ is not str:", "            value = _text(value, False)"]
+    if field_type in REAL_TYPES:
+        lines += [
+            "        try:",
+            "            number = float(value)",
+            "        except ValueError:",
+            error_line(12, rule, 'type'),
+            "        else:",
+            "            if not _isfinite(number):",
+            error_line(16, rule, 'type'),
+        ]
+        return lines + domain_lines(rule, codes_name, 12, 'elif', 'number')
+    
+    if field_type == 'esriFieldTypeDate':
+        check, error = "not _is_date(value)", 'type'
+    elif field_type in GUID_TYPES:
+        check, error = "not _GUID(value)", 'type'
+    elif rule['length']:
+        check, error = f"len(value) > {rule['length']}", 'length'
+    else:
+        check, error = None, None
+    
+    keyword = 'if'
+    if check:
+        lines += [f"        if {check}:", error_line(12, rule, error)]
+        keyword = 'elif'
+    if codes_name:
+        lines += [f"        {keyword} value not in {codes_name}:", error_line(12, rule, 'domain')]
+    elif rule['min'] is not None or rule['max'] is not None:
+        # Range domain on a text field: parse, then compare
+        indent = 12 if check else 8
+        pad = ' ' * indent
+        if check:
+            lines.append("        else:")
+        lines += [
+            f"{pad}try:",
+            f"{pad}    number = float(value)",
+            f"{pad}except ValueError:",
+            error_line(indent + 4, rule, 'type'),
+            f"{pad}else:",
+            f"{pad}    if {range_condition(rule, 'number')}:",
+            error_line(indent + 8, rule, 'range'),
+        ]
+    elif not check:
+        lines.append("        pass")
+    return lines
+
+def generate_validator_source(class_name, rules, fingerprint=None):
+    """Return the source of a validator module for one feature class"""
+    fingerprint = fingerprint or schema_fingerprint(rules)
+    fields = list(rules)
+    lines = [
+        '"""',
+        f'Generated validator for the {class_name} feature class',
+        'Do not edit: regenerate with gisschema codegen when the schema changes',
+        '"""',
+        '',
+        'import re',
+        'from datetime import datetime',
+        'from math import isfinite as _isfinite',
+        '',
+        f"CLASS_NAME = {class_name!r}",
+        f"SCHEMA_FINGERPRINT = {fingerprint!r}",
+        "FIELDS = (",
+    ]
+    lines += [f"    {name!r}," for name in fields]
+    lines += [
+        ")",
+        f"_GUID = re.compile({GUID_PATTERN.pattern!r}).match",
+        '',
+    ]
+    
+    codes_names = {}
+    for i, (name, rule) in enumerate(rules.items()):
+        if rule['codes'] is not None:
+            codes_names[name] = f"_CODES_{i}"
+            lines.append(f"_CODES_{i} = frozenset({tuple(sorted(comparable_codes(rule)))!r})")
+    if codes_names:
+        lines.append('')
+    
+    lines += [
+        'def _text(value, integer):',
+        '    if isinstance(value, bool):',
+        "        return 'true' if value else 'false'",
+        '    if integer and isinstance(value, float) and value.is_integer():',
+        '        return str(int(value))',
+        '    return str(value)',
+        '',
+        'def _is_date(value):',
+        '    try:',
+        "        datetime.fromisoformat(value[:-1] if value.endswith('Z') else value)",
+        '    except ValueError:',
+        '        return False',
+        '    return True',
+        '',
+        'def validate_row(row):',
+        '    """Validate values given in FIELDS order; return a list of (field, error code)"""',
+        '    errors = []',
+        f"    if len(row) < {len(fields)}:",
+        f"        row = list(row) + [None] * ({len(fields)} - len(row))",
+    ]
+    for i, (name, rule) in enumerate(rules.items()):
+        lines.append(f"    value = row[{i}]")
+        if rule['nullable']:
+            lines.append("    if value is not None and value != '':")
+        else:
+            lines += ["    if value is None or value == '':", error_line(8, rule, 'null'), "    else:"]
+        lines += field_body_lines(rule, codes_names.get(name))
+    lines += [
+        '    return errors',
+        '',
+        'def validate_record(record):',
+        '    """Validate a dict keyed by field name; missing keys count as null"""',
+        '    get = record.get',
+        '    return validate_row([get(name) for name in FIELDS])',
+    ]
+    return '\n'.join(lines)
+
+def stored_fingerprint(module_path):
+    """Fingerprint recorded in an existing generated module, or None"""
+    try:
+        with open(module_path, encoding='utf-8') as f:
+            match = FINGERPRINT_PATTERN.search(f.read(4096))
+    except OSError:
+        return None
+    return match.group(1) if match else None
+
+def ensure_validator_module(class_name, rules, output_dir, force=False):
+    """Write the validator module unless an up-to-date one already exists
+
+    Returns (module path, regenerated flag).
+    """
+    module_path = validator_module_path(class_name, output_dir)
+    fingerprint = schema_fingerprint(rules)
+    if not force and stored_fingerprint(module_path) == fingerprint:
+        return module_path, False
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    with atomic_output(module_path) as tmp_path:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(generate_validator_source(class_name, rules, fingerprint))
+    return module_path, True
+
+def compile_validator(xml_file, class_name="Building_A", output_dir="validators", force=False):
+    """Parse the export, regenerate the class's validator if its schema changed and import it"""
+    rules = load_field_rules(xml_file, class_name)
+    module_path, regenerated = ensure_validator_module(class_name, rules, output_dir, force)
+    return load_validator_module(module_path), regenerated
\ No newline at end of file
@@ -0,0 +1,470 @@
+#!/usr/bin/env python3
+"""
+Unified command line entry point for the GIS schema extraction tools
+Parses the geodatabase export once per run and fans the model out to the
+selected writers in the same process
+
+Usage:
+    python3 gisschema.py extract --input DATABASE_EXPORT.XML --classes Building_A --outputs detailed,columnar,html
+    python3 gisschema.py extract --input DATABASE_EXPORT.XML --classes all --output-dir catalogue --checkpoint
+    python3 gisschema.py watch --input shared/DATABASE_EXPORT.XML --output-dir catalogue --poll-interval 10
+    python3 gisschema.py serve --input DATABASE_EXPORT.XML --port 8765
+    python3 gisschema.py validate --records collected.csv --report validation_errors.csv --jobs 4
+    python3 gisschema.py decode --records collected.csv --output collected_names.csv
+    python3 gisschema.py match --field country --records legacy.csv --column Country --output legacy_matched.csv
+    python3 gisschema.py map-headers --records contractor.csv --output header_mapping.csv
+    python3 gisschema.py codegen --classes Building_A --output-dir validators
+    python3 gisschema.py batch --inputs exports/ --output-dir catalogue --jobs 4 --memory-limit 2048
+    python3 gisschema.py consolidate-domains --inputs exports/ --output-dir domain_library
+    python3 gisschema.py template --classes all --output field_template.xlsx --dropdown display
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+from extraction_pipeline import OUTPUT_WRITERS, load_schema, run_pipeline
+from instrumentation import Instrumentation, profiled
+from output_scheduler import atomic_output
+from progress import DEFAULT_INTERVAL, ProgressReporter, input_size
+from schema_service import serve
+from header_mapper import load_header_index, map_headers, read_headers, export_header_mapping, mapping_summary
+from fuzzy_match import load_aliases, load_domain_matcher, match_records
+from decode_domains import DIRECTIONS, load_field_codecs, decode_records
+from validate_records import compile_field_rules, load_field_rules, validate_records, print_validation_summary
+from generate_validator_module import ensure_validator_module
+from batch_extract import run_batch
+from consolidate_domains import consolidate_exports
+from resumable_extract import run_resumable
+from watch_extract import ExportWatcher, watch_export
+from xlsx_template import DROPDOWNS, iter_class_models, write_template
+
+def split_list(value):
+    """Split a comma-separated option value into a list of stripped names"""
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+def parse_classes(value):
+    """Return the requested feature class names, or None for 'all'"""
+    return None if value.strip().lower() == 'all' else split_list(value)
+
+def parse_outputs(value):
+    """Return the requested output names, validating them against the writer registry"""
+    if value.strip().lower() == 'all':
+        return list(OUTPUT_WRITERS)
+    outputs = split_list(value)
+    unknown = [output for output in outputs if output not in OUTPUT_WRITERS]
+    if unknown:
+        raise argparse.ArgumentTypeError(
+            f"unknown output(s) {', '.join(unknown)}; choose from {', '.join(OUTPUT_WRITERS)}")
+    return outputs
+
+def add_extract_parser(subparsers):
+    parser = subparsers.add_parser('extract', help="Extract schema outputs for one or more feature classes",
+                                   description="Parse the export once and write every selected output")
+    parser.add_argument('--input', default='DATABASE_EXPORT.XML',
+                        help="Geodatabase XML export, optionally .gz, .bz2, .xz, .zst or inside a .zip; '-' reads stdin")
+    parser.add_argument('--classes', type=parse_classes, default=['Building_A'],
+                        help="Comma-separated feature class names, or 'all' (default: Building_A)")
+    parser.add_argument('--outputs', type=parse_outputs, default=list(OUTPUT_WRITERS),
+                        help=f"Comma-separated outputs: {', '.join(OUTPUT_WRITERS)} (default: all)")
+    parser.add_argument('--output-dir', default='.', help="Directory for generated files")
+    parser.add_argument('--jobs', type=int, default=1,
+                        help="Number of writer threads; values above 1 write outputs concurrently")
+    parser.add_argument('--max-pending', type=int,
+                        help="Maximum writer jobs queued or running at once (default: twice --jobs)")
+    parser.add_argument('--fsync', action='store_true',
+                        help="fsync each output before renaming it into place")
+    parser.add_argument('--instrument', metavar='REPORT_JSON',
+                        help="Record per-stage wall/CPU time, peak RSS and tracemalloc peaks to this JSON file")
+    parser.add_argument('--no-tracemalloc', action='store_true',
+                        help="With --instrument, skip tracemalloc (lower overhead)")
+    parser.add_argument('--profile', metavar='PSTATS_FILE', help="Run under cProfile and dump pstats to this file")
+    parser.add_argument('--progress', choices=['text', 'json'],
+                        help="Report parse progress (MB/s, elements/s, ETA) on stderr as text or JSON events")
+    parser.add_argument('--progress-interval', type=float, default=DEFAULT_INTERVAL,
+                        help=f"Seconds between progress reports (default: {DEFAULT_INTERVAL})")
+    parser.add_argument('--checkpoint', nargs='?', const='', metavar='CHECKPOINT_FILE',
+                        help="Extract class by class, recording progress so an interrupted run resumes where it "
+                             "stopped (default file: .extract_checkpoint.jsonl in --output-dir); plain exports only; "
+                             "not with --instrument or --profile")
+    parser.add_argument('--restart', action='store_true',
+                        help="With --checkpoint, ignore an existing checkpoint and start from the beginning")
+    parser.set_defaults(func=run_extract)
+
+def print_read_stats(stats):
+    if not stats['compression']:
+        print(f"Read {stats['input_mb']} MB XML in {stats['wall_s']}s ({stats['input_mb_per_s']} MB/s)")
+        return
+    print(f"Read {stats['input_mb']} MB {stats['compression']} -> {stats['output_mb']} MB XML in {stats['wall_s']}s "
+          f"({stats['input_mb_per_s']} MB/s compressed, {stats['output_mb_per_s']} MB/s decompressed)")
+    print(f"  decompression {stats['decompress_s']}s on the reader thread, parser waited {stats['parser_wait_s']}s, "
+          f"{stats['overlap_s']}s overlapped with parsing")
+
+def run_checkpointed_extract(args, progress):
+    if args.input == '-':
+        print("Error: --checkpoint needs an export file, not stdin", file=sys.stderr)
+        return 2
+    if args.instrument or args.profile:
+        print("Error: --instrument and --profile cannot be combined with --checkpoint", file=sys.stderr)
+        return 2
+    print(f"Processing {args.input} with checkpoints...")
+    try:
+        summary, written = run_resumable(args.input, args.classes, args.output_dir, args.outputs,
+                                         args.checkpoint or None, args.restart, args.fsync, progress=progress)
+    except ValueError as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return 2
+    if summary['discarded']:
+        print(f"Starting over: {summary['discarded']}")
+    elif summary['resumed']:
+        print(f"Resuming from {summary['checkpoint']} at byte {summary['next_offset']:,}")
+    print(f"  {len(summary['skipped'])} classes already done, {len(summary['redone'])} redone (outputs missing), "
+          f"{len(summary['extracted'])} extracted")
+    for class_name in summary['missing']:
+        print(f"  - {class_name}: feature class not found!")
+    print(f"\nWrote {len(written)} files ({', '.join(args.outputs)}) to {args.output_dir}")
+    return 1 if summary['missing'] and len(summary['missing']) == len(args.classes) else 0
+
+def run_extract(args):
+    progress = None
+    if args.progress:
+        progress = ProgressReporter(input_size(args.input), sys.stderr, args.progress == 'json', args.progress_interval)
+    if args.checkpoint is not None:
+        return run_checkpointed_extract(args, progress)
+    
+    print(f"Processing {args.input}...")
+    instrumentation = Instrumentation(trace_memory=not args.no_tracemalloc) if args.instrument else None
+    try:
+        with profiled(args.profile):
+            schema, written = run_pipeline(args.input, args.classes, args.output_dir, args.outputs,
+                                           instrumentation, args.jobs, args.max_pending, args.fsync, progress)
+    finally:
+        # Stop tracing and keep the stages measured so far, also when a stage failed
+        if instrumentation is not None:
+            instrumentation.stop()
+            instrumentation.write_report(args.instrument)
+            instrumentation.print_summary()
+            print(f"\nWrote instrumentation report to: {args.instrument}")
+    
+    if schema['input']['compression'] or args.input == '-':
+        print_read_stats(schema['input'])
+    print(f"Found {len(schema['domains'])} domain definitions at workspace level")
+    for class_name, class_model in schema['classes'].items():
+        print(f"  - {class_name}: {len(class_model['all_fields'])} fields, "
+              f"{len(class_model['fields_with_domains'])} with domains")
+    for class_name in schema['missing']:
+        print(f"  - {class_name}: feature class not found!")
+    print(f"\nWrote {len(written)} files ({', '.join(args.outputs)}) to {args.output_dir}")
+    return 1 if schema['missing'] and not schema['classes'] else 0
+
+def add_watch_parser(subparsers):
+    parser = subparsers.add_parser('watch', help="Re-extract whenever the export file changes",
+                                   description="Keep the model in memory and rewrite only the outputs of classes "
+                                               "that changed each time a new export is dropped in place")
+    parser.add_argument('--input', default='DATABASE_EXPORT.XML',
+                        help="Geodatabase XML export, optionally .gz, .bz2, .xz, .zst or inside a .zip")
+    parser.add_argument('--classes', type=parse_classes, default=None,
+                        help="Comma-separated feature class names, or 'all' (default: all)")
+    parser.add_argument('--outputs', type=parse_outputs, default=list(OUTPUT_WRITERS),
+                        help=f"Comma-separated outputs: {', '.join(OUTPUT_WRITERS)} (default: all)")
+    parser.add_argument('--output-dir', default='.', help="Directory for generated files")
+    parser.add_argument('--poll-interval', type=float, default=2.0,
+                        help="Seconds between export file checks; a change is processed once it holds for one interval")
+    parser.add_argument('--fsync', action='store_true',
+                        help="fsync each output before renaming it into place")
+    parser.set_defaults(func=run_watch)
+
+def run_watch(args):
+    if not os.path.exists(args.input):
+        print(f"Error: {args.input} not found", file=sys.stderr)
+        return 1
+    print(f"Watching {args.input} every {args.poll_interval}s, writing to {args.output_dir} (Ctrl+C to stop)")
+    watcher = ExportWatcher(args.input, args.classes, args.output_dir, args.outputs, args.fsync)
+    try:
+        watch_export(watcher, args.poll_interval)
+    except KeyboardInterrupt:
+        print("\nStopped")
+    return 0
+
+def add_serve_parser(subparsers):
+    parser = subparsers.add_parser('serve', help="Serve field, domain and code lookups over local HTTP",
+                                   description="Load the schema once and answer lookups, reloading when the export changes")
+    parser.add_argument('--input', default='DATABASE_EXPORT.XML',
+                        help="Geodatabase XML export, optionally .gz, .bz2, .xz, .zst or inside a .zip")
+    parser.add_argument('--classes', type=parse_classes, default=None,
+                        help="Comma-separated feature class names, or 'all' (default: all)")
+    parser.add_argument('--host', default='127.0.0.1', help="Address to bind (default: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=8765, help="Port to bind, 0 for any free port (default: 8765)")
+    parser.add_argument('--poll-interval', type=float, default=2.0,
+                        help="Seconds between export file checks for hot reload; 0 disables reloading")
+    parser.set_defaults(func=run_serve)
+
+def run_serve(args):
+    try:
+        asyncio.run(serve(args.input, args.classes, args.host, args.port, args.poll_interval))
+    except KeyboardInterrupt:
+        print("\nStopped")
+    return 0
+
+def add_validate_parser(subparsers):
+    parser = subparsers.add_parser('validate', help="Validate CSV/NDJSON records against a feature class schema",
+                                   description="Check every value against the field's type, Length, IsNullable "
+                                               "and coded value or range domain")
+    parser.add_argument('--input', default='DATABASE_EXPORT.XML',
+                        help="Geodatabase XML export, optionally .gz, .bz2, .xz, .zst or inside a .zip; '-' reads stdin")
+    parser.add_argument('--class', dest='class_name', default='Building_A', help="Feature class (default: Building_A)")
+    parser.add_argument('--records', required=True, help="CSV (with header) or NDJSON (.ndjson/.jsonl) record file")
+    parser.add_argument('--format', choices=['csv', 'ndjson'], help="Record format (default: from the file extension)")
+    parser.add_argument('--report', default='validation_errors.csv', help="Per-row error report CSV")
+    parser.add_argument('--summary', metavar='SUMMARY_JSON', help="Also write the error counts to this JSON file")
+    parser.add_argument('--jobs', type=int, default=1, help="Worker processes; values above 1 validate chunks in parallel")
+    parser.add_argument('--chunk-size', type=int, default=20000, help="Records per work unit (default: 20000)")
+    parser.add_argument('--compiled-dir', metavar='DIR',
+                        help="Validate with a generated validator module kept in DIR (regenerated if the schema changed)")
+    parser.set_defaults(func=run_validate)
+
+def run_validate(args):
+    rules = load_field_rules(args.input, args.class_name)
+    print(f"Loaded {len(rules)} field rules for {args.class_name} from {args.input}")
+    validator_path = None
+    if args.compiled_dir:
+        validator_path, regenerated = ensure_validator_module(args.class_name, rules, args.compiled_dir)
+        print(f"{'Generated' if regenerated else 'Using up-to-date'} validator: {validator_path}")
+    summary = validate_records(args.records, rules, args.report, args.format, args.jobs, args.chunk_size,
+                               validator_path)
+    if validator_path and not summary['compiled']:
+        print("Some schema fields have no column; fell back to the generic checkers")
+    print_validation_summary(summary)
+    print(f"\nWrote error report to: {args.report}")
+    if args.summary:
+        with open(args.summary, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+        print(f"Wrote summary to: {args.summary}")
+    return 1 if summary['invalid_rows'] else 0
+
+def add_decode_parser(subparsers):
+    parser = subparsers.add_parser('decode', help="Translate coded value columns between codes and display names",
+                                   description="Stream a CSV file and translate every coded value domain column")
+    parser.add_argument('--input', default='DATABASE_EXPORT.XML',
+                        help="Geodatabase XML export, optionally .gz, .bz2, .xz, .zst or inside a .zip; '-' reads stdin")
+    parser.add_argument('--class', dest='class_name', default='Building_A', help="Feature class (default: Building_A)")
+    parser.add_argument('--records', required=True, help="CSV file with a header row")
+    parser.add_argument('--output', required=True, help="Translated CSV file")
+    parser.add_argument('--fields', type=parse_classes, default=None,
+                        help="Comma-separated fields to translate, or 'all' coded value fields (default: all)")
+    parser.add_argument('--direction', choices=DIRECTIONS, default='to-name',
+                        help="to-name turns codes into display names, to-code the reverse (default: to-name)")
+    parser.add_argument('--backend', choices=['pandas', 'numpy', 'python'],
+                        help="Column translation backend (default: fastest available for the data)")
+    parser.add_argument('--unknown', choices=['keep', 'blank'], default='keep',
+                        help="Keep values that are not in the domain, or blank them (default: keep)")
+    parser.add_argument('--chunk-size', type=int, default=100000, help="Rows held in memory at once (default: 100000)")
+    parser.set_defaults(func=run_decode)
+
+def run_decode(args):
+    codecs = load_field_codecs(args.input, args.class_name, args.fields)
+    print(f"Compiled {len(codecs)} coded value domain fields for {args.class_name}")
+    summary = decode_records(args.records, codecs, args.output, args.direction, args.backend, args.unknown,
+                             args.chunk_size)
+    print(f"Translated {summary['rows']:,} rows ({args.direction}, {len(summary['columns'])} columns) "
+          f"in {summary['elapsed_s']:.2f}s")
+    for field, unknown_count in summary['columns'].items():
+        if unknown_count:
+            print(f"  {field}: {unknown_count:,} values not in domain")
+    print(f"\nWrote translated records to: {args.output}")
+    return 0
+
+def add_match_parser(subparsers):
+    parser = subparsers.add_parser('match', help="Fuzzy-match free-text values onto a coded value domain",
+                                   description="Map dirty free-text values to the closest code using an n-gram index")
+    parser.add_argument('--input', default='DATABASE_EXPORT.XML',
+                        help="Geodatabase XML export, optionally .gz, .bz2, .xz, .zst or inside a .zip; '-' reads stdin")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--field', help="Field whose coded value domain to match against")
+    target.add_argument('--domain', help="Workspace domain name to match against")
+    parser.add_argument('--class', dest='class_name', default='Building_A', help="Feature class for --field (default: Building_A)")
+    parser.add_argument('--records', required=True, help="CSV file with a header row")
+    parser.add_argument('--column', required=True, help="Column holding the free-text values")
+    parser.add_argument('--output', required=True, help="CSV with _code, _name and _score columns appended")
+    parser.add_argument('--aliases', help="CSV with alias,code columns for extra spellings (e.g. Deutschland)")
+    parser.add_argument('--threshold', type=float, default=0.5, help="Minimum Dice score from 0 to 1 (default: 0.5)")
+    parser.set_defaults(func=run_match)
+
+def run_match(args):
+    aliases = load_aliases(args.aliases) if args.aliases else None
+    matcher = load_domain_matcher(args.input, args.domain, args.class_name, args.field, aliases)
+    print(f"Indexed {len(matcher.entries)} coded values ({len(matcher.key_entry)} keys, {len(matcher.postings)} n-grams)")
+    summary = match_records(args.records, args.column, matcher, args.output, args.threshold)
+    print(f"Matched {summary['matched']:,} of {summary['rows']:,} rows ({summary['exact']:,} exact, "
+          f"{summary['unmatched']:,} unmatched) in {summary['elapsed_s']:.2f}s; "
+          f"{summary['cache_hits']:,} repeated values answered from cache")
+    print(f"\nWrote matched records to: {args.output}")
+    return 0
+
+def add_map_headers_parser(subparsers):
+    parser = subparsers.add_parser('map-headers', help="Map spreadsheet column headers to schema fields",
+                                   description="Resolve headers against field names, aliases and model names")
+    parser.add_argument('--input', default='DATABASE_EXPORT.XML',
+                        help="Geodatabase XML export, optionally .gz, .bz2, .xz, .zst or inside a .zip; '-' reads stdin")
+    parser.add_argument('--classes', type=parse_classes, default=['Building_A'],
+                        help="Comma-separated feature classes to search, or 'all' (default: Building_A)")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--records', help="CSV file whose first row holds the headers")
+    source.add_argument('--headers', type=split_list, help="Comma-separated headers")
+    parser.add_argument('--threshold', type=float, default=0.5,
+                        help="Minimum token overlap (Jaccard, 0 to 1) for fuzzy matches (default: 0.5)")
+    parser.add_argument('--output', help="Write the mapping to this CSV file")
+    parser.set_defaults(func=run_map_headers)
+
+def run_map_headers(args):
+    index = load_header_index(args.input, args.classes)
+    headers = args.headers if args.headers is not None else read_headers(args.records)
+    results = map_headers(headers, index, threshold=args.threshold)
+    print(f"Indexed {len(index['fields'])} fields; resolved {len(headers)} headers")
+    for result in results:
+        target = f"{result['class']}.{result['field']}" if result['field'] else \
+            ', '.join(f"{c['class']}.{c['field']}" for c in result['candidates'])
+        print(f"  {result['header']:<40} {result['status']:<11} {target}")
+    print("  " + ", ".join(f"{status}: {count}" for status, count in mapping_summary(results).items()))
+    if args.output:
+        export_header_mapping(results, args.output)
+        print(f"\nWrote header mapping to: {args.output}")
+    return 0
+
+def add_codegen_parser(subparsers):
+    parser = subparsers.add_parser('codegen', help="Generate specialised validator modules per feature class",
+                                   description="Write one Python module per class with a flat validate_row "
+                                               "function; modules whose schema fingerprint is unchanged are kept")
+    parser.add_argument('--input', default='DATABASE_EXPORT.XML',
+                        help="Geodatabase XML export, optionally .gz, .bz2, .xz, .zst or inside a .zip; '-' reads stdin")
+    parser.add_argument('--classes', type=parse_classes, default=['Building_A'],
+                        help="Comma-separated feature classes, or 'all' (default: Building_A)")
+    parser.add_argument('--output-dir', default='validators', help="Directory for the generated modules")
+    parser.add_argument('--force', action='store_true', help="Regenerate even if the fingerprint is unchanged")
+    parser.set_defaults(func=run_codegen)
+
+def run_codegen(args):
+    schema = load_schema(args.input, args.classes)
+    for class_name in schema['missing']:
+        print(f"Warning: feature class {class_name} not found in {args.input}")
+    for class_name, class_model in schema['classes'].items():
+        rules = compile_field_rules(class_model)
+        module_path, regenerated = ensure_validator_module(class_name, rules, args.output_dir, args.force)
+        print(f"  {class_name:<30} {'generated' if regenerated else 'up to date':<11} {module_path}")
+    return 1 if schema['missing'] else 0
+
+def add_batch_parser(subparsers):
+    parser = subparsers.add_parser('batch', help="Extract many geodatabase exports in parallel",
+                                   description="Process every export under the given directories or glob "
+                                               "patterns, one worker process per export")
+    parser.add_argument('--inputs', nargs='+', required=True,
+                        help="Directories (searched recursively for .xml files), export files or glob patterns")
+    parser.add_argument('--classes', type=parse_classes, default=['Building_A'],
+                        help="Comma-separated feature class names, or 'all' (default: Building_A)")
+    parser.add_argument('--outputs', type=parse_outputs, default=list(OUTPUT_WRITERS),
+                        help=f"Comma-separated outputs: {', '.join(OUTPUT_WRITERS)} (default: all)")
+    parser.add_argument('--output-dir', default='batch_output',
+                        help="Root directory; each export gets its own subdirectory plus catalogue.json/.csv")
+    parser.add_argument('--jobs', type=int, default=1, help="Worker processes (default: 1)")
+    parser.add_argument('--memory-limit', type=float, metavar='MB',
+                        help="Address-space budget per worker; exports exceeding it fail with MemoryError")
+    parser.set_defaults(func=run_batch_command)
+
+def run_batch_command(args):
+    def report(result):
+        detail = f"{len(result['classes'])} classes, {result['files']} files" if result['status'] == 'ok' \
+            else result['error']
+        if result['elapsed_s'] is not None:
+            detail += f", {result['elapsed_s']}s"
+        print(f"  {result['status']:<6} {result['export']} -> {result['output_dir']} ({detail})")
+    
+    results, catalogue = run_batch(args.inputs, args.output_dir, args.classes, args.outputs, args.jobs,
+                                   args.memory_limit, report)
+    if not results:
+        print("No exports found")
+        return 1
+    failed = [result for result in results if result['status'] != 'ok']
+    print(f"\nProcessed {len(results)} exports ({len(failed)} failed)")
+    print(f"Wrote catalogue to: {', '.join(str(path) for path in catalogue)}")
+    return 1 if failed else 0
+
+def add_consolidate_parser(subparsers):
+    parser = subparsers.add_parser('consolidate-domains', help="Deduplicate domains across many exports",
+                                   description="Hash every export's domains, build a master domain library "
+                                               "and report which exports deviate from it")
+    parser.add_argument('--inputs', nargs='+', required=True,
+                        help="Directories (searched recursively for .xml files), export files or glob patterns")
+    parser.add_argument('--output-dir', default='domain_library', help="Directory for the library and reports")
+    parser.add_argument('--threshold', type=float, default=0.8,
+                        help="Minimum code overlap (Jaccard) to report differently named domains as similar")
+    parser.set_defaults(func=run_consolidate)
+
+def run_consolidate(args):
+    summary, written = consolidate_exports(args.inputs, args.output_dir, args.threshold)
+    if not summary['exports']:
+        print("No exports found")
+        return 1
+    print(f"Read {summary['domain_records']} domains from {summary['exports']} exports "
+          f"({summary['distinct_contents']} distinct contents)")
+    print(f"Master library: {summary['domains']} domains, {summary['drifting_domains']} with deviating variants, "
+          f"{summary['similar_pairs']} similar pairs")
+    for export, error in summary['failed']:
+        print(f"Skipped {export}: {error}")
+    for path in written:
+        print(f"Wrote {path}")
+    return 0
+
+def add_template_parser(subparsers):
+    parser = subparsers.add_parser('template', help="Write an Excel data-entry template with domain dropdowns",
+                                   description="One sheet per feature class with dropdowns of the coded values "
+                                               "from a hidden Lists sheet, written in constant memory")
+    parser.add_argument('--input', default='DATABASE_EXPORT.XML',
+                        help="Geodatabase XML export, optionally .gz, .bz2, .xz, .zst or inside a .zip; '-' reads stdin")
+    parser.add_argument('--classes', type=parse_classes, default=['Building_A'],
+                        help="Comma-separated feature classes, or 'all' (default: Building_A)")
+    parser.add_argument('--output', default='field_template.xlsx', help="Workbook to write")
+    parser.add_argument('--dropdown', choices=list(DROPDOWNS), default='code',
+                        help="What the dropdowns offer: the codes, the display names, or 'name (code)' (default: code)")
+    parser.set_defaults(func=run_template)
+
+def run_template(args):
+    try:
+        with atomic_output(args.output) as tmp_path:
+            summaries = write_template(iter_class_models(args.input, args.classes), tmp_path, args.dropdown)
+    except ValueError as exc:
+        print(f"Error: {exc}")
+        return 1
+    for summary in summaries:
+        print(f"  {summary['sheet']:<31} {summary['fields']:>4} fields, {summary['validations']:>4} with validation")
+    written = {summary['class'] for summary in summaries}
+    missing = [name for name in args.classes or [] if name not in written]
+    for class_name in missing:
+        print(f"Warning: feature class {class_name} not found in {args.input}")
+    print(f"\nWrote template to: {args.output}")
+    return 1 if missing else 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='gisschema', description="GIS schema extraction tools")
+    subparsers = parser.add_subparsers(dest='command', metavar='command')
+    subparsers.required = True
+    add_extract_parser(subparsers)
+    add_watch_parser(subparsers)
+    add_serve_parser(subparsers)
+    add_validate_parser(subparsers)
+    add_decode_parser(subparsers)
+    add_match_parser(subparsers)
+    add_map_headers_parser(subparsers)
+    add_codegen_parser(subparsers)
+    add_batch_parser(subparsers)
+    add_consolidate_parser(subparsers)
+    add_template_parser(subparsers)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
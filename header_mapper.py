@@ -0,0 +1,144 @@
+"""
+Header-to-field mapping for arbitrary source spreadsheets
+Indexes every field's Name, AliasName and ModelName across the feature classes of
+an export (exact, normalised and token indexes) and resolves spreadsheet column
+headers against them, reporting ambiguous and unmatched headers
+"""
+
+import csv
+import re
+import unicodedata
+from collections import Counter, OrderedDict, defaultdict
+
+from extraction_pipeline import load_schema
+
+CAMEL_BOUNDARY = re.compile(r'(?<=[a-z0-9])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])')
+TOKEN_PATTERN = re.compile(r'[a-z]+|[0-9]+')
+
+def header_tokens(text):
+    """Split a header into lowercase word tokens: camelCase, snake_case, spaces and punctuation"""
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return TOKEN_PATTERN.findall(CAMEL_BOUNDARY.sub(' ', stripped).lower())
+
+def normalize_header(text):
+    """Separator- and case-insensitive key: 'Building Condition' and buildingCondition both give buildingcondition"""
+    return ''.join(header_tokens(text))
+
+def build_header_index(schema):
+    """Index the Name, AliasName and ModelName of every field in a loaded schema model"""
+    index = {
+        'fields': [],
+        'exact': defaultdict(list),
+        'normalized': defaultdict(set),
+        'tokens': defaultdict(set),
+        'keys': []
+    }
+    for class_name, class_model in schema['classes'].items():
+        for metadata in class_model['metadata']:
+            field_id = len(index['fields'])
+            index['fields'].append((class_name, metadata['name'], metadata['alias_name']))
+            index['exact'][metadata['name']].append(field_id)
+            seen = set()
+            for label in (metadata['name'], metadata['alias_name'], metadata['model_name']):
+                tokens = frozenset(header_tokens(label))
+                if not tokens or tokens in seen:
+                    continue
+                seen.add(tokens)
+                index['normalized'][normalize_header(label)].add(field_id)
+                key_id = len(index['keys'])
+                index['keys'].append((field_id, tokens))
+                for token in tokens:
+                    index['tokens'][token].add(key_id)
+    return index
+
+def load_header_index(xml_file, class_names=None):
+    """Parse the export and index the fields of the given classes (None for all)"""
+    return build_header_index(load_schema(xml_file, class_names))
+
+def describe(index, field_ids, scores=None):
+    return [{'class': index['fields'][i][0], 'field': index['fields'][i][1], 'alias': index['fields'][i][2],
+             'score': round(scores[i], 3) if scores else 1.0} for i in field_ids]
+
+def resolve_header(header, index, class_name=None, threshold=0.5, limit=3):
+    """Resolve one header to a field
+
+    Tries an exact Name match, then the normalised Name/AliasName/ModelName key,
+    then token overlap (Jaccard) at or above threshold. Returns a dict with the
+    method used (exact, normalized, token), 'ambiguous' when several fields tie
+    for the best match, or 'unmatched'.
+    """
+    def allowed(field_ids):
+        return sorted(i for i in field_ids if class_name is None or index['fields'][i][0] == class_name)
+    
+    result = {'header': header, 'status': 'unmatched', 'class': None, 'field': None, 'score': 0.0, 'candidates': []}
+    for method, field_ids in (('exact', index['exact'].get(header.strip(), ())),
+                              ('normalized', index['normalized'].get(normalize_header(header), ()))):
+        field_ids = allowed(field_ids)
+        if field_ids:
+            result['candidates'] = describe(index, field_ids)
+            if len(field_ids) > 1:
+                result['status'] = 'ambiguous'
+                return result
+            result.update(status=method, score=1.0, **{k: result['candidates'][0][k] for k in ('class', 'field')})
+            return result
+    
+    tokens = set(header_tokens(header))
+    shared = Counter()
+    for token in tokens:
+        for key_id in index['tokens'].get(token, ()):
+            shared[key_id] += 1
+    scores = {}
+    for key_id, common in shared.items():
+        field_id, key_tokens = index['keys'][key_id]
+        if class_name is not None and index['fields'][field_id][0] != class_name:
+            continue
+        score = common / (len(tokens) + len(key_tokens) - common)
+        if score >= threshold and score > scores.get(field_id, 0.0):
+            scores[field_id] = score
+    if not scores:
+        return result
+    
+    ranked = sorted(scores, key=lambda i: (-scores[i], i))
+    result['candidates'] = describe(index, ranked[:limit], scores)
+    best = [i for i in ranked if scores[i] == scores[ranked[0]]]
+    if len(best) > 1:
+        result['status'] = 'ambiguous'
+        result['score'] = round(scores[ranked[0]], 3)
+        return result
+    result.update(status='token', score=round(scores[ranked[0]], 3),
+                  **{k: result['candidates'][0][k] for k in ('class', 'field')})
+    return result
+
+def map_headers(headers, index, class_name=None, threshold=0.5):
+    """Resolve every header, flagging headers that map to a field already claimed by an earlier one"""
+    results = [resolve_header(header, index, class_name, threshold) for header in headers]
+    claimed = {}
+    for result in results:
+        if result['field'] is None:
+            continue
+        key = (result['class'], result['field'])
+        if key in claimed:
+            result['status'] = 'duplicate'
+            result['duplicate_of'] = claimed[key]
+        else:
+            claimed[key] = result['header']
+    return results
+
+def read_headers(records_file):
+    """First row of a CSV file"""
+    with open(records_file, newline='', encoding='utf-8-sig') as f:
+        return next(csv.reader(f), [])
+
+def export_header_mapping(results, output_file):
+    """Write one row per header with its status, mapped field and alternative candidates"""
+    with open(output_file, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['header', 'status', 'class', 'field', 'score', 'candidates'])
+        for result in results:
+            candidates = '; '.join(f"{c['class']}.{c['field']} ({c['score']})" for c in result['candidates'])
+            writer.writerow([result['header'], result['status'], result['class'] or '', result['field'] or '',
+                             result['score'], candidates])
+
+def mapping_summary(results):
+    return OrderedDict(sorted(Counter(result['status'] for result in results).items()))
\ No newline at end of file
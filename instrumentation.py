@@ -0,0 +1,196 @@
+"""
+Opt-in per-stage timing and memory instrumentation for the extraction pipeline
+Records wall time, CPU time, peak RSS and tracemalloc peaks per stage and per
+feature class, writes them as a JSON report, and can wrap a run in cProfile
+"""
+
+import cProfile
+import json
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import OrderedDict
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+def peak_rss_mb():
+    """Return the peak resident set size of this process in MB (None if unavailable)"""
+    if resource is None:
+        return None
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes on Linux and the BSDs
+    return maxrss / 1024 / 1024 if sys.platform == 'darwin' else maxrss / 1024
+
+class Instrumentation:
+    """Collects one record per executed stage
+
+    Stages may be nested; a stage's traced peak includes the peaks of the stages
+    nested inside it. CPU time is measured per thread, so stages running on
+    writer threads report their own CPU cost. tracemalloc's peak is process-wide,
+    so a stage that overlaps a stage on another thread (writers with jobs > 1)
+    records its traced peak as None rather than a figure shared with other stages.
+    """
+    
+    def __init__(self, trace_memory=True):
+        self.trace_memory = trace_memory
+        self.records = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # Threads with a stage open, and a count of the times one opened while another was running
+        self._active = set()
+        self._overlaps = 0
+        self._started = time.perf_counter()
+        self._owns_tracing = trace_memory and not tracemalloc.is_tracing()
+        if self._owns_tracing:
+            tracemalloc.start()
+    
+    def _stack(self):
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+    
+    @contextmanager
+    def stage(self, name, feature_class=None, **extra):
+        """Measure the enclosed block as one stage"""
+        stack = self._stack()
+        frame = {'peak': 0, 'start_traced': 0}
+        
+        with self._lock:
+            if not stack:
+                self._active.add(threading.get_ident())
+                if len(self._active) > 1:
+                    self._overlaps += 1
+            frame['overlaps'] = self._overlaps
+            frame['shared'] = len(self._active) > 1
+        
+        if self.trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1]['peak'] = max(stack[-1]['peak'], peak)
+            tracemalloc.reset_peak()
+            frame['start_traced'] = current
+        stack.append(frame)
+        
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            yield frame
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.thread_time() - cpu_start
+            stack.pop()
+            
+            with self._lock:
+                shared = frame['shared'] or frame['overlaps'] != self._overlaps
+                if not stack:
+                    self._active.discard(threading.get_ident())
+            
+            traced_peak = None
+            if self.trace_memory and not shared:
+                peak = max(frame['peak'], tracemalloc.get_traced_memory()[1])
+                if stack:
+                    stack[-1]['peak'] = max(stack[-1]['peak'], peak)
+                traced_peak = max(peak - frame['start_traced'], 0) / 1024 / 1024
+            
+            record = OrderedDict()
+            record['stage'] = name
+            record['feature_class'] = feature_class
+            record['wall_s'] = round(wall, 6)
+            record['cpu_s'] = round(cpu, 6)
+            record['peak_rss_mb'] = round(peak_rss_mb(), 1) if resource is not None else None
+            record['tracemalloc_peak_mb'] = round(traced_peak, 3) if traced_peak is not None else None
+            record['depth'] = len(stack)
+            record.update(extra)
+            
+            with self._lock:
+                self.records.append(record)
+    
+    def stop(self):
+        """Stop tracemalloc if this instance started it"""
+        if self._owns_tracing:
+            tracemalloc.stop()
+            self._owns_tracing = False
+    
+    def summary(self):
+        """Aggregate wall and CPU time by stage and by feature class"""
+        by_stage = OrderedDict()
+        by_class = OrderedDict()
+        
+        for record in self.records:
+            stage_totals = by_stage.setdefault(record['stage'], {'count': 0, 'wall_s': 0.0, 'cpu_s': 0.0})
+            stage_totals['count'] += 1
+            stage_totals['wall_s'] += record['wall_s']
+            stage_totals['cpu_s'] += record['cpu_s']
+            
+            if record['feature_class']:
+                class_totals = by_class.setdefault(record['feature_class'], {'wall_s': 0.0, 'cpu_s': 0.0})
+                class_totals['wall_s'] += record['wall_s']
+                class_totals['cpu_s'] += record['cpu_s']
+        
+        for totals in list(by_stage.values()) + list(by_class.values()):
+            totals['wall_s'] = round(totals['wall_s'], 6)
+            totals['cpu_s'] = round(totals['cpu_s'], 6)
+        
+        return {'by_stage': by_stage, 'by_feature_class': by_class}
+    
+    def report(self):
+        """Return the full report as a JSON-serialisable dict"""
+        return {
+            'total_wall_s': round(time.perf_counter() - self._started, 6),
+            'peak_rss_mb': round(peak_rss_mb(), 1) if resource is not None else None,
+            'tracemalloc': self.trace_memory,
+            'stages': self.records,
+            'summary': self.summary()
+        }
+    
+    def write_report(self, output_file):
+        """Write the report to a JSON file"""
+        with open(output_file, 'w', encoding='utf-8') as jsonfile:
+            json.dump(self.report(), jsonfile, indent=2)
+    
+    def print_summary(self):
+        """Print per-stage totals, slowest first"""
+        by_stage = self.summary()['by_stage']
+        print(f"\n{'Stage':<24} {'Count':>6} {'Wall (s)':>10} {'CPU (s)':>10}")
+        print("-" * 53)
+        for stage, totals in sorted(by_stage.items(), key=lambda item: -item[1]['wall_s']):
+            print(f"{stage:<24} {totals['count']:>6} {totals['wall_s']:>10.4f} {totals['cpu_s']:>10.4f}")
+
+class NullInstrumentation:
+    """Drop-in replacement used when instrumentation is not requested"""
+    
+    records = []
+    
+    @contextmanager
+    def stage(self, name, feature_class=None, **extra):
+        yield None
+    
+    def stop(self):
+        pass
+
+@contextmanager
+def profiled(output_file, top=25):
+    """Run the enclosed block under cProfile and dump pstats to output_file
+
+    Does nothing when output_file is None so callers can wrap unconditionally.
+    """
+    if output_file is None:
+        yield None
+        return
+    
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        profiler.dump_stats(output_file)
+        print(f"\nWrote cProfile stats to: {output_file}")
+        stats = pstats.Stats(profiler)
+        stats.sort_stats('cumulative').print_stats(top)
\ No newline at end of file
@@ -0,0 +1,101 @@
+"""
+Concurrent output writer scheduler
+Runs independent exporters on a thread pool with a bounded number of jobs in
+flight, and publishes every file atomically via a temporary file plus rename
+"""
+
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+
+@contextmanager
+def atomic_output(output_file, fsync=False):
+    """Yield a temporary path next to output_file and rename it into place on success
+
+    Readers never see a half-written file: either the previous version or the
+    complete new one. On error the temporary file is removed and the existing
+    output is left untouched.
+    """
+    output_file = Path(output_file)
+    # The writer creates the file itself so it gets the usual umask-based permissions
+    tmp_path = output_file.with_name(f".{output_file.name}.{uuid.uuid4().hex[:12]}.tmp")
+    try:
+        yield tmp_path
+        if fsync:
+            with open(tmp_path, 'rb') as f:
+                os.fsync(f.fileno())
+        os.replace(tmp_path, output_file)
+    except BaseException:
+        if tmp_path.exists():
+            tmp_path.unlink()
+        raise
+
+class WriterScheduler:
+    """Thread pool for writer jobs with bounded buffering
+
+    At most max_pending jobs are queued or running at once; submit() blocks
+    beyond that, so jobs that hold rendered output in memory cannot pile up.
+    Results are returned in submission order and the first error is re-raised
+    after the remaining jobs have finished.
+    """
+    
+    def __init__(self, max_workers=4, max_pending=None):
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max_pending or self.max_workers * 2
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._executor = None
+        self._futures = []
+    
+    def __enter__(self):
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='writer')
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self._executor.shutdown(wait=True)
+        self._executor = None
+        return False
+    
+    def _run(self, func, args):
+        try:
+            return func(*args)
+        finally:
+            self._slots.release()
+    
+    def submit(self, func, *args):
+        """Queue one writer job, blocking while max_pending jobs are outstanding"""
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(self._run, func, args)
+        except BaseException:
+            self._slots.release()
+            raise
+        self._futures.append(future)
+        return future
+    
+    def results(self):
+        """Wait for every submitted job and return their results in submission order"""
+        results = []
+        error = None
+        for future in self._futures:
+            try:
+                results.append(future.result())
+            except Exception as exc:
+                if error is None:
+                    error = exc
+        self._futures = []
+        if error is not None:
+            raise error
+        return results
+
+def run_writers(jobs, max_workers=4, max_pending=None):
+    """Run (func, args) writer jobs concurrently and return their results in order"""
+    if max_workers <= 1:
+        return [func(*args) for func, args in jobs]
+    
+    with WriterScheduler(max_workers, max_pending) as scheduler:
+        for func, args in jobs:
+            scheduler.submit(func, *args)
+        return scheduler.results()
\ No newline at end of file
@@ -0,0 +1,142 @@
+"""
+Progress reporting for long parses
+Driven by the byte offset of the input stream: the readers in export_reader and
+selective_reader call advance() once per chunk they hand to the parser, so the
+cost is per chunk, not per element. Elements, domains and fields are estimated
+from the tags (bytes.count) in every sample_every-th chunk, scaled to the bytes
+parsed; lines (or JSON events for job schedulers) are written at most once per
+interval.
+"""
+
+import json
+import os
+import stat
+import sys
+import time
+from collections import OrderedDict
+
+DEFAULT_INTERVAL = 1.0
+# Tag counts are taken from one chunk in this many (64 KB to 1 MB each, depending on the reader)
+SAMPLE_EVERY = 8
+TAGS = {
+    'elements': (b'</', b'/>'),
+    'domains': (b'<Domain ',),
+    'fields': (b'<Field ',),
+}
+
+def input_size(xml_file):
+    """Size of the export in bytes, or None for pipes and file objects of unknown size"""
+    try:
+        if xml_file == '-':
+            info = os.fstat(sys.stdin.fileno())
+            return info.st_size if stat.S_ISREG(info.st_mode) else None
+        if hasattr(xml_file, 'read'):
+            return None
+        return os.path.getsize(xml_file)
+    except (OSError, ValueError):
+        return None
+
+def format_duration(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}"
+
+class ProgressReporter:
+    """Sampled progress of one parse
+
+    total_bytes enables the percentage and ETA. json_events writes one JSON object
+    per line ({"event": "progress" | "done", ...}); otherwise a readable status line,
+    redrawn in place on a terminal. Counts are estimates from sampled chunks (exact
+    with sample_every=1, bar tags split across two chunks), and domains include
+    field-level domain definitions.
+    """
+    
+    def __init__(self, total_bytes=None, output=None, json_events=False, interval=DEFAULT_INTERVAL,
+                 sample_every=SAMPLE_EVERY):
+        self.total_bytes = total_bytes
+        self.output = output or sys.stderr
+        self.json_events = json_events
+        self.interval = interval
+        self.sample_every = sample_every
+        self.reset()
+        self.events = 0
+        self.started = time.perf_counter()
+        self.next_emit = self.started + interval
+        self.redraw = not json_events and hasattr(self.output, 'isatty') and self.output.isatty()
+        self.width = 0
+    
+    def reset(self):
+        """Start counting again when a reader gives up and the export is parsed from the beginning"""
+        self.position = 0
+        self.chunks = 0
+        self.parsed_bytes = 0
+        self.sampled_bytes = 0
+        self.sampled = dict.fromkeys(TAGS, 0)
+    
+    def advance(self, position, chunk):
+        """Record that the parser has been given chunk and the input has been read up to position"""
+        self.position = position
+        if chunk:
+            if self.chunks % self.sample_every == 0:
+                self.sampled_bytes += len(chunk)
+                for name, patterns in TAGS.items():
+                    self.sampled[name] += sum(chunk.count(pattern) for pattern in patterns)
+            self.chunks += 1
+            self.parsed_bytes += len(chunk)
+        now = time.perf_counter()
+        if now >= self.next_emit:
+            self.next_emit = now + self.interval
+            self.emit('progress', now)
+    
+    def count(self, name):
+        if not self.sampled_bytes:
+            return 0
+        return round(self.sampled[name] * self.parsed_bytes / self.sampled_bytes)
+    
+    def snapshot(self, event, now=None):
+        elapsed = (now or time.perf_counter()) - self.started
+        elements = self.count('elements')
+        mb = self.position / 1024 / 1024
+        state = OrderedDict([
+            ('event', event),
+            ('elapsed_s', round(elapsed, 3)),
+            ('bytes', self.position),
+            ('total_bytes', self.total_bytes),
+            ('percent', round(100.0 * self.position / self.total_bytes, 1) if self.total_bytes else None),
+            ('mb_per_s', round(mb / elapsed, 2) if elapsed else None),
+            ('elements', elements),
+            ('elements_per_s', round(elements / elapsed) if elapsed else None),
+            ('domains', self.count('domains')),
+            ('fields', self.count('fields')),
+            ('eta_s', None),
+        ])
+        if self.total_bytes and self.position and event == 'progress':
+            state['eta_s'] = round(elapsed * (self.total_bytes - self.position) / self.position, 1)
+        return state
+    
+    def emit(self, event, now=None):
+        state = self.snapshot(event, now)
+        self.events += 1
+        if self.json_events:
+            self.output.write(json.dumps(state) + '\n')
+        else:
+            line = f"{state['bytes'] / 1024 / 1024:,.1f}"
+            if state['total_bytes']:
+                line = f"{state['percent']:5.1f}% {line}/{state['total_bytes'] / 1024 / 1024:,.1f}"
+            line += (f" MB  {state['mb_per_s'] or 0:.1f} MB/s  {state['elements']:,} elements "
+                     f"({state['elements_per_s'] or 0:,}/s)  {state['domains']:,} domains  {state['fields']:,} fields")
+            if state['eta_s'] is not None:
+                line += f"  ETA {format_duration(state['eta_s'])}"
+            elif event == 'done':
+                line += f"  done in {format_duration(state['elapsed_s'])}"
+            if self.redraw:
+                # Pad over the previous, possibly longer, line
+                self.width = max(self.width, len(line))
+                line = '\r' + line.ljust(self.width) + ('\n' if event == 'done' else '')
+            else:
+                line += '\n'
+            self.output.write(line)
+        self.output.flush()
+    
+    def finish(self):
+        self.emit('done')
\ No newline at end of file
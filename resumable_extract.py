@@ -0,0 +1,216 @@
+"""
+Checkpointed extraction of many feature classes
+Walks the export one feature class at a time, located by the byte scan from
+selective_reader, writes that class's outputs and then records the class, its
+files and the byte offset of the next DataElement in a checkpoint file. A
+restarted run against the same export and options skips the finished classes and
+resumes the scan at that offset, so a pre-empted full-workspace run repeats at
+most the class it was working on.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+from collections import OrderedDict
+from pathlib import Path
+
+from extract_building_domains_complete import find_feature_class
+from extraction_pipeline import NAMESPACES, OUTPUT_WRITERS, LazyDomainTable, build_class_model, write_outputs
+from export_reader import compression_of
+from output_scheduler import atomic_output
+from selective_reader import iter_feature_classes, parse_ranges, selected_ranges
+
+CHECKPOINT_NAME = '.extract_checkpoint.jsonl'
+CHECKPOINT_VERSION = 1
+FINGERPRINT_BYTES = 1 << 20
+
+def export_fingerprint(xml_file):
+    """Size, mtime and a hash of the first and last MB; changes whenever the export is replaced"""
+    info = os.stat(xml_file)
+    digest = hashlib.sha1()
+    with open(xml_file, 'rb') as f:
+        digest.update(f.read(FINGERPRINT_BYTES))
+        f.seek(max(info.st_size - FINGERPRINT_BYTES, 0))
+        digest.update(f.read(FINGERPRINT_BYTES))
+    return {'size': info.st_size, 'mtime_ns': info.st_mtime_ns, 'sha1': digest.hexdigest()}
+
+def checkpoint_header(xml_file, fingerprint, class_names, outputs):
+    return OrderedDict([
+        ('version', CHECKPOINT_VERSION),
+        ('export', str(xml_file)),
+        ('fingerprint', fingerprint),
+        ('classes', list(class_names) if class_names is not None else None),
+        ('outputs', list(outputs)),
+    ])
+
+def load_checkpoint(checkpoint_file, header):
+    """Completed classes, next offset and completion flag from a checkpoint matching header
+
+    Returns (state, None), or (None, reason) when there is no usable checkpoint. A
+    torn last line from an interrupted append is ignored.
+    """
+    try:
+        with open(checkpoint_file, encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    except FileNotFoundError:
+        return None, None
+    except OSError as exc:
+        return None, f"unreadable checkpoint ({exc})"
+    records = []
+    for line in lines:
+        try:
+            records.append(json.loads(line, object_pairs_hook=OrderedDict))
+        except ValueError:
+            break
+    if not records or records[0].get('version') != CHECKPOINT_VERSION:
+        return None, "checkpoint format changed"
+    saved = records[0]
+    if saved.get('fingerprint') != header['fingerprint']:
+        return None, "export changed since the checkpoint"
+    if saved.get('classes') != header['classes'] or saved.get('outputs') != header['outputs']:
+        return None, "classes or outputs differ from the checkpointed run"
+    state = {'completed': OrderedDict(), 'next_offset': 0, 'complete': False}
+    for record in records[1:]:
+        if 'class' in record:
+            state['completed'][record['class']] = record
+        state['next_offset'] = max(state['next_offset'], record['next_offset'])
+        state['complete'] = state['complete'] or record.get('complete', False)
+    return state, None
+
+class CheckpointJournal:
+    """Append-only checkpoint: a header line, then one JSON line per finished class
+
+    Opening rewrites the journal with the records carried over from the previous
+    run (dropping a torn last line) under a temporary name and renames it into
+    place, so a kill at that point leaves the old journal or the new one, never a
+    truncated file. After that each class costs one appended line however many
+    are done. fsync makes every line durable before the next class.
+    """
+    
+    def __init__(self, checkpoint_file, records, fsync=False):
+        self.fsync = fsync
+        with atomic_output(checkpoint_file, fsync) as tmp_path:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for record in records:
+                    f.write(json.dumps(record) + '\n')
+        self.file = open(checkpoint_file, 'a', encoding='utf-8')
+    
+    def append(self, record):
+        self.file.write(json.dumps(record) + '\n')
+        self.file.flush()
+        if self.fsync:
+            os.fsync(self.file.fileno())
+    
+    def close(self):
+        self.file.close()
+
+def outputs_intact(entry):
+    """True if every file recorded for a completed class still exists with its recorded size"""
+    for record in entry['files']:
+        path = Path(record['path'])
+        if not path.exists() or path.stat().st_size != record['size']:
+            return False
+    return True
+
+def run_resumable(xml_file, class_names=None, output_dir=".", outputs=None, checkpoint_file=None, restart=False,
+                  fsync=False, limit=None, progress=None):
+    """Extract feature classes one at a time, checkpointing after each
+
+    class_names=None extracts every feature class. The checkpoint (default:
+    .extract_checkpoint.jsonl in output_dir) is reused when the export's
+    fingerprint, the classes and the outputs match; restart=True ignores it.
+    Completed classes whose files went missing are extracted again. limit stops
+    after that many classes, leaving the checkpoint for a later run. Returns
+    (summary, files written by this run). Plain exports only: compressed input
+    cannot be scanned by offset.
+    """
+    outputs = list(outputs or OUTPUT_WRITERS)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    checkpoint_file = Path(checkpoint_file) if checkpoint_file else output_dir / CHECKPOINT_NAME
+    header = checkpoint_header(xml_file, export_fingerprint(xml_file), class_names, outputs)
+    
+    state, reason = (None, None) if restart else load_checkpoint(checkpoint_file, header)
+    summary = OrderedDict([
+        ('checkpoint', str(checkpoint_file)),
+        ('resumed', state is not None),
+        ('discarded', reason),
+        ('skipped', []),
+        ('redone', []),
+        ('extracted', []),
+        ('missing', []),
+    ])
+    state = state or {'completed': OrderedDict(), 'next_offset': 0, 'complete': False}
+    wanted = set(class_names) if class_names is not None else None
+    written = []
+    
+    with open(xml_file, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        if compression_of(data[:8]) is not None:
+            raise ValueError(f"{xml_file} is compressed; checkpointed runs need a plain export")
+        located = selected_ranges(data, [])
+        if located is None:
+            raise ValueError(f"{xml_file}: workspace root or domains not found by the byte scan")
+        head, root_close = located
+        all_domains = LazyDomainTable(parse_ranges(data, head, root_close))
+        journal = CheckpointJournal(checkpoint_file, [header] + list(state['completed'].values()), fsync)
+        
+        def extract(name, start, end, next_offset):
+            """Write one class's outputs, then journal it; False if the element holds no fields"""
+            root = parse_ranges(data, [head[0], (start, end)], root_close)
+            class_model = build_class_model(find_feature_class(root, NAMESPACES, name), all_domains)
+            if class_model is None:
+                return False
+            schema = {'domains': all_domains, 'classes': OrderedDict([(name, class_model)]), 'missing': []}
+            files = write_outputs(schema, output_dir, outputs, fsync=fsync)
+            written.extend(files)
+            record = OrderedDict([
+                ('class', name),
+                ('start', start),
+                ('end', end),
+                ('next_offset', next_offset),
+                ('files', [{'path': str(path), 'size': path.stat().st_size} for path in files]),
+            ])
+            journal.append(record)
+            state['completed'][name] = record
+            if progress is not None:
+                progress.advance(end, data[start:end])
+            return True
+        
+        try:
+            done = 0
+            for name, entry in list(state['completed'].items()):
+                if outputs_intact(entry):
+                    summary['skipped'].append(name)
+                elif limit is None or done < limit:
+                    extract(name, entry['start'], entry['end'], entry['next_offset'])
+                    summary['redone'].append(name)
+                    done += 1
+            
+            if not state['complete']:
+                for name, start, end in iter_feature_classes(data, state['next_offset']):
+                    if wanted is not None and wanted.issubset(state['completed']):
+                        break
+                    if limit is not None and done >= limit:
+                        break
+                    if (wanted is None or name in wanted) and name not in state['completed']:
+                        if extract(name, start, end, end):
+                            summary['extracted'].append(name)
+                            done += 1
+                    state['next_offset'] = end
+                else:
+                    state['complete'] = True
+                if wanted is not None and wanted.issubset(state['completed']):
+                    state['complete'] = True
+                if state['complete']:
+                    journal.append(OrderedDict([('complete', True), ('next_offset', state['next_offset'])]))
+        finally:
+            journal.close()
+    
+    if progress is not None and state['complete']:
+        progress.finish()
+    summary['status'] = 'complete' if state['complete'] else 'partial'
+    summary['next_offset'] = state['next_offset']
+    if wanted is not None and state['complete']:
+        summary['missing'] = [name for name in class_names if name not in state['completed']]
+    return summary, written
\ No newline at end of file
@@ -0,0 +1,349 @@
+"""
+Long-running schema lookup service
+Loads the parsed schema model once and answers field, domain and code lookups over
+HTTP from in-memory indexes. Responses carry content-based ETags, and the model is
+swapped atomically when the export file changes, without restarting the service.
+
+Endpoints (GET/HEAD, JSON):
+    /health                                 service status and model generation
+    /classes                                feature class names
+    /classes/{class}                        field summary for one class
+    /classes/{class}/fields/{field}         field metadata with allowed values
+    /domains                                domain names and types
+    /domains/{domain}                       full domain definition
+    /domains/{domain}/codes/{code}          display name for one code
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from email.utils import formatdate
+from urllib.parse import urlsplit, unquote
+
+from extraction_pipeline import load_schema
+from coded_values import as_coded_values
+
+STATUS_TEXT = {
+    200: 'OK',
+    304: 'Not Modified',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    431: 'Request Header Fields Too Large',
+    500: 'Internal Server Error',
+}
+MAX_HEADERS = 100
+# Request bodies are read and discarded up to this size; lookups never need one
+MAX_BODY = 1 << 16
+# Seconds a connection may sit between or inside requests before it is closed
+IDLE_TIMEOUT = 30.0
+
+def file_signature(path):
+    """Cheap change detector for the export file, or None if it is missing"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+def build_field_entry(metadata, domain_info):
+    """Field lookup record: metadata plus the allowed values or range of its domain"""
+    entry = OrderedDict((key, value) for key, value in metadata.items() if value != '')
+    if domain_info is not None:
+        if domain_info['domain_type'] == 'CodedValue':
+            entry['allowed_values'] = [{'code': v['code'], 'name': v['name']} for v in domain_info['values']]
+        else:
+            entry['min_value'] = domain_info['min_value']
+            entry['max_value'] = domain_info['max_value']
+    return entry
+
+def build_index(schema):
+    """Build the lookup indexes served by the service from a loaded schema model"""
+    classes = OrderedDict()
+    fields = {}
+    for class_name, class_model in schema['classes'].items():
+        summary = []
+        for metadata in class_model['metadata']:
+            field_name = metadata['name']
+            domain_info = class_model['fields_with_domains'].get(field_name)
+            fields[(class_name, field_name)] = build_field_entry(metadata, domain_info)
+            summary.append({
+                'name': field_name,
+                'alias': metadata['alias_name'],
+                'type': metadata['type'],
+                'domain_name': metadata['domain_name'] or None
+            })
+        classes[class_name] = summary
+    
+    domains = OrderedDict()
+    codes = {}
+    for domain_name in sorted(schema['domains']):
+        domain = schema['domains'][domain_name]
+        domains[domain_name] = dict(domain, values=list(domain['values']))
+        codes[domain_name] = as_coded_values(domain['values'])
+    
+    return {'classes': classes, 'fields': fields, 'domains': domains, 'codes': codes}
+
+def encode_json(data):
+    """Serialize a response body and its strong, content-based ETag"""
+    body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+    return body, '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+
+class SchemaService:
+    """asyncio HTTP service answering schema lookups from a hot-reloaded model"""
+    
+    def __init__(self, xml_file, class_names=None, host='127.0.0.1', port=8765, poll_interval=2.0,
+                 idle_timeout=IDLE_TIMEOUT):
+        self.xml_file = xml_file
+        self.class_names = class_names
+        self.host = host
+        self.port = port
+        self.poll_interval = poll_interval
+        self.idle_timeout = idle_timeout
+        self.state = None
+        self.reloads = 0
+        self.last_error = None
+        self._failed_signature = None
+        self._server = None
+        self._watcher = None
+    
+    def load_state(self):
+        """Parse the export and build a complete, immutable model generation"""
+        signature = file_signature(self.xml_file)
+        schema = load_schema(self.xml_file, self.class_names)
+        return {
+            'index': build_index(schema),
+            'signature': signature,
+            'generation': (self.state['generation'] + 1) if self.state else 1,
+            'loaded_at': time.time(),
+            # route key -> (body, etag); rebuilt lazily for every generation
+            'cache': {}
+        }
+    
+    async def reload(self):
+        """Load the export in a worker thread and swap the model in one assignment"""
+        loop = asyncio.get_running_loop()
+        signature = file_signature(self.xml_file)
+        try:
+            state = await loop.run_in_executor(None, self.load_state)
+        except Exception as exc:
+            # Keep serving the previous generation until the file changes again
+            self.last_error = f"{type(exc).__name__}: {exc}"
+            self._failed_signature = signature
+            print(f"Reload of {self.xml_file} failed, keeping generation {self.state['generation']}: {self.last_error}")
+            return False
+        self.state = state
+        self.reloads += 1
+        self.last_error = None
+        print(f"Loaded {self.xml_file} (generation {state['generation']}, "
+              f"{len(state['index']['classes'])} classes, {len(state['index']['domains'])} domains)")
+        return True
+    
+    async def watch(self):
+        """Poll the export file and reload once a change has settled for one interval"""
+        pending = None
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            signature = file_signature(self.xml_file)
+            if signature is None or signature in (self.state['signature'], self._failed_signature):
+                pending = None
+                continue
+            if signature != pending:
+                # Still being written (or just replaced); check again next interval
+                pending = signature
+                continue
+            pending = None
+            await self.reload()
+    
+    async def start(self):
+        """Load the initial model, bind the listening socket and start the file watcher"""
+        self.state = await asyncio.get_running_loop().run_in_executor(None, self.load_state)
+        self._server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        if self.poll_interval:
+            self._watcher = asyncio.ensure_future(self.watch())
+        return self
+    
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+    
+    async def close(self):
+        if self._watcher is not None:
+            self._watcher.cancel()
+            try:
+                await self._watcher
+            except asyncio.CancelledError:
+                pass
+        self._server.close()
+        await self._server.wait_closed()
+    
+    def route(self, index, segments):
+        """Return the response data for a path, or None if nothing matches"""
+        if segments == ['classes']:
+            return list(index['classes'])
+        if segments == ['domains']:
+            return [{'name': name, 'type': domain['type']} for name, domain in index['domains'].items()]
+        if len(segments) == 2 and segments[0] == 'classes' and segments[1] in index['classes']:
+            return {'name': segments[1], 'fields': index['classes'][segments[1]]}
+        if len(segments) == 2 and segments[0] == 'domains':
+            return index['domains'].get(segments[1])
+        if len(segments) == 4 and segments[0] == 'classes' and segments[2] == 'fields':
+            return index['fields'].get((segments[1], segments[3]))
+        if len(segments) == 4 and segments[0] == 'domains' and segments[2] == 'codes':
+            values = index['codes'].get(segments[1])
+            if values is not None:
+                # The code from the path in the domain's own type, so /codes/7 and /codes/007 find code 7
+                code = values.coerce(segments[3])
+                name = values.name_of(code, values)
+                if name is not values:
+                    return {'domain': segments[1], 'code': code, 'name': name}
+        return None
+    
+    def route_key(self, index, segments):
+        """Cache key for a path: the segments, with a code in its domain's type
+
+        /classes and /classes//, or /codes/1 and /codes/001, share one entry, so the
+        cache holds at most one entry per resource of the loaded model.
+        """
+        if len(segments) == 4 and segments[0] == 'domains' and segments[2] == 'codes':
+            values = index['codes'].get(segments[1])
+            if values is not None:
+                return tuple(segments[:3]) + (values.coerce(segments[3]),)
+        return tuple(segments)
+    
+    def status(self, state):
+        return {
+            'status': 'ok',
+            'source': str(self.xml_file),
+            'generation': state['generation'],
+            'loaded_at': formatdate(state['loaded_at'], usegmt=True),
+            'reloads': self.reloads,
+            'last_error': self.last_error
+        }
+    
+    def respond(self, method, target, headers):
+        """Return (status, body, etag) for one request"""
+        if method not in ('GET', 'HEAD'):
+            return (405,) + encode_json({'error': f"method {method} not allowed"})
+        
+        # Read the model once so a concurrent reload cannot mix two generations
+        state = self.state
+        path = urlsplit(target).path
+        segments = [unquote(segment) for segment in path.strip('/').split('/') if segment]
+        if not segments or segments == ['health']:
+            return (200,) + encode_json(self.status(state))
+        
+        key = self.route_key(state['index'], segments)
+        cached = state['cache'].get(key)
+        if cached is None:
+            data = self.route(state['index'], segments)
+            if data is None:
+                return (404,) + encode_json({'error': f"no match for {path}"})
+            cached = state['cache'][key] = encode_json(data)
+        
+        body, etag = cached
+        # Weak comparison (RFC 9110): W/"x" matches "x"
+        if_none_match = headers.get('if-none-match', '')
+        tags = [tag.strip() for tag in if_none_match.split(',')]
+        if if_none_match == '*' or etag in [tag[2:] if tag.startswith('W/') else tag for tag in tags]:
+            return 304, b'', etag
+        return 200, body, etag
+    
+    async def send(self, writer, status, body, etag, keep_alive, include_body=True):
+        head = [
+            f"HTTP/1.1 {status} {STATUS_TEXT[status]}",
+            "Content-Type: application/json; charset=utf-8",
+            f"Content-Length: {len(body)}",
+            f"ETag: {etag}",
+            # Clients may cache but must revalidate, so a reload is seen on the next request
+            "Cache-Control: no-cache",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode('latin-1'))
+        if include_body:
+            writer.write(body)
+        await writer.drain()
+    
+    async def reject(self, writer, status, error):
+        """Answer a request that could not be read and give up on the connection"""
+        await self.send(writer, status, *encode_json({'error': error}), keep_alive=False)
+    
+    async def read_line(self, reader):
+        """One line from the client, or asyncio.TimeoutError after idle_timeout seconds"""
+        return await asyncio.wait_for(reader.readline(), self.idle_timeout)
+    
+    async def handle_connection(self, reader, writer):
+        """Serve HTTP/1.1 requests on one connection, honouring keep-alive
+
+        A connection idle for idle_timeout seconds, between requests or halfway
+        through one, is closed.
+        """
+        try:
+            while True:
+                try:
+                    request_line = await self.read_line(reader)
+                except ValueError:
+                    # Longer than the stream limit; the rest of the connection cannot be framed
+                    await self.reject(writer, 400, "request line too long")
+                    break
+                if not request_line:
+                    break
+                parts = request_line.decode('latin-1').split()
+                headers = {}
+                header_lines = 0
+                try:
+                    while True:
+                        line = await self.read_line(reader)
+                        if line in (b'\r\n', b'\n', b''):
+                            break
+                        header_lines += 1
+                        if header_lines > MAX_HEADERS:
+                            raise ValueError("too many header fields")
+                        name, _, value = line.decode('latin-1').partition(':')
+                        headers[name.strip().lower()] = value.strip()
+                except ValueError:
+                    await self.reject(writer, 431, "request header fields too large")
+                    break
+                
+                # Skip any body so its bytes are not read as the next request line
+                if 'transfer-encoding' in headers:
+                    await self.reject(writer, 400, "chunked request bodies are not supported")
+                    break
+                length = headers.get('content-length', '0')
+                if not length.isdigit() or int(length) > MAX_BODY:
+                    await self.reject(writer, 400, "invalid or oversized Content-Length")
+                    break
+                if int(length):
+                    await asyncio.wait_for(reader.readexactly(int(length)), self.idle_timeout)
+                
+                if len(parts) != 3:
+                    status, body, etag = (400,) + encode_json({'error': "malformed request line"})
+                    method, keep_alive = 'GET', False
+                else:
+                    method, target, version = parts
+                    keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                    try:
+                        status, body, etag = self.respond(method, target, headers)
+                    except Exception as exc:
+                        status, body, etag = (500,) + encode_json({'error': f"{type(exc).__name__}: {exc}"})
+                
+                await self.send(writer, status, body, etag, keep_alive, method != 'HEAD')
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+            pass
+        finally:
+            writer.close()
+
+async def serve(xml_file, class_names=None, host='127.0.0.1', port=8765, poll_interval=2.0):
+    """Run the schema service until cancelled"""
+    service = await SchemaService(xml_file, class_names, host, port, poll_interval).start()
+    print(f"Serving schema lookups for {xml_file} on http://{service.host}:{service.port}/")
+    try:
+        await service.serve_forever()
+    finally:
+        await service.close()
\ No newline at end of file
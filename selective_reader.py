@@ -0,0 +1,169 @@
+"""
+Selective reading of requested feature classes from a workspace export
+Memory-maps the export and locates each requested DataElement by scanning the raw
+bytes for its <Name>, then feeds the XML parser only the root element, the
+workspace Domains block and the byte ranges of those DataElements. Every other
+feature class is skipped without being tokenised.
+"""
+
+import mmap
+import re
+import xml.etree.ElementTree as ET
+from xml.sax.saxutils import escape
+
+from export_reader import compression_of
+
+FEATURE_CLASS_TYPE = b'esri:DEFeatureClass'
+DATA_ELEMENT_OPEN = re.compile(rb'<DataElement[\s>]')
+DATA_ELEMENT_CLOSE = b'</DataElement>'
+DOMAINS_OPEN = re.compile(rb'<Domains\b[^>]*>')
+DOMAINS_CLOSE = b'</Domains>'
+ROOT_OPEN = re.compile(rb'<((?:[A-Za-z_][\w.\-]*:)?Workspace)\b[^>]*>')
+# The root element must start within this many bytes (XML declaration and comments)
+PROLOG_LIMIT = 1 << 16
+FEED_SIZE = 1 << 20
+
+def element_end(data, start):
+    """Offset just past the </DataElement> closing the DataElement that starts at start, or -1"""
+    depth = 0
+    position = start
+    while True:
+        opening = DATA_ELEMENT_OPEN.search(data, position)
+        closing = data.find(DATA_ELEMENT_CLOSE, position)
+        if closing < 0:
+            return -1
+        if opening is not None and opening.start() < closing:
+            depth += 1
+            position = opening.end()
+        else:
+            depth -= 1
+            position = closing + len(DATA_ELEMENT_CLOSE)
+            if depth == 0:
+                return position
+
+def find_feature_class_range(data, class_name):
+    """Byte range of the first DEFeatureClass DataElement whose own Name is class_name, or None
+
+    Matches find_feature_class: the first such element in document order wins.
+    """
+    pattern = b'<Name>' + escape(class_name).encode('utf-8') + b'</Name>'
+    position = 0
+    while True:
+        hit = data.find(pattern, position)
+        if hit < 0:
+            return None
+        position = hit + len(pattern)
+        start = data.rfind(b'<DataElement', 0, hit)
+        if start < 0:
+            continue
+        tag_end = data.find(b'>', start)
+        if FEATURE_CLASS_TYPE not in data[start:tag_end]:
+            continue
+        # A DataElement's own Name is its first Name child; a later one belongs to a field
+        if data.find(b'<Name>', tag_end, hit) >= 0:
+            continue
+        end = element_end(data, start)
+        if end > hit:
+            return start, end
+
+def selected_ranges(data, class_names):
+    """Byte ranges to parse and the closing root tag, or None if a class or the root is not found"""
+    root = ROOT_OPEN.search(data, 0, PROLOG_LIMIT)
+    if root is None:
+        return None
+    ranges = [(0, root.end())]
+    
+    domains = DOMAINS_OPEN.search(data, root.end())
+    if domains is not None:
+        if domains.group(0).endswith(b'/>'):
+            ranges.append((domains.start(), domains.end()))
+        else:
+            close = data.find(DOMAINS_CLOSE, domains.end())
+            if close < 0:
+                return None
+            ranges.append((domains.start(), close + len(DOMAINS_CLOSE)))
+    
+    class_ranges = []
+    for class_name in class_names:
+        class_range = find_feature_class_range(data, class_name)
+        if class_range is None:
+            return None
+        if class_range not in class_ranges:
+            class_ranges.append(class_range)
+    ranges.extend(sorted(class_ranges))
+    return ranges, b'</' + root.group(1) + b'>'
+
+def iter_feature_classes(data, start=0):
+    """Yield (name, start, end) for every DEFeatureClass DataElement from offset start, in document order
+
+    Other DataElements (feature datasets, tables) are stepped into rather than
+    over, so feature classes nested in a dataset's Children are found too.
+    """
+    position = start
+    while True:
+        opening = DATA_ELEMENT_OPEN.search(data, position)
+        if opening is None:
+            return
+        element_start = opening.start()
+        tag_end = data.find(b'>', element_start)
+        if FEATURE_CLASS_TYPE not in data[element_start:tag_end]:
+            position = tag_end + 1
+            continue
+        end = element_end(data, element_start)
+        if end < 0:
+            return
+        name_start = data.find(b'<Name>', tag_end, end)
+        name_end = data.find(b'</Name>', name_start, end)
+        name = ET.fromstring(data[name_start:name_end + 7]).text if name_start >= 0 and name_end >= 0 else None
+        yield name, element_start, end
+        position = end
+
+def parse_ranges(data, ranges, root_close):
+    """Parse the concatenation of byte ranges plus the closing root tag"""
+    parser = ET.XMLParser()
+    for start, end in ranges:
+        for offset in range(start, end, FEED_SIZE):
+            parser.feed(data[offset:min(end, offset + FEED_SIZE)])
+    parser.feed(root_close)
+    return parser.close()
+
+def read_selected(xml_file, class_names, progress=None):
+    """Parse only the workspace domains and the requested feature classes
+
+    Returns the root element of a reduced document that the usual find_feature_class
+    and domain lookups work on, or None when the file cannot be read selectively
+    (not memory-mappable, compressed, UTF-16, a requested class not located by the byte scan,
+    or namespace prefixes declared below the root); callers then parse the whole file.
+    progress, if given, follows the file offset of each range as it is fed.
+    """
+    with open(xml_file, 'rb') as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            return None
+        with data:
+            if data[:2] in (b'\xff\xfe', b'\xfe\xff') or compression_of(data[:8]) is not None:
+                return None
+            located = selected_ranges(data, class_names)
+            if located is None:
+                return None
+            ranges, root_close = located
+            parser = ET.XMLParser()
+            try:
+                for start, end in ranges:
+                    for offset in range(start, end, FEED_SIZE):
+                        chunk = data[offset:min(end, offset + FEED_SIZE)]
+                        parser.feed(chunk)
+                        if progress is not None:
+                            progress.advance(offset + len(chunk), chunk)
+                parser.feed(root_close)
+                return parser.close()
+            except ET.ParseError:
+                return None
+
+def selected_bytes(xml_file, class_names):
+    """Number of bytes read_selected would hand to the parser, or None (for reporting)"""
+    with open(xml_file, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            located = selected_ranges(data, class_names)
+    return sum(end - start for start, end in located[0]) if located else None
\ No newline at end of file
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Unit tests for batch extraction across several exports
+Runs the worker pool over small synthetic exports laid out one per region directory
+"""
+
+import unittest
+import csv
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from generate_synthetic_export import generate_synthetic_export
+from batch_extract import discover_exports, export_labels, run_batch, run_workers
+import gisschema
+
+def exit_on_crash(task):
+    """Worker that dies without a Python exception for the task 'crash', like a worker killed by the OOM killer"""
+    if task == 'crash':
+        os._exit(1)
+    return task.upper()
+
+class TestBatchExtract(unittest.TestCase):
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.exports_dir = Path(cls.tmpdir.name) / "exports"
+        for i, region in enumerate(('north', 'south', 'east')):
+            region_dir = cls.exports_dir / region
+            region_dir.mkdir(parents=True)
+            generate_synthetic_export(region_dir / "DATABASE_EXPORT.XML", feature_classes=2, fields_per_class=15,
+                                      domains=20, values_per_domain=4, domain_fields_per_class=5, seed=i)
+        (cls.exports_dir / "broken.xml").write_text("<esri:Workspace", encoding='utf-8')
+        (cls.exports_dir / "notes.txt").write_text("not an export", encoding='utf-8')
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmpdir.cleanup()
+    
+    def test_discover_and_label(self):
+        """Test directory and glob discovery and unique per-export directory names"""
+        exports = discover_exports([self.exports_dir])
+        self.assertEqual(len(exports), 4)
+        self.assertEqual(discover_exports([str(self.exports_dir / "*" / "DATABASE_EXPORT.XML")]), exports[1:])
+        labels = export_labels(exports)
+        self.assertEqual(sorted(labels.values()), ['broken', 'east', 'north', 'south'])
+        clashing = export_labels([Path('/a/north/DATABASE_EXPORT.XML'), Path('/b/north/DATABASE_EXPORT.XML')])
+        self.assertEqual(list(clashing.values()), ['a__north', 'b__north'])
+    
+    def test_run_batch_writes_trees_and_catalogue(self):
+        """Test per-export output trees, failure reporting and the aggregated catalogue"""
+        output_dir = Path(self.tmpdir.name) / "out"
+        results, catalogue = run_batch([self.exports_dir], output_dir, ['Building_A'], ['detailed'], jobs=2,
+                                       memory_limit_mb=4096)
+        by_label = {Path(result['output_dir']).name: result for result in results}
+        self.assertEqual(by_label['broken']['status'], 'failed')
+        self.assertIn('ParseError', by_label['broken']['error'])
+        for region in ('north', 'south', 'east'):
+            self.assertEqual(by_label[region]['status'], 'ok')
+            self.assertTrue((output_dir / region / "building_a_all_fields.csv").exists())
+        
+        self.assertEqual(json.loads(catalogue[0].read_text(encoding='utf-8')), json.loads(json.dumps(results)))
+        with open(catalogue[1], newline='', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(len(rows), 4)
+        self.assertEqual({row['feature_class'] for row in rows if row['status'] == 'ok'}, {'Building_A'})
+    
+    def test_dead_worker_fails_only_its_task(self):
+        """Test that a worker process dying is reported for its own task and the other tasks still complete"""
+        results = dict(run_workers(exit_on_crash, ['a', 'crash', 'b', 'c', 'd'], jobs=2))
+        self.assertEqual(results, {'a': 'A', 'b': 'B', 'c': 'C', 'd': 'D', 'crash': None})
+    
+    def test_cli_exit_status(self):
+        """Test that gisschema batch exits non-zero when an export fails"""
+        output_dir = Path(self.tmpdir.name) / "cli"
+        args = ['batch', '--inputs', str(self.exports_dir / "north"), '--output-dir', str(output_dir),
+                '--outputs', 'metadata']
+        self.assertEqual(gisschema.main(args), 0)
+        self.assertTrue((output_dir / "north" / "building_a_complete_metadata.csv").exists())
+        self.assertEqual(gisschema.main(args[:2] + [str(self.exports_dir / "broken.xml")] + args[3:]), 1)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
\ No newline at end of file
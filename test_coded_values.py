@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Unit tests for typed coded value storage
+Decodes the domains of a small synthetic export and checks typed lookups, validation and exports
+"""
+
+import unittest
+import csv
+import json
+import tempfile
+import xml.etree.ElementTree as ET
+from array import array
+from pathlib import Path
+
+from generate_synthetic_export import generate_synthetic_export
+from extraction_pipeline import NAMESPACES, load_schema, run_pipeline
+from coded_values import CodedValues, as_coded_values, code_text, decode_coded_values, json_code
+from validate_records import compile_field_rules, make_checker
+from generate_validator_module import generate_validator_source
+from schema_service import SchemaService, build_index
+import extract_building_domains
+from consolidate_domains import consolidate_exports
+
+class TestCodedValues(unittest.TestCase):
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.xml_file = Path(cls.tmpdir.name) / "DATABASE_EXPORT.XML"
+        generate_synthetic_export(cls.xml_file, feature_classes=2, fields_per_class=20, domains=20,
+                                  values_per_domain=6, domain_fields_per_class=10, seed=5)
+        cls.schema = load_schema(cls.xml_file, ['Building_A'])
+        domains = [cls.schema['domains'][name] for name in cls.schema['domains']]
+        cls.numeric = next(domain for domain in domains if domain['values'] and domain['values'].numeric)
+        cls.text = next(domain for domain in domains if domain['values'] and not domain['values'].numeric)
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmpdir.cleanup()
+    
+    def test_codes_are_stored_by_xsi_type(self):
+        """Test that xs:short codes land in a typed array and string codes stay interned text"""
+        values = self.numeric['values']
+        self.assertEqual(values.code_type, 'xs:short')
+        self.assertIsInstance(values.codes, array)
+        self.assertEqual(values.codes.typecode, 'h')
+        self.assertEqual(values[0], {'name': values.names[0], 'code': 1})
+        self.assertEqual([value['code'] for value in values[:2]], [1, 2])
+        self.assertEqual(values.name_of(values.coerce('02')), values.names[1])
+        self.assertIsNone(values.name_of(values.coerce('x')))
+        
+        text = self.text['values']
+        self.assertIsInstance(text.codes, tuple)
+        self.assertIsInstance(text[0]['code'], str)
+        self.assertEqual(text.coerce(text[0]['code']), text[0]['code'])
+        self.assertEqual(text, [dict(value) for value in text])
+        self.assertEqual(as_coded_values(list(text)).codes, text.codes)
+    
+    def test_fallback_and_floats(self):
+        """Test codes that do not parse as their declared type and double codes"""
+        element = ET.fromstring(
+            '<CodedValues xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" xsi:type="esri:ArrayOfCodedValue">'
+            '<CodedValue xsi:type="esri:CodedValue"><Name>One</Name><Code xsi:type="xs:short">1</Code></CodedValue>'
+            '<CodedValue xsi:type="esri:CodedValue"><Name>Odd</Name><Code xsi:type="xs:short">1a</Code></CodedValue>'
+            '</CodedValues>')
+        values = decode_coded_values(element, NAMESPACES)
+        self.assertFalse(values.numeric)
+        self.assertEqual([value['code'] for value in values], ['1', '1a'])
+        
+        doubles = CodedValues(['0.5', '2'], ['Half', 'Two'], 'xs:double')
+        self.assertEqual(doubles.codes.typecode, 'd')
+        self.assertEqual(doubles.name_of(doubles.coerce('2.0')), 'Two')
+        self.assertEqual([code_text(code) for code in doubles.codes], ['0.5', '2'])
+        self.assertNotEqual(doubles, CodedValues(['0.5', '3'], ['Half', 'Two'], 'xs:double'))
+        
+        # Text exports write the canonical form of a numeric code, not its original lexical text
+        self.assertEqual([code_text(code) for code in CodedValues(['01', '7'], ['A', 'B'], 'xs:short').codes], ['1', '7'])
+        self.assertEqual([code_text(code) for code in CodedValues(['1e3', '2.50'], ['A', 'B'], 'xs:double').codes],
+                         ['1000', '2.5'])
+    
+    def test_validation_compares_typed_codes(self):
+        """Test the interpreted and generated validators against typed integer and double codes"""
+        base = {'nullable': True, 'length': None, 'precision': 0, 'scale': 0, 'min': None, 'max': None}
+        small = dict(base, name='small', type='esriFieldTypeSmallInteger', codes=[1, 2])
+        double = dict(base, name='double', type='esriFieldTypeDouble', codes=[0.5, 2.0])
+        text = dict(base, name='text', type='esriFieldTypeString', codes=[7, 'abc'])
+        namespace = {}
+        exec(generate_validator_source('Typed', {'small': small, 'double': double, 'text': text}), namespace)
+        cases = [(['02', '2.0', '7'], []), (['3', '0.25', 'abc'], [('small', 'domain'), ('double', 'domain')]),
+                 ([2.0, 2, 8], [('text', 'domain')])]
+        for row, errors in cases:
+            self.assertEqual(namespace['validate_row'](row), errors, row)
+            checked = [(name, make_checker(rule)(value))
+                       for (name, rule), value in zip((('small', small), ('double', double), ('text', text)), row)]
+            self.assertEqual([item for item in checked if item[1]], errors, row)
+        
+        rules = compile_field_rules(self.schema['classes']['Building_A'])
+        coded = [rule for rule in rules.values() if rule['codes'] and rule['type'] == 'esriFieldTypeSmallInteger']
+        self.assertTrue(coded)
+        self.assertTrue(all(isinstance(code, int) for code in coded[0]['codes']))
+        self.assertIsNone(make_checker(coded[0])(str(coded[0]['codes'][0])))
+    
+    def test_exports_and_service_use_typed_codes(self):
+        """Test JSON exports and the code lookup endpoint with numeric codes"""
+        output_dir = Path(self.tmpdir.name) / "out"
+        run_pipeline(self.xml_file, ['Building_A'], output_dir, ['json'])
+        fields = json.loads((output_dir / "building_a_domains.json").read_text(encoding='utf-8'))
+        codes = [value['code'] for field in fields.values() if field['domain_type'] == 'CodedValue'
+                 for value in field['values']]
+        self.assertTrue(any(isinstance(code, int) for code in codes))
+        self.assertTrue(any(isinstance(code, str) for code in codes))
+        
+        index = build_index(self.schema)
+        service = SchemaService(self.xml_file)
+        name = self.numeric['name']
+        self.assertEqual(service.route(index, ['domains', name, 'codes', '001']),
+                         {'domain': name, 'code': 1, 'name': self.numeric['values'].names[0]})
+        self.assertIsNone(service.route(index, ['domains', name, 'codes', 'one']))
+        json.dumps(service.route(index, ['domains', name]))
+
+class TestDoubleCodeText(unittest.TestCase):
+    
+    @classmethod
+    def setUpClass(cls):
+        """The synthetic export with its xs:short codes redeclared as xs:double"""
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.xml_file = Path(cls.tmpdir.name) / "DATABASE_EXPORT.XML"
+        generate_synthetic_export(cls.xml_file, feature_classes=1, fields_per_class=20, domains=20,
+                                  values_per_domain=6, domain_fields_per_class=10, seed=5)
+        text = cls.xml_file.read_text(encoding='utf-8')
+        cls.xml_file.write_text(text.replace('xsi:type="xs:short"', 'xsi:type="xs:double"'), encoding='utf-8')
+        cls.output_dir = Path(cls.tmpdir.name) / "out"
+        cls.schema, _ = run_pipeline(cls.xml_file, ['Building_A'], cls.output_dir)
+        fields = cls.schema['classes']['Building_A']['fields_with_domains']
+        cls.field, cls.domain = next((name, info) for name, info in fields.items()
+                                     if info['domain_type'] == 'CodedValue' and info['values'].numeric)
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmpdir.cleanup()
+    
+    def read_rows(self, file_name):
+        with open(self.output_dir / file_name, newline='', encoding='utf-8') as f:
+            return list(csv.reader(f))
+    
+    def test_text_exports_keep_code_text(self):
+        """Test that double codes are written as in the XML (1, not 1.0) by every text export"""
+        self.assertEqual(self.domain['values'].codes.typecode, 'd')
+        expected = [code_text(code) for code in self.domain['values'].codes]
+        self.assertEqual(expected[:2], ['1', '2'])
+        
+        detailed = [row[6] for row in self.read_rows("building_a_domains_detailed.csv") if row[0] == self.field]
+        header, *padded = self.read_rows("building_a_domains_codes_only.csv")
+        columnar = [line[header.index(self.field)] for line in padded if line[header.index(self.field)]]
+        long_codes = [row[4] for row in self.read_rows("building_a_domains_long.csv") if row[0] == self.field]
+        self.assertEqual(detailed, expected)
+        self.assertEqual(columnar, expected)
+        self.assertEqual(long_codes, expected)
+        
+        all_fields = next(row for row in self.read_rows("building_a_all_fields.csv") if row[0] == self.field)
+        self.assertIn(f"({expected[0]})", ','.join(all_fields))
+        self.assertNotIn(".0)", ','.join(all_fields))
+        
+        html = (self.output_dir / "building_a_complete_manual.html").read_text(encoding='utf-8')
+        self.assertIn(f'<td class="code">{expected[0]}</td>', html)
+        self.assertNotIn('<td class="code">1.0</td>', html)
+        lookups = (self.output_dir / "building_a_lookups.sql").read_text(encoding='utf-8')
+        self.assertIn(f"({expected[0]}, ", lookups)
+        self.assertNotIn("(1.0, ", lookups)
+        
+        legacy = Path(self.tmpdir.name) / "building_a_domains.csv"
+        extract_building_domains.export_to_csv(extract_building_domains.parse_geodatabase_xml(self.xml_file), legacy)
+        with open(legacy, newline='', encoding='utf-8') as f:
+            legacy_codes = [row[5] for row in csv.reader(f) if row[0] == self.field]
+        self.assertEqual(legacy_codes, expected)
+    
+    def test_json_keeps_numbers(self):
+        """Test that the domains JSON writes whole-number double codes as the XML does"""
+        fields = json.loads((self.output_dir / "building_a_domains.json").read_text(encoding='utf-8'))
+        codes = [value['code'] for value in fields[self.field]['values']]
+        self.assertEqual(codes[:2], [1, 2])
+        self.assertNotIn('1.0', (self.output_dir / "building_a_domains.json").read_text(encoding='utf-8'))
+        
+        consolidated = Path(self.tmpdir.name) / "consolidated"
+        consolidate_exports([self.xml_file], consolidated)
+        library = json.loads((consolidated / "master_domains.json").read_text(encoding='utf-8'))
+        master_codes = [value['code'] for value in library[self.domain['domain_name']]['values']]
+        self.assertEqual(master_codes, [json_code(code) for code in self.domain['values'].codes])
+        self.assertEqual([type(code) for code in master_codes[:2]], [int, int])
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Unit tests for cross-export domain consolidation
+Builds exports that share, rename and modify the same synthetic domains
+"""
+
+import unittest
+import csv
+import json
+import tempfile
+from pathlib import Path
+
+from generate_synthetic_export import generate_synthetic_export
+from batch_extract import export_label
+from consolidate_domains import (canonical_values, domain_fingerprint, collect_domains, consolidate,
+                                 similar_domains, consolidate_exports)
+
+class TestConsolidateDomains(unittest.TestCase):
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.exports_dir = Path(cls.tmpdir.name) / "exports"
+        for region in ('north', 'south'):
+            region_dir = cls.exports_dir / region
+            region_dir.mkdir(parents=True)
+            generate_synthetic_export(region_dir / "DATABASE_EXPORT.XML", feature_classes=1, fields_per_class=10,
+                                      domains=6, values_per_domain=4, domain_fields_per_class=3, seed=7)
+        # east renames the first value of its first domain
+        text = (cls.exports_dir / "north" / "DATABASE_EXPORT.XML").read_text(encoding='utf-8')
+        start = text.index('<Name>', text.index('<CodedValue '))
+        end = text.index('</Name>', start)
+        (cls.exports_dir / "east.xml").write_text(text[:start + 6] + "Renamed Value" + text[end:], encoding='utf-8')
+        (cls.exports_dir / "broken.xml").write_text("<esri:Workspace", encoding='utf-8')
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmpdir.cleanup()
+    
+    def test_fingerprint_ignores_name_order_and_whitespace(self):
+        """Test that the content hash ignores the domain name, value order, case and whitespace"""
+        values = [{'code': '1', 'name': 'Residential'}, {'code': '2', 'name': 'Commercial  Use'}]
+        domain = {'name': 'UseA', 'type': 'esri:CodedValueDomain', 'description': '', 'values': values}
+        same = {'name': 'UseB', 'type': 'esri:CodedValueDomain', 'description': 'copy',
+                'values': [{'code': ' 2', 'name': 'commercial use'}, {'code': '1', 'name': 'RESIDENTIAL'}]}
+        changed = dict(same, values=[{'code': '1', 'name': 'Residential'}, {'code': '3', 'name': 'Commercial Use'}])
+        self.assertEqual(canonical_values(values), (('1', 'residential'), ('2', 'commercial use')))
+        self.assertEqual(domain_fingerprint(domain), domain_fingerprint(same))
+        self.assertNotEqual(domain_fingerprint(domain), domain_fingerprint(changed))
+        range_domain = {'name': 'Height', 'type': 'esri:RangeDomain', 'description': '', 'values': [],
+                        'min_value': '0', 'max_value': '100'}
+        self.assertNotEqual(domain_fingerprint(range_domain), domain_fingerprint(dict(range_domain, max_value='90')))
+    
+    def test_master_library_and_drift(self):
+        """Test master variant selection, drift statuses and renamed codes"""
+        exports = sorted(self.exports_dir.rglob('*.xml')) + sorted(self.exports_dir.rglob('*.XML'))
+        records, failed = collect_domains(exports)
+        self.assertEqual([Path(export).name for export, _ in failed], ['broken.xml'])
+        library, drift = consolidate(records)
+        self.assertEqual(len(library), 6)
+        drifting = [name for name, entry in library.items() if entry['variants'] > 1]
+        self.assertEqual(len(drifting), 1)
+        self.assertEqual(library[drifting[0]]['exports'], 3)
+        
+        rows = [row for row in drift if row['domain'] == drifting[0]]
+        by_export = {export_label(row['export']): row for row in rows}
+        self.assertEqual(by_export['north']['status'], 'canonical')
+        self.assertEqual(by_export['south']['status'], 'canonical')
+        self.assertEqual(by_export['east']['status'], 'variant')
+        self.assertEqual(by_export['east']['added'], '')
+        self.assertEqual(len(by_export['east']['renamed'].split(';')), 1)
+        self.assertTrue(all(row['status'] == 'canonical' for row in drift if row['domain'] != drifting[0]))
+    
+    def test_undecodable_export_is_reported(self):
+        """Test that an export with a domain that cannot be decoded is listed as failed and the others still load"""
+        north = self.exports_dir / "north" / "DATABASE_EXPORT.XML"
+        text = north.read_text(encoding='utf-8')
+        # The first coded value loses its Code, which only fails when its domain is decoded
+        start = text.index('<Code ')
+        bad = Path(self.tmpdir.name) / "no_code.xml"
+        bad.write_text(text[:start] + text[text.index('</Code>', start) + 7:], encoding='utf-8')
+        records, failed = collect_domains([bad, north])
+        self.assertEqual([export for export, _ in failed], [str(bad)])
+        self.assertIn('AttributeError', failed[0][1])
+        self.assertEqual({record['export'] for record in records}, {str(north)})
+    
+    def test_aliases_and_similar_domains(self):
+        """Test that identical content under another name is an alias and overlapping code lists are similar"""
+        values = [{'code': str(code), 'name': f"Value {code}"} for code in range(10)]
+        records = [
+            {'export': 'a.xml', 'name': 'UseA', 'kind': 'CodedValue', 'description': '', 'values': values,
+             'min_value': None, 'max_value': None},
+            {'export': 'b.xml', 'name': 'UseB', 'kind': 'CodedValue', 'description': '', 'values': values,
+             'min_value': None, 'max_value': None},
+            {'export': 'b.xml', 'name': 'UseC', 'kind': 'CodedValue', 'description': '', 'values': values[:9],
+             'min_value': None, 'max_value': None},
+            {'export': 'b.xml', 'name': 'Other', 'kind': 'CodedValue', 'description': '',
+             'values': [{'code': 'x', 'name': 'X'}], 'min_value': None, 'max_value': None},
+        ]
+        for record in records:
+            record['hash'] = domain_fingerprint({'type': record['kind'], 'values': record['values']})
+        library, drift = consolidate(records)
+        self.assertEqual(library['UseA']['aliases'], ['UseB'])
+        self.assertEqual([row['status'] for row in drift if row['domain'] == 'UseA'], ['canonical', 'missing'])
+        self.assertEqual(similar_domains(library, 0.8), [('UseA', 'UseC', 0.9), ('UseB', 'UseC', 0.9)])
+        self.assertEqual(similar_domains(library, 0.95), [])
+    
+    def test_consolidate_exports_writes_reports(self):
+        """Test the library and report files written for a directory of exports"""
+        output_dir = Path(self.tmpdir.name) / "library"
+        summary, written = consolidate_exports([self.exports_dir], output_dir)
+        self.assertEqual(summary['exports'], 4)
+        self.assertEqual(summary['domain_records'], 18)
+        self.assertEqual(summary['distinct_contents'], 7)
+        self.assertEqual(len(summary['failed']), 1)
+        self.assertEqual(sorted(path.name for path in written),
+                         ['domain_drift.csv', 'master_domains.csv', 'master_domains.json', 'similar_domains.csv'])
+        library = json.loads((output_dir / "master_domains.json").read_text(encoding='utf-8'))
+        self.assertEqual(len(library), 6)
+        with open(output_dir / "domain_drift.csv", newline='', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(len(rows), 18)
+        self.assertEqual(sum(1 for row in rows if row['status'] == 'variant'), 1)
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Unit tests for bulk code <-> name decoding
+Uses a small synthetic export; NumPy-specific paths are skipped when it is missing
+"""
+
+import unittest
+import csv
+import tempfile
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from generate_synthetic_export import generate_synthetic_export, generate_synthetic_records
+from decode_domains import compile_codec, translate_column, load_field_codecs, decode_records, available_backends
+from validate_records import load_field_rules
+import gisschema
+
+DOMAIN = {
+    'domain_name': 'OpStatus',
+    'values': [{'code': 'inService', 'name': 'In Service'}, {'code': 'abw', 'name': 'Abandoned'},
+               {'code': 'dup', 'name': 'Abandoned'}]
+}
+
+class TestDecodeDomains(unittest.TestCase):
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.xml_file = Path(cls.tmpdir.name) / "DATABASE_EXPORT.XML"
+        generate_synthetic_export(cls.xml_file, feature_classes=1, fields_per_class=30,
+                                  domains=40, values_per_domain=6, domain_fields_per_class=12)
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmpdir.cleanup()
+    
+    def test_every_backend_agrees(self):
+        """Test both directions, unknown handling and empty values on every available backend"""
+        codec = compile_codec(DOMAIN)
+        for backend in available_backends():
+            names, unknown = translate_column(['abw', '', 'inService', 'xyz'], codec, 'to-name', backend)
+            self.assertEqual(names, ['Abandoned', '', 'In Service', 'xyz'], backend)
+            self.assertEqual(unknown, 1)
+            codes, _ = translate_column(['Abandoned', 'In Service'], codec, 'to-code', backend)
+            self.assertEqual(codes, ['abw', 'inService'], backend)
+            blanked, _ = translate_column(['xyz', 'abw'], codec, 'to-name', backend, unknown='blank')
+            self.assertEqual(blanked, ['', 'Abandoned'], backend)
+    
+    @unittest.skipUnless(np is not None, "NumPy is not installed")
+    def test_integer_code_array_take(self):
+        """Test that integer code arrays decode through the dense table"""
+        codec = compile_codec({'domain_name': 'Levels', 'values': [{'code': '1', 'name': 'One'},
+                                                                    {'code': '3', 'name': 'Three'}]})
+        self.assertIn('integer_table', codec)
+        names, unknown = translate_column(np.array([3, 1, 2, -5]), codec)
+        self.assertEqual(names, ['Three', 'One', '2', '-5'])
+        self.assertEqual(unknown, 2)
+    
+    def test_file_round_trip(self):
+        """Test that decoding to names and encoding back reproduces the original file"""
+        records = Path(self.tmpdir.name) / "records.csv"
+        generate_synthetic_records(load_field_rules(self.xml_file), records, rows=1500, error_rate=0.0)
+        codecs = load_field_codecs(self.xml_file)
+        named = Path(self.tmpdir.name) / "named.csv"
+        coded = Path(self.tmpdir.name) / "coded.csv"
+        summary = decode_records(records, codecs, named, chunk_size=400)
+        self.assertEqual(summary['rows'], 1500)
+        self.assertEqual(sum(summary['columns'].values()), 0)
+        
+        with open(named, newline='', encoding='utf-8') as f:
+            row = next(csv.DictReader(f))
+        field = next(name for name in codecs if row[name])
+        self.assertIn(row[field], codecs[field]['names'])
+        
+        decode_records(named, codecs, coded, direction='to-code', chunk_size=400)
+        self.assertEqual(coded.read_bytes(), records.read_bytes())
+    
+    def test_cli_selected_fields(self):
+        """Test that gisschema decode only translates the requested fields"""
+        records = Path(self.tmpdir.name) / "cli_records.csv"
+        generate_synthetic_records(load_field_rules(self.xml_file), records, rows=50, error_rate=0.0)
+        codecs = load_field_codecs(self.xml_file)
+        field = next(iter(codecs))
+        output = Path(self.tmpdir.name) / "cli_named.csv"
+        status = gisschema.main(['decode', '--input', str(self.xml_file), '--records', str(records),
+                                 '--output', str(output), '--fields', field])
+        self.assertEqual(status, 0)
+        with open(records, newline='', encoding='utf-8') as f:
+            original = list(csv.DictReader(f))
+        with open(output, newline='', encoding='utf-8') as f:
+            decoded = list(csv.DictReader(f))
+        other = [name for name in codecs if name != field][0]
+        self.assertEqual([r[other] for r in decoded], [r[other] for r in original])
+        self.assertTrue(all(r[field] == '' or r[field] in codecs[field]['names'] for r in decoded))
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
\ No newline at end of file
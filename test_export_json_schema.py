@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the JSON Schema exporter and its compiled validator
+Checks the schema keywords against the field rules and that the compiled
+validator agrees with the naive schema walk on valid and invalid records
+"""
+
+import unittest
+import json
+import tempfile
+from pathlib import Path
+
+from extraction_pipeline import load_schema, run_pipeline
+from export_json_schema import (
+    build_json_schema, compile_json_schema, validate_naive, coerce_record, load_json_schema_validator,
+    benchmark_json_schema, is_date_time, typed_code
+)
+from generate_synthetic_export import generate_synthetic_export, generate_synthetic_records
+from validate_records import compile_field_rules, make_checker
+
+class TestExportJsonSchema(unittest.TestCase):
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.xml_file = Path(cls.tmpdir.name) / "DATABASE_EXPORT.XML"
+        generate_synthetic_export(cls.xml_file, feature_classes=1, fields_per_class=30,
+                                  domains=40, values_per_domain=6, domain_fields_per_class=12)
+        cls.model = load_schema(cls.xml_file)['classes']['Building_A']
+        cls.rules = compile_field_rules(cls.model)
+        cls.schema = build_json_schema('Building_A', cls.model)
+        records_file = Path(cls.tmpdir.name) / "records.ndjson"
+        generate_synthetic_records(cls.rules, records_file, rows=1000, error_rate=0.2)
+        with open(records_file, encoding='utf-8') as f:
+            cls.records = [coerce_record(json.loads(line), cls.schema) for line in f]
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmpdir.cleanup()
+    
+    def test_schema_keywords(self):
+        """Test enum, range, maxLength, required and nullable types"""
+        properties = self.schema['properties']
+        self.assertEqual(list(properties), list(self.rules))
+        self.assertEqual(self.schema['required'], [name for name, rule in self.rules.items() if not rule['nullable']])
+        for name, rule in self.rules.items():
+            prop = properties[name]
+            if rule['codes'] is not None:
+                self.assertEqual(len(prop['enum']), len(rule['codes']) + rule['nullable'])
+                self.assertEqual(len(prop['x-enumNames']), len(prop['enum']))
+                if rule['nullable']:
+                    self.assertEqual((prop['enum'][-1], prop['x-enumNames'][-1]), (None, ''))
+            if rule['min'] is not None:
+                self.assertEqual(prop['minimum'], rule['min'])
+            if rule['length']:
+                self.assertEqual(prop['maxLength'], rule['length'])
+            self.assertEqual('null' in prop['type'], rule['nullable'])
+        json.dumps(self.schema)
+    
+    def test_compiled_matches_naive(self):
+        """Test that both validators report the same errors, including edge-case JSON values"""
+        validate = compile_json_schema(self.schema)
+        invalid = 0
+        for record in self.records:
+            errors = validate(record)
+            self.assertEqual(errors, validate_naive(record, self.schema))
+            invalid += bool(errors)
+        self.assertGreater(invalid, 0)
+        
+        integer_field = next(n for n, r in self.rules.items() if r['type'] == 'esriFieldTypeSmallInteger')
+        for value in (True, 1.0, 1.5, None, [1], {'a': 1}, '1'):
+            record = dict(self.records[0], **{integer_field: value})
+            self.assertEqual(validate(record), validate_naive(record, self.schema), value)
+        self.assertIn(('OBJECTID', 'required'), validate({}))
+    
+    def test_typed_codes_and_date_time(self):
+        """Test that enum codes convert only without loss and date-time requires a time and an offset"""
+        for code, expected in ((2.0, 2), (2.5, 2.5), ('7', 7), ('x', 'x'), (None, None)):
+            self.assertEqual(typed_code(code, 'esriFieldTypeInteger'), expected, code)
+        self.assertEqual(typed_code(2.5, 'esriFieldTypeInteger').__class__, float)
+        self.assertIsNone(typed_code(None, 'esriFieldTypeDouble'))
+        
+        for value in ('2024-01-01T10:00:00Z', '2024-01-01 10:00:00.5+02:00', '2024-01-01t10:00:00z'):
+            self.assertTrue(is_date_time(value), value)
+        for value in ('2024-01-01', '2024-01-01T10:00:00', '20240101T100000Z', '2024-02-30T10:00:00Z',
+                      '2024-01-01T10:00Z', '2024-W01-1T10:00:00Z'):
+            self.assertFalse(is_date_time(value), value)
+        
+        date_field = next(n for n, r in self.rules.items() if r['type'] == 'esriFieldTypeDate')
+        validate = compile_json_schema(self.schema)
+        for value, valid in (('2024-01-01', False), ('2024-01-01T10:00:00Z', True)):
+            record = dict(self.records[0], **{date_field: value})
+            self.assertEqual((date_field, 'format') in validate(record), not valid, value)
+            self.assertEqual(validate(record), validate_naive(record, self.schema))
+    
+    def test_valid_records_pass(self):
+        """Test that synthetic records generated without errors satisfy the schema, dates included"""
+        records_file = Path(self.tmpdir.name) / "valid.ndjson"
+        generate_synthetic_records(self.rules, records_file, rows=300, error_rate=0.0, seed=3)
+        validate = compile_json_schema(self.schema)
+        with open(records_file, encoding='utf-8') as f:
+            for line in f:
+                self.assertEqual(validate(coerce_record(json.loads(line), self.schema)), [])
+        check = make_checker(next(rule for rule in self.rules.values() if rule['type'] == 'esriFieldTypeDate'))
+        value = '2024-05-01T10:00:00Z'
+        self.assertEqual((is_date_time(value), check(value)), (True, None))
+    
+    def test_coerce_record(self):
+        """Test conversion of text values to the schema's JSON types"""
+        integer_field = next(n for n, r in self.rules.items() if r['type'] == 'esriFieldTypeInteger')
+        typed = coerce_record({integer_field: '12', 'OBJECTID': '', 'unknown': 'x'}, self.schema)
+        self.assertEqual(typed, {integer_field: 12, 'OBJECTID': None, 'unknown': 'x'})
+    
+    def test_pipeline_output_and_benchmark(self):
+        """Test the jsonschema writer and the benchmark helper"""
+        output_dir = Path(self.tmpdir.name) / "out"
+        _, written = run_pipeline(self.xml_file, ['Building_A'], output_dir, outputs=['jsonschema'])
+        self.assertEqual([path.name for path in written], ['building_a_schema.json'])
+        validate = load_json_schema_validator(written[0])
+        self.assertEqual(validate(self.records[0]), validate_naive(self.records[0], self.schema))
+        
+        result = benchmark_json_schema(self.schema, self.records[:200], repeat=1)
+        self.assertEqual(result['records'], 200)
+        self.assertGreater(result['speedup'], 0)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
\ No newline at end of file
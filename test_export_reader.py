@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Unit tests for compressed and archived export input
+Compresses a small synthetic export in every supported format and parses it back
+"""
+
+import unittest
+import bz2
+import gzip
+import io
+import lzma
+import subprocess
+import sys
+import tempfile
+import zipfile
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from generate_synthetic_export import generate_synthetic_export
+from export_reader import detect_compression, parse_export, parse_incremental, ExportStream, strip_compression_suffix
+from extraction_pipeline import load_schema
+from batch_extract import discover_exports, export_label
+
+class TestExportReader(unittest.TestCase):
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.dir = Path(cls.tmpdir.name)
+        cls.xml_file = cls.dir / "DATABASE_EXPORT.XML"
+        generate_synthetic_export(cls.xml_file, feature_classes=2, fields_per_class=20, domains=30,
+                                  values_per_domain=6, domain_fields_per_class=8, seed=3)
+        cls.data = cls.xml_file.read_bytes()
+        cls.files = {}
+        for compression, module, suffix in (('gzip', gzip, '.gz'), ('bzip2', bz2, '.bz2'), ('xz', lzma, '.xz')):
+            path = cls.dir / f"DATABASE_EXPORT.XML{suffix}"
+            path.write_bytes(module.compress(cls.data))
+            cls.files[compression] = path
+        cls.files['zip'] = cls.dir / "bundle.zip"
+        with zipfile.ZipFile(cls.files['zip'], 'w', zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr("readme.xml", "<notes/>")
+            archive.writestr("region/DATABASE_EXPORT.XML", cls.data)
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmpdir.cleanup()
+    
+    def test_detects_format_by_magic_bytes(self):
+        """Test detection from content rather than the file name"""
+        self.assertIsNone(detect_compression(self.xml_file))
+        for compression, path in self.files.items():
+            self.assertEqual(detect_compression(path), compression)
+        disguised = self.dir / "disguised.xml"
+        disguised.write_bytes(self.files['gzip'].read_bytes())
+        self.assertEqual(detect_compression(disguised), 'gzip')
+        self.assertEqual(ET.tostring(parse_export(disguised).getroot()), ET.tostring(ET.parse(self.xml_file).getroot()))
+    
+    def test_every_format_parses_to_the_same_tree(self):
+        """Test that streamed parsing of each format matches parsing the plain export"""
+        expected = ET.tostring(ET.parse(self.xml_file).getroot())
+        for compression, path in self.files.items():
+            stats = {}
+            tree = parse_export(path, stats=stats)
+            self.assertEqual(ET.tostring(tree.getroot()), expected, compression)
+            self.assertEqual(stats['compression'], compression)
+            self.assertAlmostEqual(stats['output_mb'], len(self.data) / 1024 / 1024, places=2)
+            self.assertGreaterEqual(stats['overlap_s'], 0)
+        with self.assertRaises(OSError):
+            parse_export(self.files['zip'], member='missing.xml')
+        self.assertEqual(parse_export(self.files['zip'], member='readme.xml').getroot().tag, 'notes')
+    
+    def test_corrupt_input_and_early_close(self):
+        """Test that truncated archives raise OSError and abandoning a stream does not hang"""
+        truncated = self.dir / "truncated.xml.gz"
+        truncated.write_bytes(self.files['gzip'].read_bytes()[:2000])
+        with self.assertRaises(OSError):
+            parse_export(truncated)
+        with ExportStream(self.files['xz'], read_ahead=1, chunk_size=1024) as stream:
+            self.assertEqual(stream.read(5), self.data[:5])
+    
+    def test_pipeline_and_batch_accept_compressed_exports(self):
+        """Test load_schema on a gzip export and discovery and labelling of compressed exports"""
+        plain = load_schema(self.xml_file, None)
+        compressed = load_schema(self.files['gzip'], None)
+        self.assertEqual(list(compressed['classes']), list(plain['classes']))
+        self.assertEqual(compressed['classes']['Building_A']['all_fields'], plain['classes']['Building_A']['all_fields'])
+        self.assertEqual(compressed['input']['compression'], 'gzip')
+        self.assertIsNone(plain['input']['compression'])
+        self.assertEqual(load_schema(self.files['zip'])['classes']['Building_A']['metadata'],
+                         plain['classes']['Building_A']['metadata'])
+        
+        self.assertEqual(strip_compression_suffix("a/DATABASE_EXPORT.XML.gz"), Path("a/DATABASE_EXPORT.XML"))
+        self.assertEqual(export_label(Path("/exports/north/DATABASE_EXPORT.XML.gz")), 'north')
+        found = {path.name for path in discover_exports([self.dir])}
+        self.assertLessEqual({'DATABASE_EXPORT.XML', 'DATABASE_EXPORT.XML.gz', 'DATABASE_EXPORT.XML.bz2',
+                              'DATABASE_EXPORT.XML.xz', 'bundle.zip'}, found)
+    
+    def test_incremental_parse_from_file_objects(self):
+        """Test that streamed input builds the same tree and prunes feature classes that were not requested"""
+        expected = ET.tostring(ET.parse(self.xml_file).getroot())
+        stats = {}
+        root = parse_incremental(io.BytesIO(self.data), chunk_size=4096, stats=stats)
+        self.assertEqual(ET.tostring(root), expected)
+        self.assertEqual(stats['input_mb'], stats['output_mb'])
+        stream = io.BytesIO(self.files['bzip2'].read_bytes())
+        self.assertEqual(ET.tostring(parse_export(stream).getroot()), expected)
+        with self.assertRaises(OSError):
+            parse_incremental(io.BytesIO(self.files['zip'].read_bytes()))
+        
+        pruned = parse_incremental(io.BytesIO(self.data), ['Building_A'], chunk_size=4096)
+        names = [elem.find('Name').text for elem in pruned.iter('DataElement')
+                 if elem.get('{http://www.w3.org/2001/XMLSchema-instance}type') == 'esri:DEFeatureClass']
+        self.assertEqual(names, ['Building_A'])
+        plain = load_schema(self.xml_file, ['Building_A'])
+        with open(self.files['gzip'], 'rb') as f:
+            streamed = load_schema(f, ['Building_A'])
+        self.assertEqual(streamed['classes']['Building_A']['all_fields'], plain['classes']['Building_A']['all_fields'])
+        self.assertEqual(len(streamed['domains']), len(plain['domains']))
+    
+    def test_extract_reads_stdin(self):
+        """Test that the extract subcommand writes the same files from stdin as from the file"""
+        outputs = {}
+        for source in ('file', 'stdin'):
+            output_dir = self.dir / f"extract_{source}"
+            command = [sys.executable, str(Path(__file__).parent / "gisschema.py"), 'extract', '--outputs', 'detailed,json',
+                       '--output-dir', str(output_dir), '--input', str(self.xml_file) if source == 'file' else '-']
+            subprocess.run(command, input=self.data if source == 'stdin' else None, check=True, capture_output=True)
+            outputs[source] = {path.name: path.read_bytes() for path in output_dir.iterdir()}
+        self.assertEqual(outputs['stdin'], outputs['file'])
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
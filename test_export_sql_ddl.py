@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the SQL DDL exporter
+Loads the generated SQLite script into an in-memory database and checks that
+the database itself rejects bad codes, out-of-range values and missing values
+"""
+
+import unittest
+import copy
+import csv
+import sqlite3
+import tempfile
+from pathlib import Path
+
+from extraction_pipeline import load_schema, run_pipeline
+from export_sql_ddl import generate_table_ddl, generate_lookup_inserts, number_literal, quote_identifier, MAX_IDENTIFIER_LENGTH
+from generate_synthetic_export import generate_synthetic_export, generate_synthetic_records
+from validate_records import compile_field_rules
+
+class TestExportSqlDdl(unittest.TestCase):
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.xml_file = Path(cls.tmpdir.name) / "DATABASE_EXPORT.XML"
+        generate_synthetic_export(cls.xml_file, feature_classes=2, fields_per_class=30,
+                                  domains=40, values_per_domain=6, domain_fields_per_class=12)
+        cls.schema = load_schema(cls.xml_file, None)
+        cls.model = cls.schema['classes']['Building_A']
+        cls.records = Path(cls.tmpdir.name) / "records.csv"
+        generate_synthetic_records(compile_field_rules(cls.model), cls.records, rows=300, error_rate=0.0)
+        with open(cls.records, newline='', encoding='utf-8') as f:
+            cls.rows = [{name: (value if value != '' else None) for name, value in row.items()}
+                        for row in csv.DictReader(f)]
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmpdir.cleanup()
+    
+    def connect(self):
+        db = sqlite3.connect(':memory:')
+        for class_name, class_model in self.schema['classes'].items():
+            db.executescript(generate_table_ddl(class_name, class_model, 'sqlite'))
+            db.executescript(generate_lookup_inserts(class_model))
+        return db
+    
+    def field(self, predicate):
+        return next(m for m in self.model['metadata'] if predicate(m, self.model['fields_with_domains'].get(m['name'])))
+    
+    def insert(self, db, values):
+        values = dict(self.rows[0], **values)
+        columns = ', '.join(quote_identifier(name) for name in values)
+        db.execute(f'INSERT INTO "Building_A" ({columns}) VALUES ({", ".join("?" * len(values))})',
+                   list(values.values()))
+    
+    def test_lookup_tables_loaded(self):
+        """Test that every coded value domain becomes a populated lookup table, shared across classes"""
+        db = self.connect()
+        for name, domain in self.model['fields_with_domains'].items():
+            if domain['domain_type'] == 'CodedValue':
+                table = quote_identifier(f"lut_{domain['domain_name']}")
+                count = db.execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+                self.assertEqual(count, len({value['code'] for value in domain['values']}))
+    
+    def test_database_rejects_invalid_values(self):
+        """Test the foreign key, range CHECK, length CHECK and NOT NULL constraints"""
+        db = self.connect()
+        coded = self.field(lambda m, d: d and d['domain_type'] == 'CodedValue' and m['type'] == 'esriFieldTypeString')
+        code = self.model['fields_with_domains'][coded['name']]['values'][0]['code']
+        self.insert(db, {'OBJECTID': 1, coded['name']: code})
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.insert(db, {'OBJECTID': 2, coded['name']: 'notACode'})
+        
+        ranged = self.field(lambda m, d: d and d['domain_type'] == 'Range')
+        domain = self.model['fields_with_domains'][ranged['name']]
+        self.insert(db, {'OBJECTID': 3, ranged['name']: float(domain['min_value'])})
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.insert(db, {'OBJECTID': 4, ranged['name']: float(domain['max_value']) + 1})
+        
+        text = self.field(lambda m, d: d is None and m['type'] == 'esriFieldTypeString' and m['length'])
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.insert(db, {'OBJECTID': 5, text['name']: 'x' * (int(text['length']) + 1)})
+        
+        required = [m for m in self.model['metadata'] if m['is_nullable'] == 'false' and m['name'] != 'OBJECTID']
+        if required:
+            with self.assertRaises(sqlite3.IntegrityError):
+                self.insert(db, {'OBJECTID': 6, required[0]['name']: None})
+    
+    def test_valid_records_load(self):
+        """Test that synthetic records without errors load into the SQLite table"""
+        db = self.connect()
+        for row in self.rows:
+            self.insert(db, row)
+        self.assertEqual(db.execute('SELECT count(*) FROM "Building_A"').fetchone()[0], 300)
+    
+    def test_non_finite_numbers_are_not_bare_literals(self):
+        """Test that inf, nan and overflowing bounds are skipped in CHECKs and quoted elsewhere"""
+        for value, literal in (('1.5', '1.5'), (' -2 ', '-2'), ('1e3', '1e3'), ('inf', "'inf'"), ('nan', "'nan'"),
+                               ('1e400', "'1e400'"), ('-Infinity', "'-Infinity'"), ('1_000', "'1_000'")):
+            self.assertEqual(number_literal(value), literal, value)
+        
+        model = copy.deepcopy(self.model)
+        ranged = self.field(lambda m, d: d and d['domain_type'] == 'Range')
+        domain = model['fields_with_domains'][ranged['name']]
+        domain['max_value'] = '1e400'
+        column = quote_identifier(ranged['name'])
+        ddl = generate_table_ddl('Building_A', model, 'sqlite')
+        self.assertIn(f"CHECK ({column} >= {domain['min_value']})", ddl)
+        self.assertNotIn('1e400', ddl)
+        domain['min_value'] = 'nan'
+        self.assertNotIn(f"CHECK ({column}", generate_table_ddl('Building_A', model, 'sqlite'))
+        db = sqlite3.connect(':memory:')
+        db.executescript(generate_table_ddl('Building_A', model, 'sqlite'))
+    
+    def test_postgresql_types(self):
+        """Test PostgreSQL type mapping and identifier shortening"""
+        ddl = generate_table_ddl('Building_A', self.model, 'postgresql')
+        self.assertNotIn('PRAGMA', ddl)
+        self.assertIn('"OBJECTID" INTEGER PRIMARY KEY NOT NULL', ddl)
+        self.assertIn('UUID', ddl)
+        self.assertIn('TIMESTAMP', ddl)
+        self.assertRegex(ddl, r'VARCHAR\(\d+\)')
+        self.assertNotIn('length(', ddl)
+        long_name = quote_identifier('lut_' + 'VeryLongDomainName' * 5)
+        self.assertEqual(len(long_name), MAX_IDENTIFIER_LENGTH + 2)
+        with self.assertRaises(ValueError):
+            generate_table_ddl('Building_A', self.model, 'oracle')
+    
+    def test_pipeline_writes_sql_outputs(self):
+        """Test the sql writer of the extraction pipeline"""
+        output_dir = Path(self.tmpdir.name) / "out"
+        _, written = run_pipeline(self.xml_file, ['Building_A'], output_dir, outputs=['sql'])
+        self.assertEqual(sorted(path.name for path in written),
+                         ['building_a_lookups.sql', 'building_a_postgresql.sql', 'building_a_sqlite.sql'])
+        db = sqlite3.connect(':memory:')
+        db.executescript((output_dir / 'building_a_sqlite.sql').read_text(encoding='utf-8'))
+        db.executescript((output_dir / 'building_a_lookups.sql').read_text(encoding='utf-8'))
+        db.executescript((output_dir / 'building_a_lookups.sql').read_text(encoding='utf-8'))
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
\ No newline at end of file
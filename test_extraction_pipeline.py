@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the single-parse extraction pipeline and its instrumentation
+Runs against a small synthetic export so no confidential data is required
+"""
+
+import unittest
+import csv
+import gzip
+import json
+import tempfile
+import threading
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from generate_synthetic_export import generate_synthetic_export
+from extraction_pipeline import (load_schema, run_pipeline, list_feature_classes, scan_class_models, LazyDomainTable,
+                                 NAMESPACES)
+from instrumentation import Instrumentation
+import gisschema
+from output_scheduler import atomic_output, run_writers, WriterScheduler
+import extract_building_domains_complete
+
+class TestExtractionPipeline(unittest.TestCase):
+    
+    @classmethod
+    def setUpClass(cls):
+        """Generate a small export with three feature classes"""
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.xml_file = Path(cls.tmpdir.name) / "DATABASE_EXPORT.XML"
+        generate_synthetic_export(cls.xml_file, feature_classes=3, fields_per_class=20,
+                                  domains=30, values_per_domain=5, domain_fields_per_class=8)
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmpdir.cleanup()
+    
+    def test_load_all_classes(self):
+        """Test that class_names=None loads every feature class"""
+        schema = load_schema(self.xml_file, None)
+        self.assertEqual(len(schema['classes']), 3)
+        self.assertEqual(list(schema['classes'])[0], 'Building_A')
+        self.assertEqual(schema['missing'], [])
+    
+    def test_missing_class_reported(self):
+        """Test that unknown feature classes are reported rather than raising"""
+        schema = load_schema(self.xml_file, ['Building_A', 'Nope_X'])
+        self.assertEqual(list(schema['classes']), ['Building_A'])
+        self.assertEqual(schema['missing'], ['Nope_X'])
+    
+    def test_model_matches_script_output(self):
+        """Test that the pipeline model matches the standalone Building_A extraction"""
+        schema = load_schema(self.xml_file)
+        all_fields, fields_with_domains = extract_building_domains_complete.parse_building_a_complete(self.xml_file)
+        model = schema['classes']['Building_A']
+        self.assertEqual(model['all_fields'], all_fields)
+        self.assertEqual(model['fields_with_domains'], fields_with_domains)
+    
+    def test_outputs_written_per_class(self):
+        """Test that every writer produces its files for every class"""
+        output_dir = Path(self.tmpdir.name) / "out"
+        schema, written = run_pipeline(self.xml_file, None, output_dir)
+        names = {p.name for p in written}
+        for class_name in schema['classes']:
+            prefix = class_name.lower()
+            for suffix in ['_all_fields.csv', '_domains_detailed.csv', '_domains_columnar.csv',
+                           '_complete_metadata.csv', '_complete_metadata.json', '_complete_manual.html']:
+                self.assertIn(prefix + suffix, names)
+        for path in written:
+            self.assertTrue(path.exists())
+    
+    def test_long_output_rebuilds_columnar(self):
+        """Test that the unpadded long CSV has one row per value and pivots back to the codes-only file"""
+        output_dir = Path(self.tmpdir.name) / "long"
+        run_pipeline(self.xml_file, ['Building_A'], output_dir, ['columnar', 'long'])
+        with open(output_dir / "building_a_domains_long.csv", newline='', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+        with open(output_dir / "building_a_domains_codes_only.csv", newline='', encoding='utf-8') as f:
+            header, *padded = list(csv.reader(f))
+        self.assertEqual(list(dict.fromkeys(row['field'] for row in rows)), header)
+        self.assertEqual(len(rows), sum(1 for line in padded for cell in line if cell != ''))
+        for row in rows:
+            cell = padded[int(row['position']) - 1][header.index(row['field'])]
+            self.assertEqual(cell, row['name'] if row['domain_type'] == 'Range' else row['code'])
+    
+    def test_instrumentation_report(self):
+        """Test that stages are recorded per feature class and written as JSON"""
+        instrumentation = Instrumentation()
+        run_pipeline(self.xml_file, ['Building_A'], Path(self.tmpdir.name) / "inst", instrumentation=instrumentation)
+        instrumentation.stop()
+        
+        stages = {r['stage'] for r in instrumentation.records}
+        self.assertTrue({'parse', 'domain resolution', 'field walk', 'csv write', 'html render'} <= stages)
+        for record in instrumentation.records:
+            self.assertGreaterEqual(record['wall_s'], 0)
+            self.assertIsNotNone(record['tracemalloc_peak_mb'])
+        
+        report_file = Path(self.tmpdir.name) / "report.json"
+        instrumentation.write_report(report_file)
+        with open(report_file, encoding='utf-8') as f:
+            report = json.load(f)
+        self.assertIn('Building_A', report['summary']['by_feature_class'])
+        if report['peak_rss_mb'] is not None:
+            # A unit mix-up (bytes vs KiB) would be off by a factor of 1024
+            self.assertTrue(1 < report['peak_rss_mb'] < 100000, report['peak_rss_mb'])
+    
+    def test_overlapping_stages_have_no_traced_peak(self):
+        """Test that stages running at the same time on different threads report no tracemalloc peak"""
+        instrumentation = Instrumentation()
+        both_open = threading.Barrier(2)
+        
+        def run_stage(name):
+            with instrumentation.stage(name):
+                both_open.wait(timeout=5)
+        
+        threads = [threading.Thread(target=run_stage, args=(f"writer {i}",)) for i in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        with instrumentation.stage('serial'):
+            bytearray(1024 * 1024)
+        instrumentation.stop()
+        
+        peaks = {r['stage']: r['tracemalloc_peak_mb'] for r in instrumentation.records}
+        self.assertEqual((peaks['writer 0'], peaks['writer 1']), (None, None))
+        self.assertGreaterEqual(peaks['serial'], 1.0)
+    
+    def test_scan_class_models(self):
+        """Test that the byte scan models each class as load_schema does and refuses compressed or cut-off data"""
+        data = self.xml_file.read_bytes()
+        all_domains, classes = scan_class_models(data)
+        schema = load_schema(self.xml_file, None)
+        self.assertEqual([(name, load()) for name, _, _, load in classes], list(schema['classes'].items()))
+        self.assertEqual(list(all_domains), list(schema['domains']))
+        self.assertIsNone(scan_class_models(gzip.compress(data)))
+        with self.assertRaises(ValueError):
+            scan_class_models(data[:-200])
+    
+    def test_list_feature_classes(self):
+        """Test feature class discovery order"""
+        root = ET.parse(self.xml_file).getroot()
+        names = list_feature_classes(root)
+        self.assertEqual(len(names), 3)
+        self.assertEqual(names[0], 'Building_A')
+    
+    def test_lazy_domains_decode_on_lookup(self):
+        """Test that only bound domains are decoded and decoded domains equal parse_all_domains"""
+        root = ET.parse(self.xml_file).getroot()
+        eager = extract_building_domains_complete.parse_all_domains(root, NAMESPACES)
+        lazy = LazyDomainTable(root)
+        self.assertEqual(len(lazy), len(eager))
+        self.assertEqual(list(lazy), list(eager))
+        self.assertIn(next(iter(eager)), lazy)
+        self.assertNotIn('NoSuchDomain', lazy)
+        self.assertEqual(lazy.decoded_count(), 0)
+        
+        schema = load_schema(self.xml_file, ['Building_A'])
+        bound = {info['domain_name'] for info in schema['classes']['Building_A']['fields_with_domains'].values()}
+        self.assertEqual(set(schema['domains'].decoded), bound)
+        self.assertLess(schema['domains'].decoded_count(), len(eager))
+        self.assertEqual(dict(lazy), eager)
+        with self.assertRaises(KeyError):
+            lazy['NoSuchDomain']
+    
+    def test_cli_selected_outputs_concurrently(self):
+        """Test that gisschema extract writes only the selected outputs, also with several writer threads"""
+        for jobs in (1, 4):
+            output_dir = Path(self.tmpdir.name) / f"cli_{jobs}"
+            status = gisschema.main(['extract', '--input', str(self.xml_file), '--classes', 'all',
+                                     '--outputs', 'detailed,html', '--output-dir', str(output_dir),
+                                     '--jobs', str(jobs)])
+            self.assertEqual(status, 0)
+            names = sorted(p.name for p in output_dir.iterdir())
+            self.assertEqual(len(names), 9)
+            self.assertTrue(all(n.endswith(('_all_fields.csv', '_domains_detailed.csv', '_manual.html'))
+                                for n in names))
+        
+        serial = Path(self.tmpdir.name) / "cli_1"
+        for path in serial.iterdir():
+            self.assertEqual(path.read_bytes(), (Path(self.tmpdir.name) / "cli_4" / path.name).read_bytes())
+    
+    def test_cli_rejects_unknown_output(self):
+        """Test that unknown output names are rejected by the argument parser"""
+        with self.assertRaises(SystemExit):
+            gisschema.build_parser().parse_args(['extract', '--outputs', 'detailed,pdf'])
+    
+    def test_cli_instrumentation_report_on_failure(self):
+        """Test that the report is still written when a stage fails, and that checkpointed runs refuse instrumentation"""
+        broken = Path(self.tmpdir.name) / "broken.xml"
+        broken.write_bytes(self.xml_file.read_bytes()[:5000])
+        report_file = Path(self.tmpdir.name) / "failed_report.json"
+        with self.assertRaises(ET.ParseError):
+            gisschema.main(['extract', '--input', str(broken), '--output-dir', str(Path(self.tmpdir.name) / "failed"),
+                            '--instrument', str(report_file)])
+        with open(report_file, encoding='utf-8') as f:
+            self.assertEqual([stage['stage'] for stage in json.load(f)['stages']], ['parse'])
+        
+        for option in ('--instrument', '--profile'):
+            output_dir = Path(self.tmpdir.name) / "checkpointed"
+            status = gisschema.main(['extract', '--input', str(self.xml_file), '--output-dir', str(output_dir),
+                                     '--checkpoint', option, str(Path(self.tmpdir.name) / "unused.out")])
+            self.assertEqual(status, 2)
+            self.assertFalse(output_dir.exists())
+
+class TestOutputScheduler(unittest.TestCase):
+    
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.output_dir = Path(self.tmpdir.name)
+    
+    def tearDown(self):
+        self.tmpdir.cleanup()
+    
+    def test_atomic_output_replaces_file(self):
+        """Test that the new content appears only after the writer finishes"""
+        target = self.output_dir / "out.csv"
+        target.write_text("old", encoding='utf-8')
+        with atomic_output(target) as tmp_path:
+            tmp_path.write_text("new", encoding='utf-8')
+            self.assertEqual(target.read_text(encoding='utf-8'), "old")
+        self.assertEqual(target.read_text(encoding='utf-8'), "new")
+        self.assertEqual([p.name for p in self.output_dir.iterdir()], ["out.csv"])
+    
+    def test_atomic_output_keeps_old_file_on_error(self):
+        """Test that a failing writer leaves the previous output and no temporary file"""
+        target = self.output_dir / "out.csv"
+        target.write_text("old", encoding='utf-8')
+        with self.assertRaises(RuntimeError):
+            with atomic_output(target) as tmp_path:
+                tmp_path.write_text("partial", encoding='utf-8')
+                raise RuntimeError("writer failed")
+        self.assertEqual(target.read_text(encoding='utf-8'), "old")
+        self.assertEqual([p.name for p in self.output_dir.iterdir()], ["out.csv"])
+    
+    def test_pending_jobs_are_bounded(self):
+        """Test that no more than max_pending jobs are outstanding at once"""
+        lock = threading.Lock()
+        state = {'running': 0, 'max_running': 0}
+        
+        def job(i):
+            with lock:
+                state['running'] += 1
+                state['max_running'] = max(state['max_running'], state['running'])
+            time.sleep(0.01)
+            with lock:
+                state['running'] -= 1
+            return i
+        
+        results = run_writers([(job, (i,)) for i in range(20)], max_workers=8, max_pending=3)
+        self.assertEqual(results, list(range(20)))
+        self.assertLessEqual(state['max_running'], 3)
+    
+    def test_errors_are_raised_after_all_jobs(self):
+        """Test that a failing job does not stop the others and its error is re-raised"""
+        done = []
+        
+        def job(i):
+            if i == 2:
+                raise ValueError("boom")
+            done.append(i)
+        
+        with self.assertRaises(ValueError):
+            with WriterScheduler(max_workers=4) as scheduler:
+                for i in range(6):
+                    scheduler.submit(job, i)
+                scheduler.results()
+        self.assertEqual(sorted(done), [0, 1, 3, 4, 5])
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
\ No newline at end of file
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the n-gram fuzzy matcher
+"""
+
+import unittest
+import csv
+import tempfile
+from pathlib import Path
+
+from fuzzy_match import DomainMatcher, normalize_text
+from extraction_pipeline import load_schema
+from generate_synthetic_export import generate_synthetic_export
+import gisschema
+
+COUNTRIES = [
+    {'code': 'DEU', 'name': 'Germany'},
+    {'code': 'AUT', 'name': 'Austria'},
+    {'code': 'AUS', 'name': 'Australia'},
+    {'code': 'USA', 'name': 'United States'},
+    {'code': 'GBR', 'name': 'United Kingdom'},
+    {'code': 'CIV', 'name': "Côte d'Ivoire"},
+]
+
+class TestFuzzyMatch(unittest.TestCase):
+    
+    def setUp(self):
+        self.matcher = DomainMatcher(COUNTRIES, aliases={'Deutschland': 'DEU'})
+    
+    def test_normalize(self):
+        """Test case, accent, punctuation and whitespace normalisation"""
+        self.assertEqual(normalize_text("  Côte  d'Ivoire "), 'cote d ivoire')
+    
+    def test_exact_names_codes_and_aliases(self):
+        """Test that names, codes and aliases match exactly after normalisation"""
+        self.assertEqual(self.matcher.match('GERMANY')[0], ('DEU', 'Germany', 1.0))
+        self.assertEqual(self.matcher.match('deu')[0][0], 'DEU')
+        self.assertEqual(self.matcher.match('Deutschland')[0][0], 'DEU')
+        self.assertEqual(self.matcher.match('cote divoire')[0][0], 'CIV')
+    
+    def test_typos_rank_best_candidate_first(self):
+        """Test that misspellings score below 1 but still pick the right code"""
+        self.assertEqual(self.matcher.match('Untied States')[0][0], 'USA')
+        self.assertEqual(self.matcher.match('Austrailia')[0][0], 'AUS')
+        candidates = self.matcher.match('Austri', limit=2, threshold=0.3)
+        self.assertEqual([c[0] for c in candidates], ['AUT', 'AUS'])
+        self.assertLess(candidates[0][2], 1.0)
+    
+    def test_threshold_and_cache(self):
+        """Test that unrelated input is rejected and repeated input comes from the cache"""
+        self.assertEqual(self.matcher.match('zzzz'), ())
+        self.matcher.match('Germny')
+        self.matcher.match('Germny')
+        self.assertEqual(self.matcher.cache_info().hits, 1)
+    
+    def test_cli_appends_match_columns(self):
+        """Test that gisschema match appends code, name and score columns"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            xml_file = Path(tmpdir) / "DATABASE_EXPORT.XML"
+            generate_synthetic_export(xml_file, feature_classes=1, fields_per_class=10, domains=5,
+                                      values_per_domain=8, domain_fields_per_class=3)
+            schema = load_schema(xml_file, [])
+            domain_name, domain = next((name, d) for name, d in schema['domains'].items() if d['values'])
+            target_name = domain['values'][2]['name']
+            
+            records = Path(tmpdir) / "legacy.csv"
+            with open(records, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(['id', 'Kind'])
+                writer.writerows([[1, target_name.upper()], [2, target_name[:-1]], [3, 'qqqqqq'], [4, '']])
+            output = Path(tmpdir) / "matched.csv"
+            status = gisschema.main(['match', '--input', str(xml_file), '--domain', domain_name,
+                                     '--records', str(records), '--column', 'kind', '--output', str(output)])
+            self.assertEqual(status, 0)
+            with open(output, newline='', encoding='utf-8') as f:
+                rows = list(csv.DictReader(f))
+            self.assertEqual([r['Kind_code'] for r in rows[:2]], [domain['values'][2]['code']] * 2)
+            self.assertEqual(rows[0]['Kind_score'], '1.0')
+            self.assertEqual(rows[2]['Kind_code'], '')
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
\ No newline at end of file
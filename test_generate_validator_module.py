@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Unit tests for per-class validator code generation
+Checks that generated modules agree with the generic checkers and are only
+regenerated when the schema fingerprint changes
+"""
+
+import unittest
+import copy
+import json
+import tempfile
+from pathlib import Path
+
+from generate_synthetic_export import generate_synthetic_export, generate_synthetic_records
+from generate_validator_module import (
+    ensure_validator_module, compile_validator, generate_validator_source, schema_fingerprint, stored_fingerprint
+)
+from validate_records import load_field_rules, load_validator_module, make_checker, validate_records
+import gisschema
+
+class TestGenerateValidatorModule(unittest.TestCase):
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.xml_file = Path(cls.tmpdir.name) / "DATABASE_EXPORT.XML"
+        generate_synthetic_export(cls.xml_file, feature_classes=1, fields_per_class=30,
+                                  domains=40, values_per_domain=6, domain_fields_per_class=12)
+        cls.rules = load_field_rules(cls.xml_file)
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmpdir.cleanup()
+    
+    def test_generated_source_compiles(self):
+        """Test that the generated module is valid Python carrying the fingerprint and field order"""
+        source = generate_validator_source('Building_A', self.rules)
+        compile(source, 'building_a_validator.py', 'exec')
+        module_path, _ = ensure_validator_module('Building_A', self.rules, Path(self.tmpdir.name) / "compiled")
+        module = load_validator_module(module_path)
+        self.assertEqual(module.SCHEMA_FINGERPRINT, schema_fingerprint(self.rules))
+        self.assertEqual(list(module.FIELDS), list(self.rules))
+    
+    def test_matches_generic_checkers(self):
+        """Test that validate_row reports exactly what the generic checkers report"""
+        module_path, _ = ensure_validator_module('Building_A', self.rules, Path(self.tmpdir.name) / "compiled")
+        module = load_validator_module(module_path)
+        checkers = [(name, make_checker(rule)) for name, rule in self.rules.items()]
+        records = Path(self.tmpdir.name) / "records.ndjson"
+        generate_synthetic_records(self.rules, records, rows=2000, error_rate=0.2)
+        with open(records, encoding='utf-8') as f:
+            for line in f:
+                record = json.loads(line)
+                expected = []
+                for name, check in checkers:
+                    error = check(record.get(name, ''))
+                    if error is not None:
+                        expected.append((name, error))
+                self.assertEqual(module.validate_record(record), expected)
+    
+    def test_validate_records_compiled_report(self):
+        """Test that the compiled path writes the same report as the generic one"""
+        module_path, _ = ensure_validator_module('Building_A', self.rules, Path(self.tmpdir.name) / "compiled")
+        records = Path(self.tmpdir.name) / "records.csv"
+        generate_synthetic_records(self.rules, records, rows=3000, error_rate=0.05)
+        generic = Path(self.tmpdir.name) / "generic.csv"
+        compiled = Path(self.tmpdir.name) / "compiled.csv"
+        validate_records(records, self.rules, generic, chunk_size=700)
+        summary = validate_records(records, self.rules, compiled, chunk_size=700, validator_path=module_path)
+        self.assertTrue(summary['compiled'])
+        self.assertEqual(generic.read_bytes(), compiled.read_bytes())
+    
+    def test_regenerates_only_on_schema_change(self):
+        """Test that an unchanged fingerprint keeps the module and a changed rule rewrites it"""
+        output_dir = Path(self.tmpdir.name) / "regen"
+        module_path, regenerated = ensure_validator_module('Building_A', self.rules, output_dir)
+        self.assertTrue(regenerated)
+        _, regenerated = ensure_validator_module('Building_A', self.rules, output_dir)
+        self.assertFalse(regenerated)
+        
+        changed = copy.deepcopy(self.rules)
+        name = next(name for name, rule in changed.items() if rule['codes'])
+        changed[name]['codes'] = changed[name]['codes'][:-1]
+        _, regenerated = ensure_validator_module('Building_A', changed, output_dir)
+        self.assertTrue(regenerated)
+        self.assertEqual(stored_fingerprint(module_path), schema_fingerprint(changed))
+        _, regenerated = ensure_validator_module('Building_A', changed, output_dir, force=True)
+        self.assertTrue(regenerated)
+    
+    def test_compile_validator_and_cli(self):
+        """Test compile_validator and the codegen and validate --compiled-dir commands"""
+        output_dir = Path(self.tmpdir.name) / "cli"
+        self.assertEqual(gisschema.main(['codegen', '--input', str(self.xml_file), '--output-dir', str(output_dir)]), 0)
+        module, regenerated = compile_validator(self.xml_file, output_dir=output_dir)
+        self.assertFalse(regenerated)
+        self.assertEqual(module.CLASS_NAME, 'Building_A')
+        
+        records = Path(self.tmpdir.name) / "cli_records.csv"
+        generate_synthetic_records(self.rules, records, rows=200, error_rate=0.0)
+        args = ['validate', '--input', str(self.xml_file), '--records', str(records),
+                '--report', str(Path(self.tmpdir.name) / "cli_errors.csv"), '--compiled-dir', str(output_dir)]
+        self.assertEqual(gisschema.main(args), 0)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
\ No newline at end of file
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the header-to-field mapper
+"""
+
+import unittest
+import csv
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+
+from header_mapper import header_tokens, normalize_header, build_header_index, map_headers, resolve_header
+from generate_synthetic_export import generate_synthetic_export
+import gisschema
+
+def field(name, alias, model=''):
+    return OrderedDict([('name', name), ('alias_name', alias), ('model_name', model)])
+
+SCHEMA = {
+    'classes': OrderedDict([
+        ('Building_A', {'metadata': [field('buildingCondition', 'Building Condition'),
+                                     field('buildingOpStatus', 'Building Operational Status', 'BLDG_OP_STATUS'),
+                                     field('featureName', 'Feature Name'),
+                                     field('OBJECTID', 'OBJECTID')]}),
+        ('Road_L', {'metadata': [field('featureName', 'Feature Name'),
+                                 field('roadCondition', 'Road Condition'),
+                                 field('OBJECTID', 'OBJECTID')]}),
+    ])
+}
+
+class TestHeaderMapper(unittest.TestCase):
+    
+    def setUp(self):
+        self.index = build_header_index(SCHEMA)
+    
+    def test_tokens_and_normalisation(self):
+        """Test camelCase, snake_case, acronym and punctuation splitting"""
+        self.assertEqual(header_tokens('buildingOpStatus'), ['building', 'op', 'status'])
+        self.assertEqual(header_tokens('BLDG_OP_STATUS'), ['bldg', 'op', 'status'])
+        self.assertEqual(header_tokens('HTMLFieldName'), ['html', 'field', 'name'])
+        self.assertEqual(normalize_header('Building  Condition'), normalize_header('building_condition'))
+    
+    def test_exact_alias_and_model_name(self):
+        """Test that names, aliases and model names resolve within a class"""
+        results = map_headers(['buildingCondition', 'BUILDING CONDITION', 'bldg op status'], self.index, 'Building_A')
+        self.assertEqual([r['status'] for r in results], ['exact', 'duplicate', 'normalized'])
+        self.assertEqual(results[2]['field'], 'buildingOpStatus')
+        self.assertEqual(results[1]['duplicate_of'], 'buildingCondition')
+    
+    def test_token_match_and_unmatched(self):
+        """Test partial token overlap above the threshold and rejection below it"""
+        result = resolve_header('Operational Status', self.index, 'Building_A')
+        self.assertEqual((result['status'], result['field']), ('token', 'buildingOpStatus'))
+        self.assertLess(result['score'], 1.0)
+        self.assertEqual(resolve_header('Roof Material', self.index, 'Building_A')['status'], 'unmatched')
+    
+    def test_ambiguous_matches_are_reported(self):
+        """Test that ties across classes or between fields are flagged with their candidates"""
+        result = resolve_header('Feature Name', self.index)
+        self.assertEqual(result['status'], 'ambiguous')
+        self.assertEqual({c['class'] for c in result['candidates']}, {'Building_A', 'Road_L'})
+        result = resolve_header('Condition', self.index, threshold=0.3)
+        self.assertEqual(result['status'], 'ambiguous')
+        self.assertEqual(resolve_header('Feature Name', self.index, 'Road_L')['status'], 'normalized')
+    
+    def test_cli_writes_mapping(self):
+        """Test gisschema map-headers against a synthetic export"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            xml_file = Path(tmpdir) / "DATABASE_EXPORT.XML"
+            generate_synthetic_export(xml_file, feature_classes=1, fields_per_class=10, domains=5,
+                                      values_per_domain=3, domain_fields_per_class=2)
+            output = Path(tmpdir) / "mapping.csv"
+            status = gisschema.main(['map-headers', '--input', str(xml_file), '--headers', 'OBJECTID,global id,nothing here',
+                                     '--output', str(output)])
+            self.assertEqual(status, 0)
+            with open(output, newline='', encoding='utf-8') as f:
+                rows = list(csv.DictReader(f))
+            self.assertEqual([r['status'] for r in rows], ['exact', 'normalized', 'unmatched'])
+            self.assertEqual(rows[1]['field'], 'GlobalID')
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
\ No newline at end of file
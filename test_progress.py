@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Unit tests for parse progress reporting
+Parses a small synthetic export through every reader with a reporter that emits on every chunk
+"""
+
+import unittest
+import gzip
+import io
+import json
+import tempfile
+from pathlib import Path
+
+from generate_synthetic_export import generate_synthetic_export
+from extraction_pipeline import load_schema
+from export_reader import parse_export
+from progress import ProgressReporter, input_size, format_duration
+
+class TestProgress(unittest.TestCase):
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.xml_file = Path(cls.tmpdir.name) / "DATABASE_EXPORT.XML"
+        generate_synthetic_export(cls.xml_file, feature_classes=3, fields_per_class=20, domains=40,
+                                  values_per_domain=8, domain_fields_per_class=8, seed=5)
+        cls.data = cls.xml_file.read_bytes()
+        cls.gz_file = Path(cls.tmpdir.name) / "DATABASE_EXPORT.XML.gz"
+        cls.gz_file.write_bytes(gzip.compress(cls.data))
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmpdir.cleanup()
+    
+    def events(self, output):
+        return [json.loads(line) for line in output.getvalue().splitlines()]
+    
+    def test_json_events_follow_the_byte_offset(self):
+        """Test percent, ETA and tag counts of the JSON events for a plain export"""
+        output = io.StringIO()
+        progress = ProgressReporter(input_size(self.xml_file), output, json_events=True, interval=0, sample_every=1)
+        parse_export(self.xml_file, progress=progress)
+        progress.finish()
+        events = self.events(output)
+        self.assertGreater(len(events), 1)
+        self.assertEqual([event['event'] for event in events[-2:]], ['progress', 'done'])
+        self.assertEqual(events[-1]['bytes'], len(self.data))
+        self.assertEqual(events[-1]['percent'], 100.0)
+        self.assertIsNotNone(events[0]['eta_s'])
+        self.assertEqual([event['bytes'] for event in events], sorted(event['bytes'] for event in events))
+        self.assertEqual(events[-1]['fields'], self.data.count(b'<Field '))
+        self.assertGreater(events[-1]['elements'], events[-1]['fields'])
+    
+    def test_compressed_and_streamed_input(self):
+        """Test that compressed files report the compressed offset and streams work without a total"""
+        output = io.StringIO()
+        progress = ProgressReporter(input_size(self.gz_file), output, json_events=True, interval=0, sample_every=1)
+        load_schema(self.gz_file, None, progress=progress)
+        done = self.events(output)[-1]
+        self.assertEqual(done['bytes'], self.gz_file.stat().st_size)
+        self.assertEqual(done['fields'], self.data.count(b'<Field '))
+        
+        output = io.StringIO()
+        with open(self.gz_file, 'rb') as f:
+            self.assertIsNone(input_size(f))
+            progress = ProgressReporter(None, output, json_events=True, interval=0, sample_every=1)
+            load_schema(f, ['Building_A'], progress=progress)
+        events = self.events(output)
+        self.assertIsNone(events[-1]['percent'])
+        self.assertTrue(all(event['eta_s'] is None for event in events))
+        self.assertEqual(events[-1]['domains'], self.data.count(b'<Domain '))
+    
+    def test_sampling_and_text_lines(self):
+        """Test that a long interval emits only the final line and the text format"""
+        output = io.StringIO()
+        progress = ProgressReporter(len(self.data), output, interval=3600)
+        load_schema(self.xml_file, ['Building_A'], progress=progress)
+        lines = output.getvalue().splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertIn('100.0%', lines[0])
+        self.assertIn('MB/s', lines[0])
+        self.assertIn('done in 0:00:0', lines[0])
+        self.assertEqual(format_duration(3725), '1:02:05')
+        
+        sampled = ProgressReporter(len(self.data), io.StringIO(), sample_every=4)
+        for offset in range(0, len(self.data), 4096):
+            sampled.advance(offset + 4096, self.data[offset:offset + 4096])
+        fields = self.data.count(b'<Field ')
+        self.assertAlmostEqual(sampled.snapshot('done')['fields'], fields, delta=fields * 0.25)
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Unit tests for checkpointed extraction
+Interrupts a run over a small synthetic export after a few classes and resumes it
+"""
+
+import unittest
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from generate_synthetic_export import generate_synthetic_export
+from extraction_pipeline import run_pipeline
+from resumable_extract import CHECKPOINT_NAME, CheckpointJournal, iter_feature_classes, run_resumable
+
+OUTPUTS = ['detailed', 'columnar', 'json', 'sql']
+
+class TestResumableExtract(unittest.TestCase):
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.dir = Path(cls.tmpdir.name)
+        cls.xml_file = cls.dir / "DATABASE_EXPORT.XML"
+        generate_synthetic_export(cls.xml_file, feature_classes=5, fields_per_class=12, domains=20,
+                                  values_per_domain=5, domain_fields_per_class=6, seed=7)
+        cls.expected_dir = cls.dir / "expected"
+        schema, _ = run_pipeline(cls.xml_file, None, cls.expected_dir, OUTPUTS)
+        cls.class_names = list(schema['classes'])
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmpdir.cleanup()
+    
+    def files(self, output_dir):
+        return {path.name: path.read_bytes() for path in Path(output_dir).iterdir() if path.name != CHECKPOINT_NAME}
+    
+    def test_scan_finds_every_feature_class(self):
+        """Test that the byte scan yields the classes in document order with parseable ranges"""
+        data = self.xml_file.read_bytes()
+        found = list(iter_feature_classes(data))
+        self.assertEqual([name for name, _, _ in found], self.class_names)
+        for name, start, end in found:
+            self.assertTrue(data[start:end].startswith(b'<DataElement'))
+            self.assertTrue(data[start:end].endswith(b'</DataElement>'))
+        self.assertEqual([name for name, _, _ in iter_feature_classes(data, found[2][2])], self.class_names[3:])
+    
+    def test_interrupted_run_resumes_and_matches_a_full_extraction(self):
+        """Test that a resumed run skips finished classes and ends with the same files as run_pipeline"""
+        output_dir = self.dir / "resumed"
+        summary, written = run_resumable(self.xml_file, None, output_dir, OUTPUTS, limit=2)
+        self.assertEqual(summary['status'], 'partial')
+        self.assertEqual(summary['extracted'], self.class_names[:2])
+        self.assertGreater(summary['next_offset'], 0)
+        
+        summary, written = run_resumable(self.xml_file, None, output_dir, OUTPUTS)
+        self.assertTrue(summary['resumed'])
+        self.assertEqual(summary['skipped'], self.class_names[:2])
+        self.assertEqual(summary['extracted'], self.class_names[2:])
+        self.assertEqual(summary['status'], 'complete')
+        self.assertEqual(self.files(output_dir), self.files(self.expected_dir))
+        
+        summary, written = run_resumable(self.xml_file, None, output_dir, OUTPUTS)
+        self.assertEqual((summary['extracted'], written), ([], []))
+        self.assertEqual(summary['skipped'], self.class_names)
+    
+    def test_missing_outputs_are_redone_and_torn_lines_ignored(self):
+        """Test recovery from a deleted output and from a checkpoint line cut short by a crash"""
+        output_dir = self.dir / "recover"
+        run_resumable(self.xml_file, None, output_dir, OUTPUTS, limit=3)
+        (output_dir / "building_a_all_fields.csv").unlink()
+        checkpoint = output_dir / CHECKPOINT_NAME
+        with open(checkpoint, 'a', encoding='utf-8') as f:
+            f.write('{"class": "Torn", "sta')
+        
+        summary, _ = run_resumable(self.xml_file, None, output_dir, OUTPUTS)
+        self.assertTrue(summary['resumed'])
+        self.assertEqual(summary['redone'], ['Building_A'])
+        self.assertEqual(summary['skipped'], self.class_names[1:3])
+        self.assertEqual(summary['extracted'], self.class_names[3:])
+        self.assertEqual(self.files(output_dir), self.files(self.expected_dir))
+        records = [json.loads(line) for line in checkpoint.read_text(encoding='utf-8').splitlines()]
+        self.assertTrue(records[-1]['complete'])
+        self.assertNotIn('Torn', [record.get('class') for record in records])
+    
+    def test_interrupted_rewrite_keeps_the_journal(self):
+        """Test that failing while the carried-over records are rewritten leaves the previous checkpoint"""
+        output_dir = self.dir / "rewrite"
+        run_resumable(self.xml_file, None, output_dir, OUTPUTS, limit=2)
+        checkpoint = output_dir / CHECKPOINT_NAME
+        before = checkpoint.read_bytes()
+        records = [json.loads(line) for line in before.decode('utf-8').splitlines()]
+        with self.assertRaises(TypeError):
+            CheckpointJournal(checkpoint, records[:1] + [object()] + records[1:])
+        self.assertEqual(checkpoint.read_bytes(), before)
+        self.assertEqual([path for path in output_dir.iterdir() if path.name.endswith('.tmp')], [])
+        
+        summary, _ = run_resumable(self.xml_file, None, output_dir, OUTPUTS)
+        self.assertEqual(summary['skipped'], self.class_names[:2])
+        self.assertEqual(summary['extracted'], self.class_names[2:])
+    
+    def test_changed_export_or_options_start_over(self):
+        """Test that the checkpoint is discarded when the export, classes or outputs differ"""
+        output_dir = self.dir / "changed"
+        xml_file = self.dir / "copy.xml"
+        xml_file.write_bytes(self.xml_file.read_bytes())
+        run_resumable(xml_file, None, output_dir, OUTPUTS, limit=1)
+        
+        summary, _ = run_resumable(xml_file, None, output_dir, ['json'], limit=1)
+        self.assertIn('outputs', summary['discarded'])
+        summary, _ = run_resumable(xml_file, [self.class_names[1], 'Missing_Class'], output_dir, ['json'])
+        self.assertIn('classes', summary['discarded'])
+        self.assertEqual(summary['extracted'], [self.class_names[1]])
+        self.assertEqual(summary['missing'], ['Missing_Class'])
+        
+        info = xml_file.stat()
+        os.utime(xml_file, ns=(info.st_atime_ns, info.st_mtime_ns + 10**9))
+        summary, _ = run_resumable(xml_file, [self.class_names[1], 'Missing_Class'], output_dir, ['json'])
+        self.assertIn('export changed', summary['discarded'])
+        summary, _ = run_resumable(xml_file, [self.class_names[1], 'Missing_Class'], output_dir, ['json'], restart=True)
+        self.assertFalse(summary['resumed'])
+        self.assertIsNone(summary['discarded'])
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
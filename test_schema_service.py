@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the schema lookup service
+Starts the service on a free localhost port against a small synthetic export
+"""
+
+import unittest
+import asyncio
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+import http.client
+from pathlib import Path
+from urllib.parse import quote
+
+from generate_synthetic_export import generate_synthetic_export
+from extraction_pipeline import load_schema
+from schema_service import SchemaService
+
+class TestSchemaService(unittest.TestCase):
+    
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.xml_file = Path(self.tmpdir.name) / "DATABASE_EXPORT.XML"
+        generate_synthetic_export(self.xml_file, feature_classes=2, fields_per_class=15,
+                                  domains=20, values_per_domain=5, domain_fields_per_class=6)
+        self.schema = load_schema(self.xml_file, None)
+        
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        self.service = SchemaService(self.xml_file, None, port=0, poll_interval=0.05)
+        asyncio.run_coroutine_threadsafe(self.service.start(), self.loop).result(timeout=30)
+    
+    def tearDown(self):
+        asyncio.run_coroutine_threadsafe(self.service.close(), self.loop).result(timeout=10)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=10)
+        self.loop.close()
+        self.tmpdir.cleanup()
+    
+    def request(self, path, headers=None):
+        connection = http.client.HTTPConnection('127.0.0.1', self.service.port, timeout=10)
+        try:
+            connection.request('GET', path, headers=headers or {})
+            response = connection.getresponse()
+            body = response.read()
+            return response.status, response.getheader('ETag'), json.loads(body) if body else None
+        finally:
+            connection.close()
+    
+    def test_field_lookup_returns_allowed_values(self):
+        """Test that a coded value field lists the codes of its domain"""
+        model = self.schema['classes']['Building_A']
+        field_name, domain_info = next(item for item in model['fields_with_domains'].items()
+                                       if item[1]['domain_type'] == 'CodedValue')
+        status, _, data = self.request(f"/classes/Building_A/fields/{field_name}")
+        self.assertEqual(status, 200)
+        self.assertEqual(data['domain_name'], domain_info['domain_name'])
+        self.assertEqual([v['code'] for v in data['allowed_values']], [v['code'] for v in domain_info['values']])
+    
+    def test_code_lookup(self):
+        """Test that a code resolves to its display name"""
+        domain = next(d for d in self.schema['domains'].values() if d['values'])
+        value = domain['values'][0]
+        status, _, data = self.request(f"/domains/{quote(domain['name'])}/codes/{quote(value['code'])}")
+        self.assertEqual(status, 200)
+        self.assertEqual(data['name'], value['name'])
+    
+    def test_unknown_paths_return_404(self):
+        """Test that unknown classes, fields and codes are reported as not found"""
+        for path in ['/classes/Nope_X', '/classes/Building_A/fields/nope', '/domains/nope/codes/1', '/other']:
+            status, _, data = self.request(path)
+            self.assertEqual(status, 404, path)
+            self.assertIn('error', data)
+    
+    def test_etag_revalidation(self):
+        """Test that a matching If-None-Match yields 304 without a body"""
+        status, etag, data = self.request('/classes')
+        self.assertEqual(status, 200)
+        self.assertEqual(data, list(self.schema['classes']))
+        status, _, data = self.request('/classes', {'If-None-Match': etag})
+        self.assertEqual(status, 304)
+        self.assertIsNone(data)
+        status, _, _ = self.request('/classes', {'If-None-Match': f'"other", W/{etag}'})
+        self.assertEqual(status, 304)
+    
+    def test_equivalent_paths_share_cache_entry(self):
+        """Test that paths naming the same resource are cached once"""
+        domain = next(d for d in self.schema['domains'].values() if d['values'] and d['values'].numeric)
+        name = quote(domain['name'])
+        paths = ['/classes', '/classes/', '/classes//'] + [f"/domains/{name}/codes/{'0' * i}1" for i in range(5)]
+        for path in paths * 2:
+            status, _, _ = self.request(path)
+            self.assertEqual(status, 200, path)
+        self.assertEqual(len(self.service.state['cache']), 2)
+    
+    def raw_request(self, data):
+        with socket.create_connection(('127.0.0.1', self.service.port), timeout=10) as sock:
+            sock.sendall(data)
+            response = http.client.HTTPResponse(sock)
+            response.begin()
+            return response.status, json.loads(response.read())
+    
+    def test_oversized_requests_are_rejected(self):
+        """Test that overlong request lines and headers, or too many headers, get an error response"""
+        status, data = self.raw_request(b"GET /" + b"a" * 70000 + b" HTTP/1.1\r\n\r\n")
+        self.assertEqual(status, 400)
+        self.assertIn('error', data)
+        status, _ = self.raw_request(b"GET /classes HTTP/1.1\r\nX-Big: " + b"a" * 70000 + b"\r\n\r\n")
+        self.assertEqual(status, 431)
+        status, _ = self.raw_request(b"GET /classes HTTP/1.1\r\n" + b"X-Same: 1\r\n" * 101 + b"\r\n")
+        self.assertEqual(status, 431)
+        status, _ = self.raw_request(b"GET /classes HTTP/1.1\r\n" + b"X-Same: 1\r\n" * 99 + b"Connection: close\r\n\r\n")
+        self.assertEqual(status, 200)
+    
+    def test_request_bodies_are_skipped(self):
+        """Test that a body is not read as the next request, and that bodies that cannot be skipped are rejected"""
+        with socket.create_connection(('127.0.0.1', self.service.port), timeout=10) as sock:
+            sock.sendall(b"GET /classes HTTP/1.1\r\nContent-Length: 9\r\n\r\nGET /x 1\n"
+                         b"GET /classes HTTP/1.1\r\nConnection: close\r\n\r\n")
+            with sock.makefile('rb') as stream:
+                responses = stream.read()
+        self.assertEqual(responses.count(b"HTTP/1.1 200 OK"), 2)
+        self.assertNotIn(b"HTTP/1.1 400", responses)
+        for header in (b"Content-Length: 70000", b"Content-Length: -1", b"Transfer-Encoding: chunked"):
+            status, _ = self.raw_request(b"GET /classes HTTP/1.1\r\n" + header + b"\r\n\r\n")
+            self.assertEqual(status, 400, header)
+    
+    def test_idle_connections_are_closed(self):
+        """Test that a connection sending nothing, or stopping halfway through its headers, is closed"""
+        self.service.idle_timeout = 0.2
+        for data in (b"", b"GET /classes HTTP/1.1\r\nHost: x\r\n"):
+            with socket.create_connection(('127.0.0.1', self.service.port), timeout=10) as sock:
+                sock.sendall(data)
+                started = time.monotonic()
+                self.assertEqual(sock.recv(1024), b'')
+                self.assertLess(time.monotonic() - started, 5)
+    
+    def test_hot_reload_on_export_change(self):
+        """Test that a changed export is picked up without restarting the service"""
+        _, etag, _ = self.request('/classes')
+        replacement = Path(self.tmpdir.name) / "replacement.xml"
+        generate_synthetic_export(replacement, feature_classes=3, fields_per_class=15,
+                                  domains=20, values_per_domain=5, domain_fields_per_class=6)
+        os.replace(replacement, self.xml_file)
+        
+        deadline = time.time() + 20
+        while time.time() < deadline:
+            _, _, health = self.request('/health')
+            if health['generation'] == 2:
+                break
+            time.sleep(0.05)
+        self.assertEqual(health['generation'], 2)
+        
+        status, new_etag, data = self.request('/classes', {'If-None-Match': etag})
+        self.assertEqual(status, 200)
+        self.assertEqual(len(data), 3)
+        self.assertNotEqual(new_etag, etag)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
\ No newline at end of file
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the selective byte-level reader
+Checks that parsing only the requested DataElements gives the same model as a
+full parse, including nested DataElements and fields named like a class
+"""
+
+import unittest
+import tempfile
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from generate_synthetic_export import generate_synthetic_export
+from extraction_pipeline import NAMESPACES, load_schema, list_feature_classes, build_class_model, LazyDomainTable
+from extract_building_domains_complete import find_feature_class
+from selective_reader import read_selected, selected_bytes
+
+NESTED_EXPORT = """<?xml version="1.0" encoding="UTF-8"?>
+<esri:Workspace xmlns:esri="http://www.esri.com/schemas/ArcGIS/10.8" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" xmlns:xs="http://www.w3.org/2001/XMLSchema">
+  <WorkspaceDefinition xsi:type="esri:WorkspaceDefinition">
+    <Domains xsi:type="esri:ArrayOfDomain"/>
+    <DatasetDefinitions xsi:type="esri:ArrayOfDataElement">
+      <DataElement xsi:type="esri:DEFeatureDataset">
+        <Name>Buildings</Name>
+        <Children xsi:type="esri:ArrayOfDataElement">
+          <DataElement xsi:type="esri:DEFeatureClass">
+            <Name>Other_B</Name>
+            <Fields xsi:type="esri:Fields"><FieldArray xsi:type="esri:ArrayOfField">
+              <Field xsi:type="esri:Field"><Name>Building_A</Name><Type>esriFieldTypeString</Type></Field>
+            </FieldArray></Fields>
+          </DataElement>
+          <DataElement xsi:type="esri:DEFeatureClass">
+            <Name>Building_A</Name>
+            <Fields xsi:type="esri:Fields"><FieldArray xsi:type="esri:ArrayOfField">
+              <Field xsi:type="esri:Field"><Name>OBJECTID</Name><Type>esriFieldTypeOID</Type></Field>
+            </FieldArray></Fields>
+          </DataElement>
+        </Children>
+      </DataElement>
+    </DatasetDefinitions>
+  </WorkspaceDefinition>
+</esri:Workspace>
+"""
+
+class TestSelectiveReader(unittest.TestCase):
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.xml_file = Path(cls.tmpdir.name) / "DATABASE_EXPORT.XML"
+        generate_synthetic_export(cls.xml_file, feature_classes=6, fields_per_class=20,
+                                  domains=30, values_per_domain=5, domain_fields_per_class=8)
+        cls.root = ET.parse(cls.xml_file).getroot()
+        cls.class_names = list_feature_classes(cls.root)
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmpdir.cleanup()
+    
+    def model(self, root, class_name):
+        return build_class_model(find_feature_class(root, NAMESPACES, class_name), LazyDomainTable(root))
+    
+    def test_selected_model_matches_full_parse(self):
+        """Test that every view of the selected classes equals the full-parse model"""
+        selected = [self.class_names[0], self.class_names[-1]]
+        root = read_selected(self.xml_file, selected)
+        self.assertEqual(list_feature_classes(root), selected)
+        self.assertEqual(len(LazyDomainTable(root)), len(LazyDomainTable(self.root)))
+        for class_name in selected:
+            self.assertEqual(self.model(root, class_name), self.model(self.root, class_name))
+        self.assertLess(selected_bytes(self.xml_file, selected), self.xml_file.stat().st_size)
+    
+    def test_nested_data_elements_and_field_names(self):
+        """Test feature classes inside a feature dataset and a field named like a class"""
+        nested = Path(self.tmpdir.name) / "nested.xml"
+        nested.write_text(NESTED_EXPORT, encoding='utf-8')
+        root = read_selected(nested, ['Building_A'])
+        self.assertEqual(list_feature_classes(root), ['Building_A'])
+        self.assertEqual(root.find(".//DataElement/Fields//Field/Name").text, 'OBJECTID')
+    
+    def test_fallback_to_full_parse(self):
+        """Test that unlocatable classes and UTF-16 files return None and load_schema still works"""
+        self.assertIsNone(read_selected(self.xml_file, ['Building_A', 'Nope_X']))
+        utf16 = Path(self.tmpdir.name) / "utf16.xml"
+        utf16.write_text(NESTED_EXPORT.replace('UTF-8', 'UTF-16'), encoding='utf-16')
+        self.assertIsNone(read_selected(utf16, ['Building_A']))
+        self.assertEqual(list(load_schema(utf16, ['Building_A'])['classes']), ['Building_A'])
+        schema = load_schema(self.xml_file, ['Building_A', 'Nope_X'])
+        self.assertEqual(schema['missing'], ['Nope_X'])
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
\ No newline at end of file
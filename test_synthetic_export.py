@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the synthetic export generator
+Checks that generated exports match the structure the extraction scripts expect
+"""
+
+import unittest
+import tempfile
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from generate_synthetic_export import generate_synthetic_export
+import extract_building_domains_complete
+import extract_building_domains_columnar
+import extract_all_metadata
+import generate_complete_html_manual
+
+NAMESPACES = {
+    'esri': 'http://www.esri.com/schemas/ArcGIS/10.8',
+    'xsi': 'http://www.w3.org/2001/XMLSchema-instance',
+    'xs': 'http://www.w3.org/2001/XMLSchema'
+}
+
+class TestSyntheticExport(unittest.TestCase):
+    
+    @classmethod
+    def setUpClass(cls):
+        """Generate one small export shared by all tests"""
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.xml_file = Path(cls.tmpdir.name) / "DATABASE_EXPORT.XML"
+        cls.summary = generate_synthetic_export(cls.xml_file, feature_classes=3, fields_per_class=20,
+                                                domains=30, values_per_domain=5, domain_fields_per_class=8)
+        cls.root = ET.parse(cls.xml_file).getroot()
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmpdir.cleanup()
+    
+    def test_summary_counts(self):
+        """Test that the summary reflects the requested counts"""
+        self.assertEqual(self.summary['feature_classes'], 3)
+        self.assertEqual(self.summary['fields'], 60)
+        self.assertEqual(self.summary['domains'], 30)
+        self.assertGreater(self.summary['bytes'], 0)
+    
+    def test_workspace_domains_parsed(self):
+        """Test that parse_all_domains finds every generated domain"""
+        domains = extract_building_domains_complete.parse_all_domains(self.root, NAMESPACES)
+        self.assertEqual(len(domains), 30)
+        
+        coded = [d for d in domains.values() if 'CodedValueDomain' in d['type']]
+        ranges = [d for d in domains.values() if 'RangeDomain' in d['type']]
+        self.assertEqual(len(coded), 27)
+        self.assertEqual(len(ranges), 3)
+        for domain in coded:
+            self.assertEqual(len(domain['values']), 5)
+        for domain in ranges:
+            self.assertIsNotNone(domain['min_value'])
+            self.assertIsNotNone(domain['max_value'])
+    
+    def test_building_a_fields(self):
+        """Test that Building_A is present with the requested field and domain counts"""
+        domains = extract_building_domains_complete.parse_all_domains(self.root, NAMESPACES)
+        building_a = extract_building_domains_complete.find_feature_class(self.root, NAMESPACES, "Building_A")
+        self.assertIsNotNone(building_a)
+        
+        all_fields, fields_with_domains = extract_building_domains_complete.extract_feature_class_fields(
+            building_a, NAMESPACES, domains)
+        self.assertEqual(len(all_fields), 20)
+        self.assertEqual(len(fields_with_domains), 8)
+        self.assertEqual(list(all_fields)[:3], ['OBJECTID', 'Shape', 'GlobalID'])
+    
+    def test_parse_building_a_complete_end_to_end(self):
+        """Test the original file-based entry point against the synthetic export"""
+        all_fields, fields_with_domains = extract_building_domains_complete.parse_building_a_complete(self.xml_file)
+        self.assertEqual(len(all_fields), 20)
+        self.assertEqual(len(fields_with_domains), 8)
+    
+    def test_inline_domains_match_workspace(self):
+        """Test that inline field domains carry the same values as the workspace library"""
+        domains = extract_building_domains_complete.parse_all_domains(self.root, NAMESPACES)
+        building_a = extract_building_domains_complete.find_feature_class(self.root, NAMESPACES, "Building_A")
+        domain_fields = extract_building_domains_columnar.extract_domain_fields(building_a, NAMESPACES)
+        _, fields_with_domains = extract_building_domains_complete.extract_feature_class_fields(
+            building_a, NAMESPACES, domains)
+        
+        for field_name, field_info in domain_fields.items():
+            if field_info['domain_type'] == 'CodedValue':
+                expected = [v['code'] for v in fields_with_domains[field_name]['values']]
+                self.assertEqual([v['code'] for v in field_info['values']], expected)
+    
+    def test_metadata_and_html(self):
+        """Test that metadata extraction and HTML rendering cover every Building_A field"""
+        domains = extract_building_domains_complete.parse_all_domains(self.root, NAMESPACES)
+        building_a = extract_building_domains_complete.find_feature_class(self.root, NAMESPACES, "Building_A")
+        
+        metadata = extract_all_metadata.extract_feature_class_metadata(building_a, NAMESPACES, domains)
+        self.assertEqual(len(metadata), 20)
+        self.assertEqual(sum(1 for m in metadata if m['has_domain'] == 'true'), 8)
+        
+        fields_data = generate_complete_html_manual.extract_html_fields(building_a, NAMESPACES, domains)
+        html = generate_complete_html_manual.build_html_manual(fields_data)
+        for field_name in fields_data:
+            self.assertIn(f'id="{field_name}"', html)
+    
+    def test_deterministic_output(self):
+        """Test that the same seed reproduces the same export"""
+        other = Path(self.tmpdir.name) / "again.xml"
+        generate_synthetic_export(other, feature_classes=3, fields_per_class=20,
+                                  domains=30, values_per_domain=5, domain_fields_per_class=8)
+        self.assertEqual(other.read_bytes(), self.xml_file.read_bytes())
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
\ No newline at end of file
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the record validation engine
+Builds rules from a small synthetic export and validates generated records
+"""
+
+import unittest
+import csv
+import tempfile
+from pathlib import Path
+
+from generate_synthetic_export import generate_synthetic_export, generate_synthetic_records
+from validate_records import load_field_rules, make_checker, validate_records, read_csv_record_chunks
+import gisschema
+
+class TestValidateRecords(unittest.TestCase):
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.xml_file = Path(cls.tmpdir.name) / "DATABASE_EXPORT.XML"
+        generate_synthetic_export(cls.xml_file, feature_classes=1, fields_per_class=30,
+                                  domains=40, values_per_domain=6, domain_fields_per_class=12)
+        cls.rules = load_field_rules(cls.xml_file)
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmpdir.cleanup()
+    
+    def read_report(self, report_file):
+        with open(report_file, newline='', encoding='utf-8') as f:
+            return list(csv.DictReader(f))
+    
+    def test_rules_from_schema(self):
+        """Test that rules carry type, nullability, length and domain constraints"""
+        self.assertNotIn('Shape', self.rules)
+        self.assertFalse(self.rules['OBJECTID']['nullable'])
+        self.assertTrue(any(rule['codes'] for rule in self.rules.values()))
+        self.assertTrue(any(rule['length'] for rule in self.rules.values()))
+    
+    def test_checker_errors(self):
+        """Test each error code on hand-written rules"""
+        base = {'name': 'f', 'nullable': True, 'length': None, 'codes': None, 'min': None, 'max': None}
+        small = make_checker(dict(base, type='esriFieldTypeSmallInteger', min=-1.0, max=100.0))
+        self.assertIsNone(small('-1'))
+        self.assertIsNone(small(''))
+        self.assertEqual(small('101'), 'range')
+        self.assertEqual(small('1.5'), 'type')
+        self.assertEqual(small('40000'), 'type')
+        
+        coded = make_checker(dict(base, type='esriFieldTypeString', nullable=False, length=5, codes=['abw', 'inService']))
+        self.assertIsNone(coded('abw'))
+        self.assertEqual(coded(''), 'null')
+        self.assertEqual(coded('xyz'), 'domain')
+        self.assertEqual(coded('toolong'), 'length')
+        
+        numeric_codes = make_checker(dict(base, type='esriFieldTypeSmallInteger', codes=['1', '2']))
+        self.assertIsNone(numeric_codes(2))
+        self.assertIsNone(numeric_codes('02'))
+        self.assertEqual(numeric_codes('3'), 'domain')
+        
+        date = make_checker(dict(base, type='esriFieldTypeDate'))
+        self.assertIsNone(date('2024-05-01T10:00:00'))
+        self.assertEqual(date('05/01/2024'), 'type')
+    
+    def test_csv_report_matches_injected_errors(self):
+        """Test that every injected invalid row is reported, serially and on a process pool"""
+        records = Path(self.tmpdir.name) / "records.csv"
+        invalid = generate_synthetic_records(self.rules, records, rows=3000, error_rate=0.05)
+        reports = []
+        for jobs in (1, 2):
+            report_file = Path(self.tmpdir.name) / f"errors_{jobs}.csv"
+            summary = validate_records(records, self.rules, report_file, jobs=jobs, chunk_size=500)
+            self.assertEqual(summary['rows'], 3000)
+            self.assertEqual(summary['invalid_rows'], invalid)
+            reports.append(report_file.read_bytes())
+        self.assertEqual(reports[0], reports[1])
+    
+    def test_ndjson_missing_required_key(self):
+        """Test NDJSON typed values and that an absent non-nullable field is a null error"""
+        records = Path(self.tmpdir.name) / "records.ndjson"
+        records.write_text('{"OBJECTID": 1, "GlobalID": "{6F9619FF-8B86-D011-B42D-00C04FC964FF}"}\n'
+                           '{"OBJECTID": 2}\n'
+                           'not json\n', encoding='utf-8')
+        report_file = Path(self.tmpdir.name) / "errors_ndjson.csv"
+        summary = validate_records(records, self.rules, report_file)
+        self.assertEqual(summary['rows'], 3)
+        rows = self.read_report(report_file)
+        self.assertEqual([(r['row'], r['errors']) for r in rows], [('2', 'GlobalID:null'), ('3', '*:parse')])
+    
+    def test_quoted_line_breaks_stay_in_one_record(self):
+        """Test that chunking never splits a quoted multi-line CSV value"""
+        lines = ['a,b\n', '"one\n', 'two",x\n', '3,"say ""hi"""\n']
+        chunks = list(read_csv_record_chunks(iter(lines), 2))
+        self.assertEqual(chunks, [(2, lines[:3]), (1, lines[3:])])
+    
+    def test_cli_exit_status(self):
+        """Test that gisschema validate exits non-zero when invalid rows are found"""
+        records = Path(self.tmpdir.name) / "cli_records.csv"
+        generate_synthetic_records(self.rules, records, rows=200, error_rate=0.0)
+        report_file = Path(self.tmpdir.name) / "cli_errors.csv"
+        args = ['validate', '--input', str(self.xml_file), '--records', str(records), '--report', str(report_file)]
+        self.assertEqual(gisschema.main(args), 0)
+        generate_synthetic_records(self.rules, records, rows=200, error_rate=0.5)
+        self.assertEqual(gisschema.main(args), 1)
+        self.assertGreater(len(self.read_report(report_file)), 0)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
\ No newline at end of file
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the vectorized numeric column checks
+Skipped when NumPy is not installed
+"""
+
+import unittest
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from validate_records import make_checker
+from vectorized_checks import check_numeric_column, valid_mask, check_numeric_columns, summarize_masks
+
+def make_rule(field_type, **overrides):
+    rule = {'name': 'f', 'type': field_type, 'nullable': True, 'length': None,
+            'precision': 0, 'scale': 0, 'codes': None, 'min': None, 'max': None}
+    rule.update(overrides)
+    return rule
+
+@unittest.skipUnless(np is not None, "NumPy is not installed")
+class TestVectorizedChecks(unittest.TestCase):
+    
+    def test_range_domain_bounds(self):
+        """Test min/max bounds of a range domain such as -1 to 100"""
+        rule = make_rule('esriFieldTypeSmallInteger', min=-1.0, max=100.0)
+        masks = check_numeric_column(np.array([-2, -1, 50, 100, 101]), rule)
+        self.assertEqual(masks['range'].tolist(), [True, False, False, False, True])
+        self.assertFalse(masks['type'].any())
+    
+    def test_integer_type_and_limits(self):
+        """Test that fractional and out-of-limit values fail integer field types"""
+        masks = check_numeric_column(np.array([1.0, 1.5, 40000.0, -32768.0]), make_rule('esriFieldTypeSmallInteger'))
+        self.assertEqual(masks['type'].tolist(), [False, True, True, False])
+        masks = check_numeric_column(np.array([1.5, 40000.0]), make_rule('esriFieldTypeDouble'))
+        self.assertFalse(masks['type'].any())
+    
+    def test_null_handling(self):
+        """Test NaN, masked and empty-text nulls against nullable and non-nullable fields"""
+        column = np.array([1.0, np.nan, 3.0])
+        self.assertTrue(valid_mask(column, make_rule('esriFieldTypeDouble')).all())
+        masks = check_numeric_column(column, make_rule('esriFieldTypeDouble', nullable=False))
+        self.assertEqual(masks['null'].tolist(), [False, True, False])
+        
+        masked = np.ma.array([1, 2, 3], mask=[False, True, False])
+        self.assertEqual(check_numeric_column(masked, make_rule('esriFieldTypeInteger', nullable=False))['null'].tolist(),
+                         [False, True, False])
+        
+        text = np.array(['5', '', 'abc', '7.25'])
+        masks = check_numeric_column(text, make_rule('esriFieldTypeInteger'))
+        self.assertEqual(masks['type'].tolist(), [False, False, True, True])
+    
+    def test_precision_scale_and_codes(self):
+        """Test Precision/Scale digits and numeric coded value domains"""
+        masks = check_numeric_column(np.array([12.34, 123.4, 1.234]), make_rule('esriFieldTypeDouble', precision=4, scale=2))
+        self.assertEqual(masks['precision'].tolist(), [False, True, True])
+        masks = check_numeric_column(np.array([1, 2, 9]), make_rule('esriFieldTypeSmallInteger', codes=['1', '2']))
+        self.assertEqual(masks['domain'].tolist(), [False, False, True])
+    
+    def test_matches_scalar_checker(self):
+        """Test that the vectorized result agrees with the per-value checker"""
+        rule = make_rule('esriFieldTypeSmallInteger', min=-1.0, max=100.0, codes=None)
+        values = np.random.default_rng(0).integers(-10, 120, 2000)
+        check = make_checker(rule)
+        expected = [check(str(value)) is None for value in values]
+        self.assertEqual(valid_mask(values, rule).tolist(), expected)
+        
+        text = np.array(['5', '', ' 7 ', 'nan', 'NaN', 'inf', '-Infinity', '1e3', '1.0', '2.5', 'abc', '+3',
+                         '99999999999999999999', '1e400', 'None'])
+        rules = [make_rule('esriFieldTypeSmallInteger'), make_rule('esriFieldTypeInteger', nullable=False),
+                 make_rule('esriFieldTypeOID', codes=[5, 7, 'x', None, 2.5]),
+                 make_rule('esriFieldTypeDouble'), make_rule('esriFieldTypeDouble', nullable=False, min=0.0),
+                 make_rule('esriFieldTypeSingle', codes=['2.5', 5, 'abc', None, 'nan'])]
+        for rule in rules:
+            check = make_checker(rule)
+            for column in (text, text[:3]):
+                self.assertEqual(valid_mask(column, rule).tolist(), [check(value) is None for value in column],
+                                 (rule, column))
+    
+    def test_multiple_columns_summary(self):
+        """Test that only numeric fields with rules are checked and counted"""
+        rules = {'a': make_rule('esriFieldTypeInteger', max=10.0), 'b': make_rule('esriFieldTypeString')}
+        masks = check_numeric_columns({'a': np.array([5, 11, 12]), 'b': np.array(['x']), 'c': np.array([1])}, rules)
+        self.assertEqual(list(masks), ['a'])
+        self.assertEqual(summarize_masks(masks), {'a': {'range': 2}})
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
\ No newline at end of file
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Unit tests for watch mode
+Drops modified copies of a small synthetic export in place and checks which outputs are rewritten
+"""
+
+import unittest
+import gzip
+import os
+import tempfile
+from pathlib import Path
+
+from generate_synthetic_export import generate_synthetic_export
+from extraction_pipeline import run_pipeline
+from watch_extract import ExportWatcher
+from schema_service import file_signature
+import gisschema
+
+OUTPUTS = ['detailed', 'json']
+
+class TestWatchExtract(unittest.TestCase):
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.dir = Path(cls.tmpdir.name)
+        source = cls.dir / "source.xml"
+        generate_synthetic_export(source, feature_classes=4, fields_per_class=12, domains=20,
+                                  values_per_domain=5, domain_fields_per_class=6, seed=11)
+        cls.data = source.read_bytes()
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmpdir.cleanup()
+    
+    def setUp(self):
+        self.work = Path(tempfile.mkdtemp(dir=self.dir))
+        self.xml_file = self.work / "DATABASE_EXPORT.XML"
+        self.output_dir = self.work / "out"
+        self.mtime = 1_700_000_000 * 10**9
+    
+    def drop(self, data, path=None):
+        """Write a new export in place with a distinct mtime, as a copy into the shared folder would"""
+        path = path or self.xml_file
+        path.write_bytes(data)
+        self.mtime += 10**9
+        os.utime(path, ns=(self.mtime, self.mtime))
+    
+    def settle(self, watcher):
+        """Poll until the change has held for one interval"""
+        self.assertIsNone(watcher.poll())
+        return watcher.poll()
+    
+    def expected_files(self, data, name):
+        xml_file = self.work / name
+        xml_file.write_bytes(data)
+        output_dir = self.work / f"expected_{name}"
+        run_pipeline(xml_file, None, output_dir, OUTPUTS)
+        return {path.name: path.read_bytes() for path in output_dir.iterdir()}
+    
+    def files(self):
+        return {path.name: path.read_bytes() for path in self.output_dir.iterdir()}
+    
+    def test_rewrites_only_changed_classes(self):
+        """Test that editing one class's alias and one domain rewrites just the classes they feed"""
+        self.drop(self.data)
+        watcher = ExportWatcher(self.xml_file, None, self.output_dir, OUTPUTS)
+        first = watcher.update()
+        class_names = list(watcher.classes)
+        self.assertEqual(first['changed'], class_names)
+        self.assertEqual(self.files(), self.expected_files(self.data, "first.xml"))
+        
+        self.assertIsNone(watcher.poll())
+        self.drop(self.data)
+        self.assertIsNone(self.settle(watcher), "identical content must not trigger a rewrite")
+        
+        start = self.data.index(b'<Name>' + class_names[2].encode())
+        alias = self.data.index(b'<AliasName>', start)
+        changed = self.data[:alias + 11] + b'Renamed ' + self.data[alias + 11:]
+        model = watcher.classes[class_names[2]]['model']
+        self.drop(changed)
+        summary = self.settle(watcher)
+        self.assertEqual(summary['changed'], [class_names[2]])
+        self.assertEqual(summary['unchanged'], len(class_names) - 1)
+        self.assertIsNot(watcher.classes[class_names[2]]['model'], model)
+        self.assertEqual(self.files(), self.expected_files(changed, "second.xml"))
+        
+        domain = next(iter(watcher.classes[class_names[0]]['domains']))
+        users = [name for name, entry in watcher.classes.items() if domain in entry['domains']]
+        position = changed.index(b'<DomainName>' + domain.encode() + b'</DomainName>')
+        value = changed.index(b'<Name>', position) + 6
+        changed = changed[:value] + b'Edited ' + changed[value:]
+        self.drop(changed)
+        summary = self.settle(watcher)
+        self.assertEqual(summary['changed'], users)
+        self.assertEqual(summary['generation'], 3)
+        self.assertEqual(self.files(), self.expected_files(changed, "third.xml"))
+    
+    def test_partial_writes_and_removed_classes(self):
+        """Test that a truncated export keeps the last outputs and a dropped class loses its files"""
+        self.drop(self.data)
+        watcher = ExportWatcher(self.xml_file, None, self.output_dir, ['json'])
+        watcher.update()
+        before = self.files()
+        
+        self.drop(self.data[:len(self.data) // 2])
+        summary = self.settle(watcher)
+        self.assertEqual(summary['status'], 'failed')
+        self.assertIsNone(watcher.poll())
+        self.assertEqual(self.files(), before)
+        
+        last = list(watcher.classes)[-1]
+        start = self.data.rindex(b'<DataElement', 0, self.data.index(b'<Name>' + last.encode()))
+        end = self.data.index(b'</DataElement>', start) + len(b'</DataElement>')
+        self.drop(self.data[:start] + self.data[end:])
+        summary = self.settle(watcher)
+        self.assertEqual(summary['removed'], [last])
+        self.assertEqual(summary['changed'], [])
+        self.assertFalse(any(name.startswith(last.lower()) for name in self.files()))
+    
+    def test_missing_export(self):
+        """Test that a missing or vanished export is reported as a failed update, not raised"""
+        watcher = ExportWatcher(self.xml_file, None, self.output_dir, ['json'])
+        summary = watcher.update()
+        self.assertEqual(summary['status'], 'failed')
+        self.assertIn('FileNotFoundError', summary['error'])
+        self.assertEqual(gisschema.main(['watch', '--input', str(self.xml_file)]), 1)
+        
+        self.drop(self.data)
+        self.assertEqual(self.settle(watcher)['status'], 'updated')
+        signature = file_signature(self.xml_file)
+        self.xml_file.unlink()
+        self.assertEqual(watcher.update(signature)['status'], 'failed')
+        self.assertIsNone(watcher.poll())
+    
+    def test_compressed_export_and_requested_classes(self):
+        """Test the full-parse path used for compressed exports"""
+        gz_file = self.work / "DATABASE_EXPORT.XML.gz"
+        self.drop(gzip.compress(self.data), gz_file)
+        watcher = ExportWatcher(gz_file, ['Building_A', 'Missing_Class'], self.output_dir, ['json'])
+        summary = watcher.update()
+        self.assertEqual(summary['changed'], ['Building_A'])
+        self.assertEqual(summary['missing'], ['Missing_Class'])
+        self.drop(gzip.compress(self.data, mtime=1), gz_file)
+        summary = self.settle(watcher)
+        self.assertEqual((summary['changed'], summary['unchanged']), ([], 1))
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the streamed Excel data-entry template
+Writes workbooks from a small synthetic export and reads the sheet XML back with zipfile
+"""
+
+import unittest
+import tempfile
+import zipfile
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from generate_synthetic_export import generate_synthetic_export
+from extraction_pipeline import load_schema, run_pipeline
+from xlsx_template import column_letter, iter_class_models, sheet_name, template_fields, write_template
+import gisschema
+
+MAIN = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+RELATIONSHIP = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id'
+
+def read_workbook(path):
+    """Sheet name -> (state, worksheet root) for every sheet of an .xlsx file"""
+    with zipfile.ZipFile(path) as zf:
+        targets = {rel.get('Id'): 'xl/' + rel.get('Target')
+                   for rel in ET.fromstring(zf.read('xl/_rels/workbook.xml.rels'))}
+        sheets = {}
+        for sheet in ET.fromstring(zf.read('xl/workbook.xml')).iter(MAIN + 'sheet'):
+            sheets[sheet.get('name')] = (sheet.get('state'), ET.fromstring(zf.read(targets[sheet.get(RELATIONSHIP)])))
+        return zf.namelist(), sheets
+
+def cell_values(worksheet):
+    """Cell reference -> value, numbers as int/float and inline strings as text"""
+    values = {}
+    for cell in worksheet.iter(MAIN + 'c'):
+        if cell.get('t') == 'inlineStr':
+            values[cell.get('r')] = cell.find(f'{MAIN}is/{MAIN}t').text or ''
+        else:
+            text = cell.find(MAIN + 'v').text
+            values[cell.get('r')] = float(text) if '.' in text else int(text)
+    return values
+
+class TestXlsxTemplate(unittest.TestCase):
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.xml_file = Path(cls.tmpdir.name) / "DATABASE_EXPORT.XML"
+        generate_synthetic_export(cls.xml_file, feature_classes=3, fields_per_class=20, domains=20,
+                                  values_per_domain=6, domain_fields_per_class=10, seed=5)
+        cls.schema = load_schema(cls.xml_file, None)
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmpdir.cleanup()
+    
+    def test_dropdowns_reference_hidden_lists(self):
+        """Test that every coded value field validates against exactly its domain's codes on the hidden sheet"""
+        output = Path(self.tmpdir.name) / "template.xlsx"
+        summaries = write_template(iter_class_models(self.xml_file, None), output)
+        self.assertEqual([summary['class'] for summary in summaries], list(self.schema['classes']))
+        
+        names, sheets = read_workbook(output)
+        self.assertEqual(names[0], '[Content_Types].xml')
+        self.assertEqual(list(sheets), list(self.schema['classes']) + ['Lists'])
+        self.assertEqual(sheets['Lists'][0], 'hidden')
+        self.assertIsNone(sheets['Building_A'][0])
+        lists = cell_values(sheets['Lists'][1])
+        
+        for class_name, class_model in self.schema['classes'].items():
+            worksheet = sheets[class_name][1]
+            fields = template_fields(class_model)
+            header = cell_values(worksheet)
+            self.assertEqual([header[f"{column_letter(i)}1"] for i in range(1, len(fields) + 1)],
+                             [info['name'] for info in fields])
+            validations = {v.get('sqref').split(':')[0][:-1]: v for v in worksheet.iter(MAIN + 'dataValidation')}
+            coded = 0
+            for index, info in enumerate(fields, 1):
+                domain = class_model['fields_with_domains'].get(info['name'])
+                validation = validations.get(column_letter(index))
+                if domain is None:
+                    self.assertIsNone(validation)
+                    continue
+                self.assertEqual(validation.get('sqref'), f"{column_letter(index)}2:{column_letter(index)}1048576")
+                if domain['domain_type'] != 'CodedValue':
+                    self.assertIn(validation.get('type'), ('whole', 'decimal'))
+                    continue
+                coded += 1
+                self.assertEqual(validation.get('type'), 'list')
+                first, last = validation.find(MAIN + 'formula1').text.replace('$', '').split('!')[1].split(':')
+                rows = range(int(first[1:]), int(last[1:]) + 1)
+                self.assertEqual(first[0], 'B')
+                self.assertEqual({lists[f"A{r}"] for r in rows}, {domain['domain_name']})
+                self.assertEqual([lists[f"B{r}"] for r in rows], [value['code'] for value in domain['values']])
+            self.assertGreater(coded, 0)
+        
+        # Numeric codes are numeric cells, so typed entries match the dropdown
+        self.assertTrue(any(isinstance(value, int) for ref, value in lists.items() if ref.startswith('B')))
+        domains_listed = [lists[ref] for ref in sorted(lists, key=lambda ref: int(ref[1:])) if ref[0] == 'A'][1:]
+        self.assertEqual(len(domains_listed), sum(len(self.schema['domains'][name]['values'])
+                                                  for name in dict.fromkeys(domains_listed)))
+    
+    def test_streamed_models_match_full_parse(self):
+        """Test that walking the export class by class yields the same models as one full parse"""
+        self.assertEqual(list(iter_class_models(self.xml_file, None)), list(self.schema['classes'].items()))
+        self.assertEqual(list(iter_class_models(self.xml_file, ['Building_A'])),
+                         [('Building_A', self.schema['classes']['Building_A'])])
+    
+    def test_dropdown_modes(self):
+        """Test that name and display dropdowns point at the matching Lists column"""
+        for dropdown, column in (('name', 'C'), ('display', 'D')):
+            output = Path(self.tmpdir.name) / f"{dropdown}.xlsx"
+            write_template([('Building_A', self.schema['classes']['Building_A'])], output, dropdown)
+            sheets = read_workbook(output)[1]
+            formulas = [v.find(MAIN + 'formula1').text for v in sheets['Building_A'][1].iter(MAIN + 'dataValidation')
+                        if v.get('type') == 'list']
+            self.assertTrue(formulas)
+            self.assertTrue(all(formula.startswith(f"Lists!${column}$") for formula in formulas))
+            lists = cell_values(sheets['Lists'][1])
+            self.assertEqual(lists['D2'], f"{lists['C2']} ({lists['B2']})")
+        with self.assertRaises(ValueError):
+            write_template([], Path(self.tmpdir.name) / "bad.xlsx", 'label')
+    
+    def test_sheet_names(self):
+        """Test that class names become unique, legal sheet names"""
+        used = {'lists'}
+        self.assertEqual(sheet_name('Lists', used), 'Lists~2')
+        self.assertEqual(sheet_name('A/B:C', used), 'A_B_C')
+        long_name = 'Very_Long_Feature_Class_Name_Beyond_Limit'
+        self.assertEqual(sheet_name(long_name, used), long_name[:31])
+        self.assertEqual(sheet_name(long_name, used), long_name[:29] + '~2')
+        self.assertEqual([column_letter(i) for i in (1, 26, 27, 703)], ['A', 'Z', 'AA', 'AAA'])
+    
+    def test_pipeline_output_and_cli(self):
+        """Test the xlsx writer in the pipeline and the template subcommand"""
+        output_dir = Path(self.tmpdir.name) / "out"
+        schema, written = run_pipeline(self.xml_file, ['Building_A'], output_dir, ['xlsx'])
+        self.assertEqual([path.name for path in written], ['building_a_template.xlsx'])
+        self.assertEqual(list(read_workbook(written[0])[1]), ['Building_A', 'Lists'])
+        
+        output = Path(self.tmpdir.name) / "cli.xlsx"
+        status = gisschema.main(['template', '--input', str(self.xml_file), '--classes', 'Building_A,Nope_X',
+                                 '--output', str(output)])
+        self.assertEqual(status, 1)
+        self.assertEqual(list(read_workbook(output)[1]), ['Building_A', 'Lists'])
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
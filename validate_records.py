@@ -0,0 +1,438 @@
+"""
+Record validation engine for field-collected feature class data
+Compiles per-field rules (type, Length, IsNullable, coded value and range domains)
+from the extracted schema model and streams CSV or NDJSON records through them
+on a process pool, writing a compact report with one line per invalid row
+"""
+
+import csv
+import importlib.util
+import json
+import math
+import re
+import time
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from extraction_pipeline import load_schema
+from coded_values import code_text
+
+# Error codes written to the report as field:code
+NULL_ERROR = 'null'
+TYPE_ERROR = 'type'
+LENGTH_ERROR = 'length'
+DOMAIN_ERROR = 'domain'
+RANGE_ERROR = 'range'
+PARSE_ERROR = 'parse'
+
+INTEGER_LIMITS = {
+    'esriFieldTypeSmallInteger': (-32768, 32767),
+    'esriFieldTypeInteger': (-2147483648, 2147483647),
+    'esriFieldTypeOID': (-2147483648, 2147483647),
+}
+REAL_TYPES = ('esriFieldTypeDouble', 'esriFieldTypeSingle')
+GUID_TYPES = ('esriFieldTypeGUID', 'esriFieldTypeGlobalID')
+# Not representable in a flat record file
+SKIPPED_TYPES = ('esriFieldTypeGeometry', 'esriFieldTypeBlob', 'esriFieldTypeRaster')
+
+GUID_PATTERN = re.compile(r'^\{?[0-9A-Fa-f]{8}-[0-9A-Fa-f]{4}-[0-9A-Fa-f]{4}-[0-9A-Fa-f]{4}-[0-9A-Fa-f]{12}\}?$')
+
+def compile_field_rules(class_model):
+    """Build plain, picklable validation rules for every field of a feature class"""
+    rules = OrderedDict()
+    for metadata in class_model['metadata']:
+        field_type = metadata['type']
+        if field_type in SKIPPED_TYPES:
+            continue
+        domain = class_model['fields_with_domains'].get(metadata['name'])
+        rule = {
+            'name': metadata['name'],
+            'type': field_type,
+            'nullable': metadata['is_nullable'] != 'false',
+            'length': int(metadata['length']) if field_type == 'esriFieldTypeString' and metadata['length'] else None,
+            'precision': int(metadata['precision'] or 0),
+            'scale': int(metadata['scale'] or 0),
+            'codes': None,
+            'min': None,
+            'max': None
+        }
+        if domain is not None and domain['domain_type'] == 'CodedValue':
+            rule['codes'] = [value['code'] for value in domain['values']]
+        elif domain is not None:
+            if domain['min_value'] not in (None, ''):
+                rule['min'] = float(domain['min_value'])
+            if domain['max_value'] not in (None, ''):
+                rule['max'] = float(domain['max_value'])
+        rules[metadata['name']] = rule
+    return rules
+
+def load_field_rules(xml_file, class_name="Building_A"):
+    """Parse the export and compile the validation rules for one feature class"""
+    schema = load_schema(xml_file, [class_name])
+    if class_name not in schema['classes']:
+        raise KeyError(f"Feature class {class_name} not found in {xml_file}")
+    return compile_field_rules(schema['classes'][class_name])
+
+def comparable_codes(rule):
+    """A rule's codes as checked values compare: ints for integer fields, floats for real fields, text otherwise
+
+    Codes that cannot take the field's type are dropped, since no valid value can equal them.
+    """
+    field_type = rule['type']
+    if field_type not in INTEGER_LIMITS and field_type not in REAL_TYPES:
+        return frozenset(code_text(code) for code in rule['codes'])
+    codes = set()
+    for code in rule['codes']:
+        try:
+            if field_type in REAL_TYPES:
+                if math.isfinite(float(code)):
+                    codes.add(float(code))
+            elif not isinstance(code, float):
+                codes.add(int(code))
+            elif code.is_integer():
+                codes.add(int(code))
+        except (TypeError, ValueError):
+            pass
+    return frozenset(codes)
+
+def to_text(value, integer=False):
+    """Normalise a typed NDJSON value to the text form used in CSV records"""
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, float) and integer and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+def make_checker(rule):
+    """Return a function value -> error code (or None) for one field rule"""
+    field_type = rule['type']
+    nullable = rule['nullable']
+    length = rule['length']
+    codes = comparable_codes(rule) if rule['codes'] is not None else None
+    low, high = rule['min'], rule['max']
+    has_range = low is not None or high is not None
+    integer_limits = INTEGER_LIMITS.get(field_type)
+    is_real = field_type in REAL_TYPES
+    
+    def check(value):
+        if value is None or value == '':
+            return None if nullable else NULL_ERROR
+        if not isinstance(value, str):
+            value = to_text(value, integer_limits is not None)
+        
+        number = None
+        code = value
+        if integer_limits is not None:
+            try:
+                number = int(value)
+            except ValueError:
+                return TYPE_ERROR
+            if number < integer_limits[0] or number > integer_limits[1]:
+                return TYPE_ERROR
+            code = number
+        elif is_real:
+            try:
+                number = float(value)
+            except ValueError:
+                return TYPE_ERROR
+            if not math.isfinite(number):
+                return TYPE_ERROR
+            code = number
+        elif field_type == 'esriFieldTypeDate':
+            try:
+                datetime.fromisoformat(value[:-1] if value.endswith('Z') else value)
+            except ValueError:
+                return TYPE_ERROR
+        elif field_type in GUID_TYPES:
+            if not GUID_PATTERN.match(value):
+                return TYPE_ERROR
+        elif length and len(value) > length:
+            return LENGTH_ERROR
+        
+        if codes is not None and code not in codes:
+            return DOMAIN_ERROR
+        if has_range:
+            if number is None:
+                try:
+                    number = float(value)
+                except ValueError:
+                    return TYPE_ERROR
+            if (low is not None and number < low) or (high is not None and number > high):
+                return RANGE_ERROR
+        return None
+    
+    return check
+
+def resolve_columns(columns, rules):
+    """Map input column names to field names: exact match first, then case-insensitive"""
+    by_lower = {name.lower(): name for name in rules}
+    resolved = []
+    for column in columns:
+        column = column.strip()
+        resolved.append(column if column in rules else by_lower.get(column.lower()))
+    return resolved
+
+def load_validator_module(module_path):
+    """Import a generated validator module (see generate_validator_module) from its file path"""
+    module_path = Path(module_path)
+    spec = importlib.util.spec_from_file_location(module_path.stem, module_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+# Per-process state set up once by init_worker so rules are not re-sent with every chunk
+_WORKER = {}
+
+def init_worker(rules, resolved_columns=None, validator_path=None):
+    validator = load_validator_module(validator_path) if validator_path else None
+    _WORKER['validator'] = validator
+    if validator is not None and resolved_columns is not None:
+        positions = [resolved_columns.index(field) for field in validator.FIELDS]
+        # Files already in schema field order are passed through without reordering
+        _WORKER['positions'] = None if positions == list(range(len(positions))) else positions
+        _WORKER['width'] = max(positions, default=-1) + 1
+    checkers = {name: make_checker(rule) for name, rule in rules.items()}
+    _WORKER['rules'] = rules
+    _WORKER['checkers'] = checkers
+    _WORKER['plan'] = [(index, field, checkers[field])
+                       for index, field in enumerate(resolved_columns or []) if field is not None]
+    _WORKER['key_cache'] = {}
+    _WORKER['required'] = [name for name, rule in rules.items() if not rule['nullable']]
+
+def validate_csv_chunk(start_row, lines):
+    """Validate raw CSV record lines; return (failures, error counts) with failures as (row, [(field, code)])"""
+    if _WORKER['validator'] is not None:
+        return validate_csv_chunk_compiled(start_row, lines)
+    plan = _WORKER['plan']
+    failures = []
+    counts = Counter()
+    for row_number, row in enumerate(csv.reader(lines), start_row):
+        errors = None
+        width = len(row)
+        for index, field, check in plan:
+            error = check(row[index] if index < width else '')
+            if error is not None:
+                if errors is None:
+                    errors = []
+                errors.append((field, error))
+                counts[(field, error)] += 1
+        if errors is not None:
+            failures.append((row_number, errors))
+    return failures, counts
+
+def validate_csv_chunk_compiled(start_row, lines):
+    """validate_csv_chunk through a generated per-class validate_row function"""
+    validate_row = _WORKER['validator'].validate_row
+    positions = _WORKER['positions']
+    width = _WORKER['width']
+    failures = []
+    counts = Counter()
+    for row_number, row in enumerate(csv.reader(lines), start_row):
+        if len(row) < width:
+            row += [''] * (width - len(row))
+        errors = validate_row(row if positions is None else [row[position] for position in positions])
+        if errors:
+            failures.append((row_number, errors))
+            counts.update(errors)
+    return failures, counts
+
+def validate_ndjson_chunk(start_row, lines):
+    """Validate raw NDJSON lines; keys are resolved to fields like CSV headers
+
+    Each record describes itself, so a missing key for a non-nullable field is a null error.
+    """
+    checkers = _WORKER['checkers']
+    key_cache = _WORKER['key_cache']
+    required = _WORKER['required']
+    validator = _WORKER['validator']
+    failures = []
+    counts = Counter()
+    for row_number, line in enumerate(lines, start_row):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        if not isinstance(record, dict):
+            failures.append((row_number, [('*', PARSE_ERROR)]))
+            counts[('*', PARSE_ERROR)] += 1
+            continue
+        
+        if validator is not None:
+            canonical = {}
+            for key, value in record.items():
+                field = key_cache.get(key, False)
+                if field is False:
+                    field = key_cache[key] = resolve_columns([key], _WORKER['rules'])[0]
+                if field is not None:
+                    canonical[field] = value
+            errors = validator.validate_record(canonical)
+            if errors:
+                failures.append((row_number, errors))
+                counts.update(errors)
+            continue
+        
+        errors = None
+        seen = set()
+        for key, value in record.items():
+            field = key_cache.get(key, False)
+            if field is False:
+                field = key_cache[key] = resolve_columns([key], _WORKER['rules'])[0]
+            if field is None:
+                continue
+            seen.add(field)
+            error = checkers[field](value)
+            if error is not None:
+                if errors is None:
+                    errors = []
+                errors.append((field, error))
+                counts[(field, error)] += 1
+        for field in required:
+            if field not in seen:
+                if errors is None:
+                    errors = []
+                errors.append((field, NULL_ERROR))
+                counts[(field, NULL_ERROR)] += 1
+        if errors is not None:
+            failures.append((row_number, errors))
+    return failures, counts
+
+def detect_format(records_file):
+    return 'ndjson' if Path(records_file).suffix.lower() in ('.ndjson', '.jsonl') else 'csv'
+
+def read_line_chunks(handle, chunk_size):
+    """Yield (record count, lines) for NDJSON, one record per line"""
+    chunk = []
+    for line in handle:
+        chunk.append(line)
+        if len(chunk) >= chunk_size:
+            yield len(chunk), chunk
+            chunk = []
+    if chunk:
+        yield len(chunk), chunk
+
+def read_csv_record_chunks(handle, chunk_size):
+    """Yield (record count, lines) with whole CSV records, keeping quoted line breaks together
+
+    Workers parse the raw lines themselves, so the reading process only splits the
+    file and ships plain strings. A record continues onto the next line while it
+    has an odd number of quote characters, since embedded quotes are doubled.
+    """
+    chunk = []
+    records = 0
+    open_quotes = False
+    for line in handle:
+        chunk.append(line)
+        if line.count('"') % 2:
+            open_quotes = not open_quotes
+        if not open_quotes:
+            records += 1
+            if records >= chunk_size:
+                yield records, chunk
+                chunk = []
+                records = 0
+    if chunk:
+        yield records + (1 if open_quotes else 0), chunk
+
+def run_chunks(func, chunks, init_args, jobs, max_pending=None):
+    """Yield the result for every (record count, payload) chunk in order, on a process pool when jobs > 1"""
+    if jobs <= 1:
+        init_worker(*init_args)
+        start_row = 1
+        for count, chunk in chunks:
+            yield func(start_row, chunk)
+            start_row += count
+        return
+    
+    max_pending = max_pending or jobs * 2
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker, initargs=init_args) as executor:
+        start_row = 1
+        for count, chunk in chunks:
+            # Bounded read-ahead keeps memory flat however large the input is
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+            pending.append(executor.submit(func, start_row, chunk))
+            start_row += count
+        while pending:
+            yield pending.popleft().result()
+
+def validate_records(records_file, rules, report_file, records_format=None, jobs=1, chunk_size=20000,
+                     validator_path=None):
+    """Validate a CSV or NDJSON record file and write the per-row error report
+
+    The report is a CSV with one line per invalid row: the 1-based record number
+    and its errors as field:code pairs joined by ';'. Returns a summary dict.
+    With validator_path, rows go through a generated validator module instead of
+    the generic checkers; CSV files missing some schema fields fall back to the
+    generic checkers, which skip absent columns instead of reporting them as null.
+    """
+    records_format = records_format or detect_format(records_file)
+    start = time.perf_counter()
+    totals = Counter()
+    summary = {
+        'records': str(records_file),
+        'format': records_format,
+        'rows': 0,
+        'invalid_rows': 0,
+        'unknown_columns': [],
+        'missing_columns': [],
+        'compiled': bool(validator_path)
+    }
+    
+    with open(records_file, newline='' if records_format == 'csv' else None, encoding='utf-8-sig') as handle, \
+            open(report_file, 'w', newline='', encoding='utf-8') as report:
+        if records_format == 'csv':
+            header_lines = next(read_csv_record_chunks(handle, 1), (0, []))[1]
+            header = next(csv.reader(header_lines), [])
+            resolved = resolve_columns(header, rules)
+            summary['unknown_columns'] = [column for column, field in zip(header, resolved) if field is None]
+            summary['missing_columns'] = [name for name in rules if name not in resolved]
+            if summary['missing_columns']:
+                summary['compiled'] = False
+            init_args = (rules, resolved, validator_path if summary['compiled'] else None)
+            func, chunks = validate_csv_chunk, read_csv_record_chunks(handle, chunk_size)
+        else:
+            init_args = (rules, None, validator_path)
+            func, chunks = validate_ndjson_chunk, read_line_chunks(handle, chunk_size)
+        
+        writer = csv.writer(report)
+        writer.writerow(['row', 'errors'])
+        
+        def counted(chunks):
+            for count, chunk in chunks:
+                summary['rows'] += count
+                yield count, chunk
+        
+        for failures, counts in run_chunks(func, counted(chunks), init_args, jobs):
+            totals.update(counts)
+            summary['invalid_rows'] += len(failures)
+            writer.writerows((row_number, ';'.join(f"{field}:{error}" for field, error in errors))
+                             for row_number, errors in failures)
+    
+    elapsed = time.perf_counter() - start
+    by_field = OrderedDict()
+    for (field, error), count in sorted(totals.items()):
+        by_field.setdefault(field, OrderedDict())[error] = count
+    summary['errors'] = sum(totals.values())
+    summary['by_field'] = by_field
+    summary['elapsed_s'] = round(elapsed, 3)
+    summary['rows_per_s'] = round(summary['rows'] / elapsed) if elapsed > 0 else None
+    return summary
+
+def print_validation_summary(summary, limit=15):
+    print(f"Validated {summary['rows']:,} {summary['format']} records in {summary['elapsed_s']:.2f}s "
+          f"({summary['rows_per_s'] or 0:,} rows/s)")
+    print(f"  Invalid rows: {summary['invalid_rows']:,} ({summary['errors']:,} errors)")
+    if summary['unknown_columns']:
+        print(f"  Columns not in schema (ignored): {', '.join(summary['unknown_columns'])}")
+    if summary['missing_columns']:
+        print(f"  Schema fields not in file: {len(summary['missing_columns'])}")
+    
+    ranked = sorted(((count, field, error) for field, errors in summary['by_field'].items()
+                     for error, count in errors.items()), reverse=True)
+    for count, field, error in ranked[:limit]:
+        print(f"    {field:<40} {error:<8} {count:,}")
\ No newline at end of file
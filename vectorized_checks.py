@@ -0,0 +1,146 @@
+"""
+Vectorized checks for numeric fields and range domains
+Takes whole columns as NumPy arrays and returns boolean masks for null handling,
+integer-ness and integer limits, Precision/Scale and range domain bounds, using
+the field rules compiled by validate_records. Requires NumPy.
+"""
+
+from collections import OrderedDict
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from validate_records import (INTEGER_LIMITS, REAL_TYPES, NULL_ERROR, TYPE_ERROR, DOMAIN_ERROR, RANGE_ERROR,
+                              comparable_codes, to_text)
+
+PRECISION_ERROR = 'precision'
+NUMERIC_TYPES = tuple(INTEGER_LIMITS) + REAL_TYPES
+
+def require_numpy():
+    if np is None:
+        raise ImportError("vectorized checks require NumPy (pip install numpy)")
+
+def is_numeric_rule(rule):
+    return rule['type'] in NUMERIC_TYPES
+
+def parse_numeric_column(column, integer=False):
+    """Convert a column to (float64 values, null mask, unparseable mask)
+
+    Numeric arrays are used as they are, with NaN as null. Masked arrays use their
+    mask as null. Text columns ('' or None for null; the text 'None' is a value) are parsed as the scalar
+    checker does: with int() for integer fields, so '1.0' and '1e3' do not parse,
+    and with float() otherwise, where non-finite text such as 'nan' or 'inf'
+    counts as unparseable rather than null. The whole column is converted in one
+    astype call; only a column with unparseable entries falls back to per-value
+    parsing to locate them.
+    """
+    require_numpy()
+    if isinstance(column, np.ma.MaskedArray):
+        nulls = np.ma.getmaskarray(column).copy()
+        values = column.astype(np.float64).filled(np.nan)
+        return values, nulls | np.isnan(values), np.zeros(len(values), dtype=bool)
+    
+    column = np.asarray(column)
+    if column.dtype.kind in 'iufb':
+        values = column.astype(np.float64)
+        return values, np.isnan(values), np.zeros(len(values), dtype=bool)
+    
+    if column.dtype.kind == 'O':
+        # Mixed columns (e.g. from NDJSON): None is null and numbers get their record text form
+        nulls = np.fromiter((item is None or item == '' for item in column), dtype=bool, count=len(column))
+        text = np.array(['' if item is None else item if isinstance(item, str) else to_text(item, integer)
+                         for item in column], dtype=str)
+    else:
+        text = column.astype(str)
+        nulls = text == ''
+    # Placeholder for the nulls only, so a literal 'nan' in the data is not mistaken for one
+    text = np.where(nulls, '0', text)
+    parse, dtype = (int, np.int64) if integer else (float, np.float64)
+    try:
+        values = text.astype(dtype).astype(np.float64)
+        unparseable = np.zeros(len(values), dtype=bool)
+    except (ValueError, OverflowError):
+        def to_number(item):
+            try:
+                return float(parse(item))
+            except (ValueError, OverflowError):
+                return None
+        
+        parsed = [to_number(item) for item in text]
+        unparseable = np.fromiter((value is None for value in parsed), dtype=bool, count=len(parsed))
+        values = np.array([np.nan if value is None else value for value in parsed], dtype=np.float64)
+    unparseable |= ~nulls & ~unparseable & ~np.isfinite(values)
+    values[nulls] = np.nan
+    return values, nulls, unparseable
+
+def check_numeric_column(column, rule):
+    """Return an OrderedDict of error code -> boolean mask of violating rows for one numeric field
+
+    Codes are null (null in a non-nullable field), type (unparseable, non-finite,
+    fractional or outside the integer type limits), precision (too many digits for
+    a non-zero Precision/Scale), domain (numeric coded value domain) and range.
+    Nulls in nullable fields are valid and never set any mask.
+    """
+    require_numpy()
+    values, nulls, unparseable = parse_numeric_column(column, rule['type'] in INTEGER_LIMITS)
+    present = ~nulls
+    masks = OrderedDict()
+    
+    masks[NULL_ERROR] = np.zeros(len(values), dtype=bool) if rule['nullable'] else nulls
+    
+    with np.errstate(invalid='ignore'):
+        type_errors = unparseable | (present & np.isinf(values))
+        limits = INTEGER_LIMITS.get(rule['type'])
+        if limits is not None:
+            finite = present & np.isfinite(values)
+            type_errors |= finite & ((values != np.floor(values)) | (values < limits[0]) | (values > limits[1]))
+        masks[TYPE_ERROR] = type_errors
+        
+        precision, scale = rule.get('precision') or 0, rule.get('scale') or 0
+        checked = present & ~type_errors
+        if precision > 0:
+            scaled = values * (10.0 ** scale)
+            masks[PRECISION_ERROR] = checked & ((np.abs(scaled) >= 10.0 ** precision) |
+                                                (np.abs(scaled - np.round(scaled)) > 1e-9 * np.maximum(1.0, np.abs(scaled))))
+        else:
+            masks[PRECISION_ERROR] = np.zeros(len(values), dtype=bool)
+        
+        if rule['codes'] is not None:
+            # Codes that cannot take the field's type are dropped, as in the scalar checker
+            codes = np.array(sorted(comparable_codes(rule)), dtype=np.float64)
+            masks[DOMAIN_ERROR] = checked & ~np.isin(values, codes)
+        else:
+            masks[DOMAIN_ERROR] = np.zeros(len(values), dtype=bool)
+        
+        out_of_range = np.zeros(len(values), dtype=bool)
+        if rule['min'] is not None:
+            out_of_range |= values < rule['min']
+        if rule['max'] is not None:
+            out_of_range |= values > rule['max']
+        masks[RANGE_ERROR] = checked & out_of_range
+    
+    return masks
+
+def valid_mask(column, rule):
+    """Boolean mask of rows whose value satisfies every constraint of the field"""
+    masks = check_numeric_column(column, rule)
+    invalid = np.zeros(len(next(iter(masks.values()))), dtype=bool)
+    for mask in masks.values():
+        invalid |= mask
+    return ~invalid
+
+def check_numeric_columns(columns, rules):
+    """Check several columns at once; columns maps field name -> array
+
+    Returns field name -> OrderedDict of masks, for the numeric fields that have a rule.
+    """
+    return OrderedDict((name, check_numeric_column(column, rules[name]))
+                       for name, column in columns.items()
+                       if name in rules and is_numeric_rule(rules[name]))
+
+def summarize_masks(masks_by_field):
+    """Count violations per field and error code"""
+    return OrderedDict((name, OrderedDict((code, int(mask.sum())) for code, mask in masks.items() if mask.any()))
+                       for name, masks in masks_by_field.items())
\ No newline at end of file
@@ -0,0 +1,170 @@
+"""
+Watch an export and re-extract incrementally when it changes
+Polls the export with os.stat and waits for the size and mtime to hold still for
+one interval before acting, so a file that is still being copied is not parsed.
+A content hash then filters out touches and identical re-drops. The class models
+from the previous extraction are kept in memory: for plain exports each feature
+class's DataElement bytes are hashed and only classes whose bytes, or the domains
+they reference, changed are parsed again, and outputs are rewritten only for
+classes whose model differs from the one already written.
+"""
+
+import hashlib
+import mmap
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from extraction_pipeline import OUTPUT_WRITERS, load_schema, scan_class_models, write_outputs
+from resumable_extract import outputs_intact
+from schema_service import file_signature
+
+HASH_BLOCK = 1 << 20
+
+def file_digest(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def referenced_domains(class_model, all_domains):
+    """Domain name -> definition (None if undefined) for every domain the class's fields name"""
+    names = {info['domain_name'] for info in class_model['all_fields'].values() if info['domain_name']}
+    return {name: all_domains.get(name) for name in names}
+
+class ExportWatcher:
+    """Keeps the last extraction's class models warm and rewrites only what changed
+
+    poll() is called once per interval; update() re-extracts immediately. Both
+    return a summary of the update, or None when nothing needed doing.
+    """
+    
+    def __init__(self, xml_file, class_names=None, output_dir=".", outputs=None, fsync=False):
+        self.xml_file = xml_file
+        self.class_names = class_names
+        self.output_dir = Path(output_dir)
+        self.outputs = list(outputs or OUTPUT_WRITERS)
+        self.fsync = fsync
+        # name -> {'digest', 'model', 'domains', 'files'} for the classes last written
+        self.classes = OrderedDict()
+        self.signature = None
+        self.digest = None
+        self.generation = 0
+        self.last_error = None
+        self._pending = None
+        self._failed_signature = None
+    
+    def poll(self):
+        """Re-extract once a change to the export has settled for one interval"""
+        signature = file_signature(self.xml_file)
+        if signature is None or signature in (self.signature, self._failed_signature):
+            self._pending = None
+            return None
+        if signature != self._pending:
+            # Still being written (or just replaced); check again next interval
+            self._pending = signature
+            return None
+        self._pending = None
+        return self.update(signature)
+    
+    def update(self, signature=None):
+        signature = signature or file_signature(self.xml_file)
+        start = time.perf_counter()
+        try:
+            digest = file_digest(self.xml_file)
+            if digest == self.digest:
+                self.signature = signature
+                return None
+            models = self.load_models()
+        except Exception as exc:
+            # Usually a partial write that held still for an interval, or the export was moved
+            # away between the stat and the read; retried when the file changes again
+            self._failed_signature = signature
+            self.last_error = f"{type(exc).__name__}: {exc}"
+            return OrderedDict([('status', 'failed'), ('error', self.last_error)])
+        summary = self.write_changed(models)
+        self.signature, self.digest = signature, digest
+        self._failed_signature = self.last_error = None
+        self.generation += 1
+        summary['generation'] = self.generation
+        summary['seconds'] = round(time.perf_counter() - start, 3)
+        return summary
+    
+    def load_models(self):
+        """name -> (digest, model, domains) for the wanted classes, reusing warm models where the bytes match"""
+        with open(self.xml_file, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            scanned = scan_class_models(data)
+            if scanned is None:
+                return self.load_all_models()
+            all_domains, classes = scanned
+            wanted = set(self.class_names) if self.class_names is not None else None
+            models = OrderedDict()
+            for name, start, end, load in classes:
+                if wanted is not None and name not in wanted:
+                    continue
+                digest = hashlib.sha1(data[start:end]).hexdigest()
+                entry = self.classes.get(name)
+                if entry is not None and entry['digest'] == digest and \
+                        all(all_domains.get(domain_name) == domain for domain_name, domain in entry['domains'].items()):
+                    models[name] = (digest, entry['model'], entry['domains'])
+                    continue
+                model = load()
+                if model is not None:
+                    models[name] = (digest, model, referenced_domains(model, all_domains))
+            return models
+    
+    def load_all_models(self):
+        """Full parse for compressed exports and layouts the byte scan cannot split"""
+        schema = load_schema(self.xml_file, self.class_names)
+        return OrderedDict((name, (None, model, referenced_domains(model, schema['domains'])))
+                           for name, model in schema['classes'].items())
+    
+    def write_changed(self, models):
+        summary = OrderedDict([('status', 'updated'), ('changed', []), ('unchanged', 0), ('removed', []),
+                               ('missing', []), ('files', [])])
+        for name, (digest, model, domains) in models.items():
+            entry = self.classes.get(name)
+            if entry is not None and entry['model'] == model and outputs_intact(entry):
+                entry['digest'], entry['domains'] = digest, domains
+                summary['unchanged'] += 1
+                continue
+            schema = {'domains': {}, 'classes': OrderedDict([(name, model)]), 'missing': []}
+            files = write_outputs(schema, self.output_dir, self.outputs, fsync=self.fsync)
+            self.classes[name] = {
+                'digest': digest,
+                'model': model,
+                'domains': domains,
+                'files': [{'path': str(path), 'size': path.stat().st_size} for path in files],
+            }
+            summary['changed'].append(name)
+            summary['files'].extend(files)
+        for name in [name for name in self.classes if name not in models]:
+            for record in self.classes.pop(name)['files']:
+                Path(record['path']).unlink(missing_ok=True)
+            summary['removed'].append(name)
+        if self.class_names is not None:
+            summary['missing'] = [name for name in self.class_names if name not in models]
+        return summary
+
+def print_update(xml_file, summary):
+    if summary['status'] == 'failed':
+        print(f"{xml_file} could not be read, waiting for it to change again: {summary['error']}")
+        return
+    print(f"Generation {summary['generation']}: {len(summary['changed'])} classes rewritten "
+          f"({len(summary['files'])} files), {summary['unchanged']} unchanged in {summary['seconds']}s")
+    for name in summary['removed']:
+        print(f"  - {name}: no longer in the export, outputs removed")
+    for name in summary['missing']:
+        print(f"  - {name}: feature class not found!")
+
+def watch_export(watcher, poll_interval=2.0, report=print_update):
+    """Extract now, then poll the export every poll_interval seconds until interrupted"""
+    summary = watcher.update()
+    if summary is not None:
+        report(watcher.xml_file, summary)
+    while True:
+        time.sleep(poll_interval)
+        summary = watcher.poll()
+        if summary is not None:
+            report(watcher.xml_file, summary)
\ No newline at end of file
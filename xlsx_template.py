@@ -0,0 +1,311 @@
+"""
+Excel data-entry templates with native dropdowns
+Writes an .xlsx workbook directly with zipfile: one sheet per feature class with
+a header row of field names, and a hidden Lists sheet holding every coded value
+domain the classes use, stacked one below the other. Each coded value field gets
+a list data validation pointing at its domain's slice of Lists, so Excel shows a
+dropdown of the coded values; range domains become whole/decimal "between"
+validations. Sheet XML is streamed row by row into the zip entries and cells use
+inline strings (no shared string table), so memory does not grow with the number
+of classes or values written. With every class requested, plain exports are read
+one feature class at a time as well.
+"""
+
+import io
+import mmap
+import re
+import time
+import zipfile
+from collections import OrderedDict
+from pathlib import Path
+from xml.sax.saxutils import escape, quoteattr
+
+from coded_values import code_text
+from extraction_pipeline import load_schema, scan_class_models
+
+LISTS_SHEET = 'Lists'
+MAX_ROWS = 1048576
+MAX_SHEET_NAME = 31
+# Entered by the geodatabase, not by field teams
+SKIPPED_FIELD_TYPES = ('esriFieldTypeOID', 'esriFieldTypeGeometry', 'esriFieldTypeGlobalID',
+                       'esriFieldTypeBlob', 'esriFieldTypeRaster')
+WHOLE_NUMBER_TYPES = ('esriFieldTypeSmallInteger', 'esriFieldTypeInteger', 'esriFieldTypeBigInteger')
+# Column of the Lists sheet each dropdown mode offers
+DROPDOWNS = OrderedDict([('code', 'B'), ('name', 'C'), ('display', 'D')])
+
+INVALID_SHEET_CHARS = re.compile(r'[\[\]:*?/\\]')
+INVALID_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]')
+
+SPREADSHEET_NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+RELATIONSHIP_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+PACKAGE_RELATIONSHIP_NS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+
+# Every .xml part without an override is a worksheet, so the content types can be
+# written first even though the sheets are only known once they are streamed
+CONTENT_TYPES = (
+    XML_DECLARATION +
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '</Types>'
+)
+ROOT_RELS = (
+    XML_DECLARATION +
+    f'<Relationships xmlns="{PACKAGE_RELATIONSHIP_NS}">'
+    '<Relationship Id="rId1" Target="xl/workbook.xml" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+    '</Relationships>'
+)
+# Style 0 is the default, style 1 the bold header
+STYLES = (
+    XML_DECLARATION +
+    f'<styleSheet xmlns="{SPREADSHEET_NS}">'
+    '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+
+def column_letter(index):
+    """Spreadsheet column letters for a 1-based column index: 1 -> A, 27 -> AA"""
+    letters = ''
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+def xml_text(value):
+    return escape(INVALID_XML_CHARS.sub('', str(value)))
+
+def xml_attr(value):
+    return quoteattr(INVALID_XML_CHARS.sub('', str(value)))
+
+def cell(reference, value, style=0):
+    """One cell: numbers as numbers, anything else as an inline string"""
+    style_attr = f' s="{style}"' if style else ''
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f'<c r="{reference}"{style_attr}><v>{code_text(value)}</v></c>'
+    text = xml_text('' if value is None else value)
+    space = ' xml:space="preserve"' if text != text.strip() else ''
+    return f'<c r="{reference}"{style_attr} t="inlineStr"><is><t{space}>{text}</t></is></c>'
+
+def row(number, values, style=0):
+    cells = ''.join(cell(f"{column_letter(i)}{number}", value, style) for i, value in enumerate(values, 1))
+    return f'<row r="{number}">{cells}</row>'
+
+def sheet_name(class_name, used):
+    """Class name as a unique Excel sheet name (at most 31 characters, no []:*?/\\)"""
+    base = INVALID_SHEET_CHARS.sub('_', class_name).strip("'")[:MAX_SHEET_NAME] or 'Sheet'
+    name = base
+    counter = 1
+    while name.lower() in used:
+        counter += 1
+        suffix = f"~{counter}"
+        name = base[:MAX_SHEET_NAME - len(suffix)] + suffix
+    used.add(name.lower())
+    return name
+
+def number_or_none(value):
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return int(number) if number.is_integer() else number
+
+def template_fields(class_model):
+    """The fields a template asks for, in schema order"""
+    return [info for info in class_model['all_fields'].values() if info['type'] not in SKIPPED_FIELD_TYPES]
+
+def data_validation(domain, column, list_range, last_row):
+    """dataValidation element for a field bound to domain, or None if the domain gives nothing to check"""
+    sqref = f"{column}2:{column}{last_row}"
+    # Excel rejects error titles over 32 characters
+    title = xml_attr(domain['domain_name'][:32])
+    if domain['domain_type'] == 'CodedValue':
+        if list_range is None:
+            return None
+        return (f'<dataValidation type="list" allowBlank="1" showErrorMessage="1" errorTitle={title} '
+                f'error={xml_attr("Choose a value from the " + domain["domain_name"] + " list")} '
+                f'sqref="{sqref}"><formula1>{list_range}</formula1></dataValidation>')
+    low, high = number_or_none(domain['min_value']), number_or_none(domain['max_value'])
+    if low is None or high is None:
+        return None
+    kind = 'whole' if domain['field_type'] in WHOLE_NUMBER_TYPES else 'decimal'
+    return (f'<dataValidation type="{kind}" operator="between" allowBlank="1" showErrorMessage="1" '
+            f'errorTitle={title} error="Enter a number from {low} to {high}" sqref="{sqref}">'
+            f'<formula1>{low}</formula1><formula2>{high}</formula2></dataValidation>')
+
+class TemplateWorkbook:
+    """Streams feature class sheets into an .xlsx file, then the hidden Lists sheet
+
+    add_class() writes one class's sheet straight into the zip and keeps only
+    the domains it references (their values are shared with the domain table),
+    so a workbook for every class in an export holds one class model at a time.
+    """
+    
+    def __init__(self, output_file, dropdown='code', last_row=MAX_ROWS):
+        if dropdown not in DROPDOWNS:
+            raise ValueError(f"Unknown dropdown {dropdown!r}; choose from {', '.join(DROPDOWNS)}")
+        self.zip = zipfile.ZipFile(output_file, 'w', zipfile.ZIP_DEFLATED)
+        self.dropdown = dropdown
+        self.last_row = last_row
+        self.sheets = []
+        self.used_names = {LISTS_SHEET.lower()}
+        # domain name -> (first row, last row) on the Lists sheet, plus the values to write there
+        self.list_rows = OrderedDict()
+        self.list_values = OrderedDict()
+        self.next_list_row = 2
+        self.zip.writestr('[Content_Types].xml', CONTENT_TYPES)
+        self.zip.writestr('_rels/.rels', ROOT_RELS)
+        self.zip.writestr('xl/styles.xml', STYLES)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.zip.close()
+    
+    def open_part(self, name):
+        info = zipfile.ZipInfo(name, time.localtime()[:6])
+        info.compress_type = zipfile.ZIP_DEFLATED
+        return io.TextIOWrapper(self.zip.open(info, 'w'), encoding='utf-8', newline='')
+    
+    def list_range(self, domain):
+        """Lists sheet range of a coded value domain's dropdown column, reserving its rows on first use"""
+        name = domain['domain_name']
+        if name not in self.list_rows:
+            count = len(domain['values'])
+            if not count:
+                return None
+            self.list_rows[name] = (self.next_list_row, self.next_list_row + count - 1)
+            self.list_values[name] = domain['values']
+            self.next_list_row += count
+        first, last = self.list_rows[name]
+        column = DROPDOWNS[self.dropdown]
+        return f"{LISTS_SHEET}!${column}${first}:${column}${last}"
+    
+    def add_class(self, class_name, class_model):
+        """Stream one feature class sheet and return its summary"""
+        name = sheet_name(class_name, self.used_names)
+        fields = template_fields(class_model)
+        validations = []
+        for index, info in enumerate(fields, 1):
+            domain = class_model['fields_with_domains'].get(info['name'])
+            if domain is None:
+                continue
+            list_range = self.list_range(domain) if domain['domain_type'] == 'CodedValue' else None
+            validation = data_validation(domain, column_letter(index), list_range, self.last_row)
+            if validation is not None:
+                validations.append(validation)
+        
+        part = f"xl/worksheets/sheet{len(self.sheets) + 1}.xml"
+        with self.open_part(part) as f:
+            f.write(XML_DECLARATION)
+            f.write(f'<worksheet xmlns="{SPREADSHEET_NS}" xmlns:r="{RELATIONSHIP_NS}">')
+            f.write('<sheetViews><sheetView workbookViewId="0"><pane ySplit="1" topLeftCell="A2" '
+                    'activePane="bottomLeft" state="frozen"/></sheetView></sheetViews>')
+            if fields:
+                f.write('<cols>')
+                for index, info in enumerate(fields, 1):
+                    width = min(max(len(info['name']), 10) + 2, 60)
+                    f.write(f'<col min="{index}" max="{index}" width="{width}" customWidth="1"/>')
+                f.write('</cols>')
+            f.write('<sheetData>')
+            f.write(row(1, [info['name'] for info in fields], style=1))
+            f.write('</sheetData>')
+            if validations:
+                f.write(f'<dataValidations count="{len(validations)}">')
+                for validation in validations:
+                    f.write(validation)
+                f.write('</dataValidations>')
+            f.write('</worksheet>')
+        summary = OrderedDict([('class', class_name), ('sheet', name), ('fields', len(fields)),
+                               ('validations', len(validations))])
+        self.sheets.append((name, part))
+        return summary
+    
+    def write_lists(self):
+        """The hidden sheet: one row per coded value, domains stacked in the order first referenced"""
+        part = f"xl/worksheets/sheet{len(self.sheets) + 1}.xml"
+        with self.open_part(part) as f:
+            f.write(XML_DECLARATION)
+            f.write(f'<worksheet xmlns="{SPREADSHEET_NS}" xmlns:r="{RELATIONSHIP_NS}"><sheetData>')
+            f.write(row(1, ['domain', 'code', 'name', 'display'], style=1))
+            number = 2
+            for domain_name, values in self.list_values.items():
+                for value in values:
+                    code, name = value['code'], value['name']
+                    f.write(row(number, [domain_name, code, name, f"{name} ({code_text(code)})"]))
+                    number += 1
+            f.write('</sheetData></worksheet>')
+        return part
+    
+    def close(self):
+        """Write the Lists sheet and the workbook parts that name every sheet"""
+        if not self.sheets:
+            self.zip.close()
+            raise ValueError("A template needs at least one feature class sheet")
+        lists_part = self.write_lists()
+        sheets = [(name, part, '') for name, part in self.sheets]
+        sheets.append((LISTS_SHEET, lists_part, ' state="hidden"'))
+        
+        entries = ''.join(f'<sheet name={xml_attr(name)} sheetId="{i}"{state} r:id="rId{i}"/>'
+                          for i, (name, part, state) in enumerate(sheets, 1))
+        self.zip.writestr('xl/workbook.xml', XML_DECLARATION +
+                          f'<workbook xmlns="{SPREADSHEET_NS}" xmlns:r="{RELATIONSHIP_NS}">'
+                          f'<bookViews><workbookView activeTab="0"/></bookViews><sheets>{entries}</sheets></workbook>')
+        relationships = ''.join(
+            f'<Relationship Id="rId{i}" Target="{part[3:]}" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"/>'
+            for i, (name, part, state) in enumerate(sheets, 1))
+        styles_id = len(sheets) + 1
+        self.zip.writestr('xl/_rels/workbook.xml.rels', XML_DECLARATION +
+                          f'<Relationships xmlns="{PACKAGE_RELATIONSHIP_NS}">{relationships}'
+                          f'<Relationship Id="rId{styles_id}" Target="styles.xml" '
+                          'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles"/>'
+                          '</Relationships>')
+        self.zip.close()
+
+def write_template(classes, output_file, dropdown='code', last_row=MAX_ROWS):
+    """Write (class name, class model) pairs to one workbook and return a summary per sheet
+
+    classes may be a generator; each model can be dropped once its sheet is written.
+    """
+    summaries = []
+    with TemplateWorkbook(output_file, dropdown, last_row) as workbook:
+        for class_name, class_model in classes:
+            summaries.append(workbook.add_class(class_name, class_model))
+    return summaries
+
+def iter_class_models(xml_file, class_names=None):
+    """Yield (name, model) for the requested classes, or for every class one at a time
+
+    Named classes go through load_schema's selective read. For every class, plain
+    exports are split with the byte scan and each feature class is parsed and
+    modelled only when its sheet is due; compressed exports and layouts the scan
+    cannot split fall back to one full parse.
+    """
+    if class_names is None and isinstance(xml_file, (str, Path)) and str(xml_file) != '-':
+        with open(xml_file, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            scanned = scan_class_models(data)
+            if scanned is not None:
+                for name, _, _, load in scanned[1]:
+                    model = load()
+                    if model is not None:
+                        yield name, model
+                return
+    yield from load_schema(xml_file, class_names)['classes'].items()
\ No newline at end of file